@@ -0,0 +1,152 @@
+"""Batch button detection over image directories and video files.
+
+Runs the Qt-free detection core on many frames in parallel processes and
+prints one JSON object per frame (JSON Lines), so templates can be checked
+against archived screenshots on headless build machines:
+
+    python autocontinue_batch.py screenshots/ recording.mp4 --workers 8 --output results.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import cv2
+
+from autocontinue_core import AutoContinueDetector, AutoContinueTemplateBank, resource_path
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.webm', '.wmv')
+
+# One detector per worker process, built by init_worker
+worker_detector = None
+
+
+def init_worker(template_path, scales, threshold, pyramid_levels):
+    global worker_detector
+    template_bank = AutoContinueTemplateBank(template_path, scales)
+    worker_detector = AutoContinueDetector(template_bank, match_threshold=threshold, pyramid_levels=pyramid_levels)
+
+
+def detect_image(path):
+    started = time.perf_counter()
+    frame = cv2.imread(path, cv2.IMREAD_COLOR)
+    if frame is None:
+        return [{"source": path, "frame": 0, "error": "unreadable image"}]
+    result = worker_detector.detect_frame(frame)
+    return [frame_record(path, 0, result, started)]
+
+
+def detect_video_chunk(task):
+    """Frames start..stop of a video; a stop of None reads until the video ends."""
+    path, start, stop, step = task
+    capture = cv2.VideoCapture(path)
+    records = []
+    try:
+        if not capture.isOpened():
+            return [{"source": path, "frame": start, "error": "unreadable video"}]
+        if start:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+        index = start
+        while stop is None or index < stop:
+            started = time.perf_counter()
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if not (index - start) % step:
+                records.append(frame_record(path, index, worker_detector.detect_frame(frame), started))
+            index += 1
+        if index == start == 0:
+            records.append({"source": path, "frame": 0, "error": "no frames could be decoded"})
+    finally:
+        capture.release()
+    return records
+
+
+def frame_record(source, index, result, started):
+    return {
+        "source": source,
+        "frame": index,
+        "found": result["found"],
+        "score": result["score"],
+        "x": result["x"],
+        "y": result["y"],
+        "scale": result["scale"],
+        "elapsed_ms": (time.perf_counter() - started) * 1000.0,
+    }
+
+
+def collect_tasks(inputs, recursive, video_step, chunk_frames):
+    """Split the inputs into (function, argument) work items."""
+    tasks = []
+    for path in inputs:
+        if os.path.isdir(path):
+            walker = os.walk(path) if recursive else [(path, [], os.listdir(path))]
+            for root, dirs, files in walker:
+                for name in sorted(files):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        tasks.append((detect_image, os.path.join(root, name)))
+        elif path.lower().endswith(VIDEO_EXTENSIONS):
+            capture = cv2.VideoCapture(path)
+            frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            capture.release()
+            if frame_count <= 0:
+                # No usable count (common for webm and variable frame rate video): one task reads to the end
+                tasks.append((detect_video_chunk, (path, 0, None, video_step)))
+                continue
+            # Chunks are a multiple of the step so sampled frames stay evenly spaced
+            chunk = max(video_step, chunk_frames - chunk_frames % video_step)
+            for start in range(0, frame_count, chunk):
+                # The count is only an estimate, so the last chunk reads on until the video really ends
+                stop = start + chunk if start + chunk < frame_count else None
+                tasks.append((detect_video_chunk, (path, start, stop, video_step)))
+        else:
+            tasks.append((detect_image, path))
+    return tasks
+
+
+def run_task(task):
+    function, argument = task
+    return function(argument)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detect the 'Continue generation' button in images and videos.")
+    parser.add_argument("inputs", nargs="+", help="Image files, directories of images, or video files")
+    parser.add_argument("--template", default=resource_path("button_image.png"), help="Button template image")
+    parser.add_argument("--scales", default=",".join(str(scale) for scale in AutoContinueTemplateBank.DEFAULT_SCALES),
+                        help="Template scales to search, e.g. 1.0,1.25,1.5")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--pyramid-levels", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--recursive", action="store_true", help="Descend into subdirectories")
+    parser.add_argument("--video-step", type=int, default=1, help="Only analyse every Nth video frame")
+    parser.add_argument("--chunk-frames", type=int, default=240, help="Video frames per worker task")
+    parser.add_argument("--output", help="Write JSON Lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if cv2.imread(args.template, 0) is None:
+        parser.error(f"Cannot read template {args.template}")
+    scales = [float(scale) for scale in args.scales.split(',')]
+    tasks = collect_tasks(args.inputs, args.recursive, max(1, args.video_step), args.chunk_frames)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    found = frames = 0
+    try:
+        with Pool(processes=max(1, args.workers), initializer=init_worker,
+                  initargs=(args.template, scales, args.threshold, args.pyramid_levels)) as pool:
+            for records in pool.imap(run_task, tasks, chunksize=4):
+                for record in records:
+                    frames += 1
+                    found += bool(record.get("found"))
+                    out.write(json.dumps(record) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{frames} frames processed, button found in {found}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1146 @@
+"""Qt-free detection core for TSTP:Auto Continue.
+
+Everything needed to find the "Continue generation" button in a frame lives
+here so it can be imported on headless machines (batch validation,
+benchmarks) without PyQt5. Only cv2 and numpy are required at import time;
+mss and screeninfo are imported when live screens are actually captured.
+"""
+import os
+import sys
+import time
+import logging
+import threading
+import hashlib
+from collections import deque
+
+import cv2
+import numpy as np
+
+from autocontinue_stats import AutoContinueStageStats
+from autocontinue_settings import DEFAULT_TEMPLATE_SCALES, RULE_ACTIONS
+
+
+def resource_path(relative_path):
+    """ Get absolute path to resource, works for dev and for PyInstaller """
+    try:
+        base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+        return os.path.join(base_path, relative_path)
+    except Exception as e:
+        logging.error(f"Error in resource_path: {e}")
+        return relative_path
+
+
+class AutoContinueHitTracker:
+    """Remembers where the button was last found on a monitor so the next
+    tick can search a small region around those spots first."""
+
+    def __init__(self, max_hits=4, roi_margin=1.0, full_scan_every=10, stale_after_misses=3):
+        self.max_hits = max_hits
+        self.roi_margin = roi_margin  # ROI padding, in template sizes
+        self.full_scan_every = full_scan_every
+        self.stale_after_misses = stale_after_misses  # ROI misses in a row before the tracked spots are dropped
+        self.hits = []  # Most recent first, (x, y) top-left match positions
+        self.ticks_since_full_scan = 0
+        self.consecutive_misses = 0
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self.full_scans = 0
+
+    def should_full_scan(self):
+        return not self.hits or self.ticks_since_full_scan >= self.full_scan_every
+
+    def candidate_rois(self, frame_width, frame_height, template_width, template_height):
+        pad_x = int(template_width * self.roi_margin)
+        pad_y = int(template_height * self.roi_margin)
+        rois = []
+        for x, y in self.hits:
+            left = max(0, x - pad_x)
+            top = max(0, y - pad_y)
+            right = min(frame_width, x + template_width + pad_x)
+            bottom = min(frame_height, y + template_height + pad_y)
+            if right - left >= template_width and bottom - top >= template_height:
+                rois.append((left, top, right - left, bottom - top))
+        return rois
+
+    def record_roi_miss(self):
+        self.roi_misses += 1
+        self.consecutive_misses += 1
+        if self.consecutive_misses >= self.stale_after_misses:
+            # The button is gone from every tracked spot; checking them first would only add to each full scan
+            self.hits = []
+            self.consecutive_misses = 0
+
+    def record_hit(self, location, template_width, template_height):
+        self.consecutive_misses = 0
+        # Collapse hits that land on the same spot so one button doesn't fill the list
+        self.hits = [(x, y) for x, y in self.hits
+                     if abs(x - location[0]) >= template_width or abs(y - location[1]) >= template_height]
+        self.hits.insert(0, (int(location[0]), int(location[1])))
+        del self.hits[self.max_hits:]
+
+    def stats(self):
+        total = self.roi_hits + self.roi_misses
+        return {
+            "roi_hits": self.roi_hits,
+            "roi_misses": self.roi_misses,
+            "roi_hit_rate": self.roi_hits / total if total else 0.0,
+            "full_scans": self.full_scans,
+            "tracked_locations": len(self.hits),
+        }
+
+class AutoContinueFrameBuffers:
+    """Reusable arrays for one monitor's detection pass.
+
+    `get` hands back a contiguous view into a backing buffer kept per name,
+    which only grows when a larger shape is requested (new monitor geometry,
+    a bigger template scale), so steady-state ticks allocate nothing."""
+
+    def __init__(self):
+        self.backing = {}
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.reuses = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape))
+        backing = self.backing.get(name)
+        if backing is None or backing.dtype != dtype or backing.size < size:
+            backing = self.backing[name] = np.empty(size, dtype)
+            self.allocations += 1
+            self.allocated_bytes += backing.nbytes
+        else:
+            self.reuses += 1
+        return backing[:size].reshape(shape)
+
+    def stats(self):
+        return {
+            "allocations": self.allocations,
+            "allocated_bytes": self.allocated_bytes,
+            "reuses": self.reuses,
+            "resident_bytes": sum(backing.nbytes for backing in self.backing.values()),
+        }
+
+class AutoContinuePyramidMatcher:
+    """Coarse-to-fine template matching: find candidate peaks on downscaled
+    copies of the frame and template, then confirm each with a full-resolution
+    TM_CCOEFF_NORMED match in a small window around it."""
+
+    def __init__(self, levels=2, max_candidates=5, coarse_margin=0.3, min_template_size=12, coarse_border=1):
+        self.levels = levels
+        self.max_candidates = max_candidates
+        self.coarse_margin = coarse_margin  # How far below the threshold a coarse peak may score
+        self.min_template_size = min_template_size
+        # Coarse template pixels trimmed from each edge; the blur mixes the page behind the
+        # button into them, which otherwise sinks the coarse score on contrasting backgrounds
+        self.coarse_border = coarse_border
+
+    def effective_levels(self, template, limit=None):
+        # Stop downscaling before the template loses too much detail to match reliably
+        limit = self.levels if limit is None else limit
+        levels = 0
+        height, width = template.shape[:2]
+        while levels < limit and min(height, width) // 2 >= self.min_template_size:
+            height, width = height // 2, width // 2
+            levels += 1
+        return levels
+
+    def downscale(self, image, scale, buffers=None, name="coarse_frame"):
+        # Pre-blurring keeps coarse scores stable when the button isn't aligned to the grid
+        if buffers is None:
+            blurred = cv2.GaussianBlur(image, (0, 0), 0.5 * scale)
+            return cv2.resize(blurred, None, fx=1.0 / scale, fy=1.0 / scale, interpolation=cv2.INTER_AREA)
+        height, width = image.shape[:2]
+        blurred = cv2.GaussianBlur(image, (0, 0), 0.5 * scale, dst=buffers.get("blurred", image.shape, image.dtype))
+        # Same rounding as cv2.resize uses for fx/fy, so the destination is reused rather than replaced
+        coarse_shape = (int(np.rint(height / scale)), int(np.rint(width / scale)))
+        return cv2.resize(blurred, None, dst=buffers.get(name, coarse_shape, image.dtype),
+                          fx=1.0 / scale, fy=1.0 / scale, interpolation=cv2.INTER_AREA)
+
+    def match(self, gray_screenshot, template, threshold, buffers=None, pyramid=None):
+        """Return (score, top-left location) of the best match. With a
+        `buffers` pool the blur, coarse frame and result maps are written into
+        reused arrays instead of being allocated on every call; a `pyramid`
+        of `gray_screenshot` shares its coarse frames between calls."""
+        levels = self.effective_levels(template)
+        if levels == 0:
+            result = cv2.matchTemplate(gray_screenshot, template, cv2.TM_CCOEFF_NORMED,
+                                       result=result_buffer(buffers, "result", gray_screenshot, template))
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            return max_val, max_loc
+
+        scale = 2 ** levels
+        coarse_frame = pyramid.get(scale) if pyramid is not None else self.downscale(gray_screenshot, scale, buffers)
+        border = self.coarse_border
+        coarse_template = self.downscale(template, scale)[border:-border or None, border:-border or None]
+
+        coarse_result = cv2.matchTemplate(coarse_frame, coarse_template, cv2.TM_CCOEFF_NORMED,
+                                          result=result_buffer(buffers, "coarse_result", coarse_frame, coarse_template))
+        coarse_height, coarse_width = coarse_template.shape[:2]
+        frame_height, frame_width = gray_screenshot.shape[:2]
+        template_height, template_width = template.shape[:2]
+
+        best_val, best_loc = -1.0, (0, 0)
+        for _ in range(self.max_candidates):
+            _, peak_val, _, peak_loc = cv2.minMaxLoc(coarse_result)
+            if peak_val < threshold - self.coarse_margin:
+                break
+            # Suppress this peak so the next iteration finds a different candidate
+            cv2.rectangle(coarse_result,
+                          (peak_loc[0] - coarse_width // 2, peak_loc[1] - coarse_height // 2),
+                          (peak_loc[0] + coarse_width // 2, peak_loc[1] + coarse_height // 2),
+                          -1.0, thickness=-1)
+
+            x = (peak_loc[0] - border) * scale
+            y = (peak_loc[1] - border) * scale
+            left = max(0, x - scale * 2)
+            top = max(0, y - scale * 2)
+            right = min(frame_width, x + template_width + scale * 2)
+            bottom = min(frame_height, y + template_height + scale * 2)
+            window = gray_screenshot[top:bottom, left:right]
+            if window.shape[0] < template_height or window.shape[1] < template_width:
+                continue
+
+            result = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if max_val > best_val:
+                best_val, best_loc = max_val, (left + max_loc[0], top + max_loc[1])
+            if best_val > threshold:
+                break
+        return best_val, best_loc
+
+class AutoContinueFramePyramid:
+    """Coarse copies of one grayscale frame, built on first use and shared by
+    every template and rule matched against that frame in a pass."""
+
+    def __init__(self, matcher, gray, buffers=None, name="frame"):
+        self.matcher = matcher
+        self.gray = gray
+        self.buffers = buffers
+        self.name = name
+        self.levels = {}  # scale -> downscaled frame
+
+    def get(self, scale):
+        coarse = self.levels.get(scale)
+        if coarse is None:
+            coarse = self.levels[scale] = self.matcher.downscale(self.gray, scale, self.buffers, ("coarse_frame", self.name, scale))
+        return coarse
+
+class AutoContinueFrameChangeDetector:
+    """Keeps a subsampled copy of the last frame for a monitor and reports
+    which tiles changed, so unchanged screens can skip matching entirely."""
+
+    def __init__(self, tile_size=128, sample_stride=4, pixel_tolerance=8, max_dirty_fraction=0.5, buffers=None):
+        self.tile_size = tile_size
+        self.sample_stride = sample_stride
+        self.pixel_tolerance = pixel_tolerance  # Ignore tiny intensity changes from dithering
+        self.max_dirty_fraction = max_dirty_fraction
+        self.previous_sample = None
+        self.buffers = buffers or AutoContinueFrameBuffers()
+        self.sample_slot = 0  # The two sample buffers take turns holding the previous frame
+        self.frames = 0
+        self.skipped_frames = 0
+        self.partial_frames = 0
+        self.full_frames = 0
+        self.scanned_fraction_total = 0.0
+
+    def reset(self):
+        self.previous_sample = None
+
+    def dirty_regions(self, screenshot, template_width, template_height):
+        """Return None if the whole frame must be scanned, an empty list if
+        nothing changed, or a list of (left, top, width, height) regions."""
+        self.frames += 1
+        frame_height, frame_width = screenshot.shape[:2]
+        strided = screenshot[::self.sample_stride, ::self.sample_stride, :3]
+        self.sample_slot ^= 1
+        sample = self.buffers.get(("sample", self.sample_slot), strided.shape)
+        np.copyto(sample, strided)
+        previous = self.previous_sample
+        self.previous_sample = sample
+        if previous is None or previous.shape != sample.shape:
+            return self.full_frame()
+
+        difference = cv2.absdiff(sample, previous, dst=self.buffers.get("difference", sample.shape))
+        channel_max = np.max(difference, axis=2, out=self.buffers.get("channel_max", sample.shape[:2]))
+        tile = max(1, self.tile_size // self.sample_stride)
+        rows = -(-channel_max.shape[0] // tile)
+        cols = -(-channel_max.shape[1] // tile)
+        padded = self.buffers.get("padded", (rows * tile, cols * tile), bool)
+        padded.fill(False)
+        np.greater(channel_max, self.pixel_tolerance, out=padded[:channel_max.shape[0], :channel_max.shape[1]])
+        dirty = padded.reshape(rows, tile, cols, tile).any(axis=(1, 3))
+
+        dirty_count = int(dirty.sum())
+        if dirty_count == 0:
+            self.skipped_frames += 1
+            return []
+        if dirty_count > self.max_dirty_fraction * dirty.size:
+            return self.full_frame()
+
+        # Group adjacent dirty tiles and pad each group so a button straddling its edge still fits
+        count, _, stats, _ = cv2.connectedComponentsWithStats(dirty.astype(np.uint8), connectivity=8)
+        regions = []
+        scanned_area = 0
+        for label in range(1, count):
+            x, y, w, h = stats[label][:4]
+            left = max(0, x * self.tile_size - template_width)
+            top = max(0, y * self.tile_size - template_height)
+            right = min(frame_width, (x + w) * self.tile_size + template_width)
+            bottom = min(frame_height, (y + h) * self.tile_size + template_height)
+            regions.append((int(left), int(top), int(right - left), int(bottom - top)))
+            scanned_area += int((right - left) * (bottom - top))
+        self.partial_frames += 1
+        self.scanned_fraction_total += min(1.0, scanned_area / float(frame_width * frame_height))
+        return regions
+
+    def full_frame(self):
+        self.full_frames += 1
+        self.scanned_fraction_total += 1.0
+        return None
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "skipped_frames": self.skipped_frames,
+            "partial_frames": self.partial_frames,
+            "full_frames": self.full_frames,
+            "skip_ratio": self.skipped_frames / self.frames if self.frames else 0.0,
+            "mean_scanned_fraction": self.scanned_fraction_total / self.frames if self.frames else 0.0,
+        }
+
+class AutoContinuePollScheduler:
+    """Adaptive tick pacing: drops to the minimum interval after a click or a
+    screen change and backs off exponentially towards the maximum when idle."""
+
+    def __init__(self, min_interval=0.25, max_interval=1.0, backoff_factor=1.5, sleep_slice=0.1):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff_factor = backoff_factor
+        self.sleep_slice = sleep_slice  # Upper bound on how long stop() can be delayed
+        self.current_interval = self.min_interval
+        self.floor_interval = 0.0  # Set by the CPU governor; ticks never come closer than this
+        self.tick_starts = deque(maxlen=20)
+
+    def set_intervals(self, min_interval, max_interval):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.current_interval = min(max(self.current_interval, self.min_interval), self.max_interval)
+
+    def start_tick(self):
+        tick_started = time.monotonic()
+        self.tick_starts.append(tick_started)
+        return tick_started
+
+    def record_activity(self, active):
+        if active:
+            self.current_interval = self.min_interval
+        else:
+            self.current_interval = min(self.max_interval, self.current_interval * self.backoff_factor)
+
+    def wait_for_next_tick(self, tick_started, should_continue):
+        """Sleep until the next tick is due; returns how late the wake-up was."""
+        # Sleep only for what is left of the interval after this tick's processing time
+        deadline = tick_started + max(self.current_interval, self.floor_interval)
+        while should_continue():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, self.sleep_slice))
+        return max(0.0, time.monotonic() - deadline)
+
+    def effective_rate(self):
+        if len(self.tick_starts) < 2:
+            return 0.0
+        elapsed = self.tick_starts[-1] - self.tick_starts[0]
+        return (len(self.tick_starts) - 1) / elapsed if elapsed > 0 else 0.0
+
+class AutoContinueCpuGovernor:
+    """Keeps detection CPU time under `budget`, a fraction of one core
+    (0 disables it).
+
+    Ticks get an interval floor of recent CPU seconds per tick / budget, so
+    an expensive tick spaces out the following ones instead of every later
+    tick running late. When that floor exceeds `target_interval` (the idle
+    interval) the governor steps down a ladder of cheaper scans (coarser
+    matching, then fewer monitors per tick) and climbs back once the floor
+    drops below `target_interval * headroom`. Coarser matching steps are
+    only on the ladder while the templates are big enough to use them, see
+    `set_pyramid_headroom`."""
+
+    MAX_EXTRA_PYRAMID_LEVELS = 2
+
+    def __init__(self, budget=0.0, target_interval=1.0, smoothing=0.3, adjust_every=3.0, headroom=0.4, window=10.0,
+                 pyramid_headroom=MAX_EXTRA_PYRAMID_LEVELS):
+        self.levels = self.build_ladder(pyramid_headroom)
+        self.budget = budget
+        self.target_interval = target_interval
+        self.smoothing = smoothing
+        self.adjust_every = adjust_every  # Lets the average settle after each step
+        self.headroom = headroom
+        self.window = window
+        self.level = 0
+        self.cpu_per_tick = None  # Exponential moving average, seconds
+        self.samples = deque()  # (tick start, CPU seconds) within `window`
+        self.last_adjusted = 0.0
+        self.rotation = 0
+        self.decisions = 0
+
+    @property
+    def enabled(self):
+        return self.budget > 0
+
+    @classmethod
+    def build_ladder(cls, pyramid_headroom):
+        """(extra pyramid levels, share of the monitors scanned per tick; 0.0 = one) per level."""
+        extra = max(0, min(cls.MAX_EXTRA_PYRAMID_LEVELS, pyramid_headroom))
+        return tuple((levels, 1.0) for levels in range(extra + 1)) + ((extra, 0.5), (extra, 0.0))
+
+    def set_pyramid_headroom(self, pyramid_headroom):
+        """Rebuild the ladder for how many more pyramid levels the templates
+        allow; the current level keeps its monitor share where it can."""
+        levels = self.build_ladder(pyramid_headroom)
+        if levels == self.levels:
+            return
+        share = self.monitor_share
+        self.levels = levels
+        if share < 1.0:
+            self.level = next(index for index, (extra, level_share) in enumerate(levels) if level_share == share)
+        else:
+            self.level = min(self.level, len(levels) - 3)
+
+    @property
+    def extra_pyramid_levels(self):
+        return self.levels[self.level][0]
+
+    @property
+    def monitor_share(self):
+        return self.levels[self.level][1]
+
+    def record_tick(self, tick_started, cpu_seconds):
+        if self.cpu_per_tick is None:
+            self.cpu_per_tick = cpu_seconds
+        else:
+            self.cpu_per_tick += self.smoothing * (cpu_seconds - self.cpu_per_tick)
+        self.samples.append((tick_started, cpu_seconds))
+        while self.samples and tick_started - self.samples[0][0] > self.window:
+            self.samples.popleft()
+
+    def usage(self, now=None):
+        """CPU seconds per wall-clock second over the recent window."""
+        now = time.monotonic() if now is None else now
+        samples = list(self.samples)  # The tray reads this while the monitor thread appends
+        if not samples:
+            return 0.0
+        elapsed = now - samples[0][0]
+        return sum(cpu for started, cpu in samples) / elapsed if elapsed > 0 else 0.0
+
+    def interval_floor(self):
+        if not self.enabled or self.cpu_per_tick is None:
+            return 0.0
+        return self.cpu_per_tick / self.budget
+
+    def adjust(self, now=None):
+        """Take at most one step along the ladder; returns True if the level changed."""
+        now = time.monotonic() if now is None else now
+        if not self.enabled:
+            level = 0
+        elif now - self.last_adjusted < self.adjust_every:
+            return False
+        else:
+            floor = self.interval_floor()
+            level = self.level
+            if floor > self.target_interval and level < len(self.levels) - 1:
+                level += 1
+            elif floor < self.target_interval * self.headroom and level > 0:
+                level -= 1
+        if level == self.level:
+            return False
+        self.level = level
+        self.last_adjusted = now
+        self.decisions += 1
+        return True
+
+    def pick_monitors(self, monitor_indices):
+        # Round-robin, so every monitor is still scanned every few ticks
+        share = self.monitor_share
+        if share >= 1.0 or len(monitor_indices) <= 1:
+            return monitor_indices
+        count = max(1, int(len(monitor_indices) * share))
+        start = self.rotation % len(monitor_indices)
+        self.rotation += count
+        return [monitor_indices[(start + offset) % len(monitor_indices)] for offset in range(count)]
+
+    def status(self, now=None):
+        return {
+            "budget": self.budget,
+            "usage": self.usage(now),
+            "cpu_per_tick": self.cpu_per_tick or 0.0,
+            "interval_floor": self.interval_floor(),
+            "level": self.level,
+            "extra_pyramid_levels": self.extra_pyramid_levels,
+            "monitor_share": self.monitor_share,
+            "decisions": self.decisions,
+        }
+
+    def describe(self, now=None):
+        status = self.status(now)
+        monitors = "all monitors" if status["monitor_share"] >= 1.0 else (
+            "one monitor" if status["monitor_share"] == 0.0 else f"{status['monitor_share']:.0%} of monitors")
+        return (f"CPU {status['usage']:.0%} of a {status['budget']:.0%} budget, level {status['level']} "
+                f"(pyramid +{status['extra_pyramid_levels']}, {monitors} per tick, "
+                f"interval floor {status['interval_floor']:.2f}s)")
+
+class AutoContinueClickVerifier:
+    """Per-monitor post-click state machine: idle -> clicked -> verifying ->
+    cooldown -> idle.
+
+    After a click the monitor waits `settle_delay` for the page to react,
+    then only the clicked area is re-checked each tick until the button is
+    gone (verified) or `verify_timeout` runs out (unverified, back to idle so
+    it can be clicked again). A verified click is followed by `cooldown`
+    during which the monitor isn't scanned at all."""
+
+    IDLE = "idle"
+    CLICKED = "clicked"
+    VERIFYING = "verifying"
+    COOLDOWN = "cooldown"
+
+    def __init__(self, settle_delay=0.3, verify_timeout=3.0, cooldown=1.5):
+        self.settle_delay = settle_delay
+        self.verify_timeout = verify_timeout
+        self.cooldown = cooldown
+        self.state = self.IDLE
+        self.clicked_at = 0.0
+        self.state_until = 0.0
+        self.click_rect = None  # Global (left, top, width, height) to re-check
+        self.scale = None
+        self.rule_index = 0  # Which detection rule's template to look for
+        self.last_outcome = None  # (verified, seconds since click) of the latest finished click
+        self.clicks = 0
+        self.verified = 0
+        self.unverified = 0
+
+    def record_click(self, click_rect, scale, rule_index=0, now=None):
+        now = time.monotonic() if now is None else now
+        self.clicks += 1
+        self.rule_index = rule_index
+        self.state = self.CLICKED
+        self.clicked_at = now
+        self.state_until = now + self.settle_delay
+        self.click_rect = click_rect
+        self.scale = scale
+
+    def next_action(self, now=None):
+        """Return "detect" (normal scan), "verify" (re-check `click_rect`
+        only) or "skip" (leave the monitor alone this tick)."""
+        now = time.monotonic() if now is None else now
+        if self.state == self.CLICKED and now >= self.state_until:
+            self.state = self.VERIFYING
+        if self.state == self.VERIFYING and now - self.clicked_at >= self.verify_timeout:
+            self.finish(False, now)
+        if self.state == self.COOLDOWN and now >= self.state_until:
+            self.state = self.IDLE
+        if self.state == self.IDLE:
+            return "detect"
+        return "verify" if self.state == self.VERIFYING else "skip"
+
+    def record_verification(self, button_present, now=None):
+        now = time.monotonic() if now is None else now
+        if self.state == self.VERIFYING and not button_present:
+            self.finish(True, now)
+
+    def finish(self, verified, now):
+        if verified:
+            self.verified += 1
+            self.state = self.COOLDOWN
+            self.state_until = now + self.cooldown
+        else:
+            self.unverified += 1
+            self.state = self.IDLE
+        self.last_outcome = (verified, now - self.clicked_at)
+        self.click_rect = None
+
+    def reset(self):
+        # Drop a pending click without counting it, e.g. when the rule it belongs to was replaced
+        if self.state != self.IDLE:
+            self.state = self.IDLE
+            self.click_rect = None
+
+    def take_outcome(self):
+        outcome, self.last_outcome = self.last_outcome, None
+        return outcome
+
+    def stats(self):
+        finished = self.verified + self.unverified
+        return {
+            "clicks": self.clicks,
+            "verified": self.verified,
+            "unverified": self.unverified,
+            "success_rate": self.verified / finished if finished else 0.0,
+        }
+
+class AutoContinueTemplateBank:
+    """Button templates pre-scaled for common browser zoom / OS scaling
+    factors, built once and cached on disk next to the settings."""
+
+    DEFAULT_SCALES = DEFAULT_TEMPLATE_SCALES
+    REFERENCE_DPI = 96.0
+
+    def __init__(self, button_image_path, scales=DEFAULT_SCALES, cache_path=None):
+        self.button_image_path = button_image_path
+        self.scales = sorted(set(float(scale) for scale in scales) | {1.0})
+        self.cache_path = cache_path
+        self.templates = {}
+        self.load_or_build()
+
+    def source_hash(self):
+        with open(self.button_image_path, 'rb') as f:
+            digest = hashlib.sha1(f.read())
+        digest.update(repr(self.scales).encode())
+        return digest.hexdigest()
+
+    def load_or_build(self):
+        source_hash = self.source_hash()
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                with np.load(self.cache_path) as cache:
+                    if str(cache['source_hash']) == source_hash:
+                        self.templates = {scale: cache[f'scale_{i}'] for i, scale in enumerate(self.scales)}
+                        return
+            except Exception as e:
+                logging.warning(f"Ignoring unreadable template cache {self.cache_path}: {e}")
+
+        base = cv2.imread(self.button_image_path, 0)
+        for scale in self.scales:
+            if scale == 1.0:
+                self.templates[scale] = base
+            else:
+                interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+                self.templates[scale] = cv2.resize(base, None, fx=scale, fy=scale, interpolation=interpolation)
+
+        if self.cache_path:
+            try:
+                arrays = {f'scale_{i}': self.templates[scale] for i, scale in enumerate(self.scales)}
+                np.savez_compressed(self.cache_path, source_hash=np.array(source_hash), **arrays)
+            except Exception as e:
+                logging.warning(f"Could not write template cache {self.cache_path}: {e}")
+
+    def scale_for_monitor(self, monitor):
+        # screeninfo only reports physical size, so this is a first guess that hits refine
+        width_mm = getattr(monitor, "width_mm", None)
+        if not width_mm:
+            return 1.0
+        dpi = monitor.width * 25.4 / width_mm
+        return min(self.scales, key=lambda scale: abs(scale - dpi / self.REFERENCE_DPI))
+
+class AutoContinueDetectionRule:
+    """A template to look for and what to do when it shows up: "click" it,
+    "notify" the user only, or press `hotkey` (e.g. "ctrl+shift+r"). After
+    firing on a monitor the rule is left out of that monitor's matching for
+    `cooldown` seconds."""
+
+    ACTIONS = RULE_ACTIONS
+
+    def __init__(self, name, template_bank, threshold=0.8, action="click", hotkey="", cooldown=0.0):
+        if action not in self.ACTIONS:
+            raise ValueError(f"Unknown action {action!r} for detection rule {name!r}")
+        if action == "hotkey" and not hotkey:
+            raise ValueError(f"Detection rule {name!r} has no hotkey to press")
+        self.name = name
+        self.template_bank = template_bank
+        self.threshold = threshold
+        self.action = action
+        self.hotkey = hotkey
+        self.cooldown = cooldown
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Build a rule from a settings entry with a resolved `template` path
+        plus the bank's `scales` and `cache_path`."""
+        action = spec.get("action", "click")
+        template_bank = AutoContinueTemplateBank(spec["template"], spec.get("scales", AutoContinueTemplateBank.DEFAULT_SCALES),
+                                                 spec.get("cache_path"))
+        # Clicks are held back by the click verifier; the other actions would fire every tick without a cooldown
+        default_cooldown = 0.0 if action == "click" else 30.0
+        return cls(spec.get("name") or os.path.basename(spec["template"]), template_bank, float(spec.get("threshold", 0.8)),
+                   action, spec.get("hotkey", ""), float(spec.get("cooldown", default_cooldown)))
+
+    def spec(self):
+        # Plain data, so the rule can be rebuilt in the detection worker process
+        return {
+            "name": self.name,
+            "template": self.template_bank.button_image_path,
+            "scales": list(self.template_bank.scales),
+            "cache_path": self.template_bank.cache_path,
+            "threshold": self.threshold,
+            "action": self.action,
+            "hotkey": self.hotkey,
+            "cooldown": self.cooldown,
+        }
+
+class AutoContinueMonitorTopology:
+    """Caches the monitor layout and its mss capture regions between ticks.
+
+    Monitors keep a stable index across hotplug so `selected_monitors` still
+    points at the same screen; new screens are appended, removed screens leave
+    their index unused."""
+
+    def __init__(self, known_keys=None, recheck_interval=10.0):
+        self.known_keys = list(known_keys or [])
+        self.recheck_interval = recheck_interval  # Cheap safety net when no Qt signal fires
+        self.lock = threading.Lock()
+        self.entries = None
+        self.last_checked = 0.0
+        self.dirty = True
+
+    def monitor_key(self, monitor):
+        name = getattr(monitor, "name", None)
+        return name if name else f"{monitor.x},{monitor.y},{monitor.width}x{monitor.height}"
+
+    def invalidate(self, *args):
+        with self.lock:
+            self.dirty = True
+
+    def get_entries(self):
+        """Return a list of (stable_index, monitor, region) tuples."""
+        with self.lock:
+            now = time.monotonic()
+            if self.entries is None or self.dirty or now - self.last_checked >= self.recheck_interval:
+                from screeninfo import get_monitors
+                entries = self.build_entries(get_monitors())
+                if self.entries is not None and entries != self.entries:
+                    logging.info("Monitor layout changed, refreshed cached topology")
+                self.entries = entries
+                self.dirty = False
+                self.last_checked = now
+            return self.entries
+
+    def build_entries(self, monitors):
+        entries = []
+        for monitor in monitors:
+            key = self.monitor_key(monitor)
+            if key not in self.known_keys:
+                self.known_keys.append(key)
+            region = {
+                "top": monitor.y,
+                "left": monitor.x,
+                "width": monitor.width,
+                "height": monitor.height
+            }
+            entries.append((self.known_keys.index(key), monitor, region))
+        entries.sort(key=lambda entry: entry[0])
+        return entries
+
+    def get_known_keys(self):
+        with self.lock:
+            return list(self.known_keys)
+
+def capture_regions_for_monitor(monitor_region, rects):
+    """Turn monitor-relative [left, top, width, height] rectangles into mss
+    capture regions in global coordinates, clipped to the monitor. No
+    rectangles means the whole monitor."""
+    if not rects:
+        return [monitor_region]
+    regions = []
+    for left, top, width, height in rects:
+        right = min(monitor_region["width"], int(left + width))
+        bottom = min(monitor_region["height"], int(top + height))
+        left, top = max(0, int(left)), max(0, int(top))
+        if right - left > 0 and bottom - top > 0:
+            regions.append({
+                "top": monitor_region["top"] + top,
+                "left": monitor_region["left"] + left,
+                "width": right - left,
+                "height": bottom - top
+            })
+    return regions
+
+class AutoContinueScreenCapture:
+    """Thread-local mss instances; mss holds per-thread display handles, so
+    every thread that grabs the screen gets its own."""
+
+    def __init__(self, stage_stats=None):
+        self.local = threading.local()
+        self.instances = []
+        self.lock = threading.Lock()
+        self.stage_stats = stage_stats or AutoContinueStageStats()
+
+    def get(self):
+        sct = getattr(self.local, "sct", None)
+        if sct is None:
+            import mss
+            sct = mss.mss()
+            self.local.sct = sct
+            with self.lock:
+                self.instances.append(sct)
+        return sct
+
+    def grab(self, region, monitor_index=None):
+        """Return the BGRA frame as a view over mss's own pixel buffer rather
+        than a copy; it stays valid for as long as the array is referenced."""
+        with self.stage_stats.stage(monitor_index, "grab"):
+            raw = self.get().grab(region)
+        with self.stage_stats.stage(monitor_index, "array_conversion"):
+            return np.frombuffer(raw.raw, dtype=np.uint8).reshape(raw.height, raw.width, 4)
+
+    def close(self):
+        with self.lock:
+            for sct in self.instances:
+                try:
+                    sct.close()
+                except Exception as e:
+                    logging.error(f"Error closing screen capture: {e}")
+            self.instances = []
+        self.local = threading.local()
+
+class AutoContinueDetector:
+    """Finds the button, or every rule's template, in BGRA/BGR frames.
+
+    `detect` keeps per-monitor history (change gating, ROI tracking, learned
+    scale) for live monitoring; `detect_frame` treats every frame on its own
+    and searches all scales, which is what batch validation wants. All rules
+    share one change check, grayscale conversion and set of coarse frames per
+    frame, so an extra rule only costs its own template matches."""
+
+    def __init__(self, template_bank=None, match_threshold=0.8, pyramid_levels=2, widen_after_misses=5, stage_stats=None, reuse_buffers=True, rules=None):
+        if rules is None:
+            rules = [AutoContinueDetectionRule("Continue generation", template_bank, match_threshold)]
+        self.rules = list(rules)
+        self.template_bank = self.rules[0].template_bank
+        self.stage_stats = stage_stats or AutoContinueStageStats()
+        self.match_threshold = self.rules[0].threshold
+        self.matcher = AutoContinuePyramidMatcher(levels=pyramid_levels)
+        self.widen_after_misses = widen_after_misses
+        self.hit_trackers = {}  # (state key, rule index) -> AutoContinueHitTracker
+        self.change_detectors = {}
+        self.reuse_buffers = reuse_buffers
+        self.frame_buffers = {}  # monitor_index -> AutoContinueFrameBuffers
+        self.monitor_scales = {}  # (monitor_index, rule index) -> scale of the latest hit
+        self.guessed_scales = {}  # (monitor_index, rule index) -> scale from the monitor's DPI
+        self.scale_misses = {}  # (state key, rule index) -> full scans without a hit since every scale was tried
+        self.unchecked_regions = {}  # (state key, rule index) -> changed areas only matched at the likely scales
+        self.max_unchecked_regions = 8
+        self.missed_changes = set()  # (state key, rule index) of rules left out while the frame changed
+
+    def configure(self, rules=None, pyramid_levels=None):
+        """Apply new settings between detection passes. New rules restart the
+        per-rule history and force a full scan; frame buffers are kept."""
+        if pyramid_levels is not None:
+            self.matcher.levels = pyramid_levels
+        if rules is not None:
+            self.rules = list(rules)
+            self.template_bank = self.rules[0].template_bank
+            self.match_threshold = self.rules[0].threshold
+            self.hit_trackers = {}
+            self.monitor_scales = {}
+            self.guessed_scales = {}
+            self.scale_misses = {}
+            self.unchecked_regions = {}
+            self.missed_changes = set()
+            for change_detector in self.change_detectors.values():
+                change_detector.reset()
+
+    def useful_pyramid_levels(self, limit):
+        """The deepest pyramid, up to `limit`, any rule's templates can still be matched at."""
+        return max(self.matcher.effective_levels(template, limit)
+                   for rule in self.rules for template in rule.template_bank.templates.values())
+
+    def templates_for_monitor(self, monitor_index, monitor, rule_index=0, widen=False):
+        """Return the (scale, template) pairs to try, most likely first: the
+        scale learned from the last hit (else the DPI guess) and 1.0, or
+        with `widen` every scale in the bank."""
+        template_bank = self.rules[rule_index].template_bank
+        key = (monitor_index, rule_index)
+        preferred = self.monitor_scales.get(key)
+        if preferred is None:
+            preferred = self.guessed_scales.get(key)
+            if preferred is None:
+                preferred = template_bank.scale_for_monitor(monitor) if monitor is not None else 1.0
+                self.guessed_scales[key] = preferred
+        # 1.0 as well: the DPI guess is wrong whenever the OS scales pages back to 100%
+        scales = [preferred] + ([1.0] if preferred != 1.0 else [])
+        if widen:
+            scales += [scale for scale in template_bank.scales if scale not in scales]
+        return [(scale, template_bank.templates[scale]) for scale in scales]
+
+    def detect(self, screenshot, monitor_index=0, monitor=None, region_index=None, rule_indices=None):
+        """Return a result dict with `changed` and one `matches` entry per
+        matched rule: its `rule` index, `found`, `score`, the template centre
+        `x`/`y` in frame coordinates and the matching `scale`. The top-level
+        fields repeat the first rule found, else the best-scoring one.
+
+        `rule_indices` limits matching to some rules (default all); a rule
+        left out while the frame changed gets a full scan when it is next
+        included, as the change it missed may have been its button. Frames
+        cut from a capture region pass its `region_index`, so each region
+        keeps its own change and ROI history; the learned scale stays per
+        monitor.
+
+        Changed frames are matched at the likely scales only. The other
+        scales are tried on the whole frame after `widen_after_misses` full
+        scans without a hit, and on areas that changed without a hit once
+        the frame stops changing, so a button at another zoom level is found
+        even on a page that has gone static."""
+        if rule_indices is None:
+            rule_indices = range(len(self.rules))
+        rule_indices = list(rule_indices)
+        if not rule_indices:
+            return combine_matches(False, [])
+        state_key = monitor_index if region_index is None else (monitor_index, region_index)
+        buffers = self.buffers_for_monitor(state_key)
+        change_detector = self.change_detectors.get(state_key)
+        if change_detector is None:
+            change_detector = self.change_detectors[state_key] = AutoContinueFrameChangeDetector(buffers=buffers)
+        likely = {rule_index: self.templates_for_monitor(monitor_index, monitor, rule_index) for rule_index in rule_indices}
+        pad_height = max(template.shape[0] for templates in likely.values() for scale, template in templates)
+        pad_width = max(template.shape[1] for templates in likely.values() for scale, template in templates)
+        stats = self.stage_stats
+        with stats.stage(monitor_index, "change_detect"):
+            regions = change_detector.dirty_regions(screenshot, pad_width, pad_height)
+        frame_height, frame_width = screenshot.shape[:2]
+        if regions != []:
+            self.missed_changes.update((state_key, rule_index) for rule_index in range(len(self.rules))
+                                       if rule_index not in rule_indices)
+
+        # Per rule: (regions to scan, None for the whole frame; templates; whether this is a widened pass)
+        plans = []
+        for rule_index in rule_indices:
+            widen_key = (state_key, rule_index)
+            missed = widen_key in self.missed_changes
+            self.missed_changes.discard(widen_key)
+            if self.scale_misses.get(widen_key, 0) >= self.widen_after_misses:
+                plans.append((rule_index, None, self.templates_for_monitor(monitor_index, monitor, rule_index, widen=True), True))
+            elif missed:
+                # Cooling down (or otherwise left out) while the frame changed
+                plans.append((rule_index, None, likely[rule_index], False))
+            elif regions is None or regions:
+                plans.append((rule_index, regions, likely[rule_index], False))
+            elif widen_key in self.unchecked_regions:
+                # The frame settled; look for the other scales where it changed without a hit
+                likely_scales = {scale for scale, template in likely[rule_index]}
+                templates = [(scale, template) for scale, template in
+                             self.templates_for_monitor(monitor_index, monitor, rule_index, widen=True) if scale not in likely_scales]
+                unchecked = [region for region in self.unchecked_regions.pop(widen_key)
+                             if region[0] < frame_width and region[1] < frame_height]
+                if unchecked:
+                    plans.append((rule_index, unchecked, templates, True))
+        if not plans:
+            return combine_matches(False, [])  # Nothing changed since the last tick
+
+        gray_screenshot = pyramid = None
+        gray_regions = {}  # id of a region list -> [(left, top, gray, pyramid)]
+        with stats.stage(monitor_index, "grayscale"):
+            for rule_index, scan_regions, templates, widened in plans:
+                if scan_regions is None and gray_screenshot is None:
+                    gray_screenshot = to_gray(screenshot, gray_buffer(buffers, "gray", screenshot))
+                    pyramid = AutoContinueFramePyramid(self.matcher, gray_screenshot, buffers)
+                elif scan_regions is not None and id(scan_regions) not in gray_regions:
+                    name = "region" if scan_regions is regions else ("unchecked", rule_index)
+                    converted = []
+                    for i, (left, top, width, height) in enumerate(scan_regions):
+                        region = screenshot[top:top + height, left:left + width]
+                        gray_region = to_gray(region, gray_buffer(buffers, ("gray", name, i), region))
+                        converted.append((left, top, gray_region, AutoContinueFramePyramid(self.matcher, gray_region, buffers, (name, i))))
+                    gray_regions[id(scan_regions)] = converted
+
+        matches = []
+        with stats.stage(monitor_index, "match"):
+            for rule_index, scan_regions, templates, widened in plans:
+                threshold = self.rules[rule_index].threshold
+                tracker = self.hit_trackers.setdefault((state_key, rule_index), AutoContinueHitTracker())
+                widen_key = (state_key, rule_index)
+                match = None
+                best_val = -1.0
+                for scale, template in templates:
+                    if template.shape[0] > frame_height or template.shape[1] > frame_width:
+                        continue  # Capture region drawn smaller than the template at this scale
+                    if scan_regions is None:
+                        max_val, max_loc = self.find_button(gray_screenshot, tracker, template, buffers, threshold, pyramid)
+                    else:
+                        max_val, max_loc = self.find_button_in_regions(gray_regions[id(scan_regions)], tracker, template, buffers, threshold)
+                    best_val = max(best_val, max_val)
+
+                    if max_val > threshold:
+                        self.monitor_scales[(monitor_index, rule_index)] = scale
+                        self.scale_misses[widen_key] = 0
+                        self.unchecked_regions.pop(widen_key, None)
+                        match = detection_result(True, True, max_val, max_loc, template, scale)
+                        break
+                if match is None:
+                    self.record_scale_miss(widen_key, scan_regions, widened, frame_width, frame_height)
+                    match = detection_result(True, score=best_val)
+                match["rule"] = rule_index
+                matches.append(match)
+        if any(match["found"] for match in matches):
+            # Re-check the whole frame next tick in case the action didn't take
+            change_detector.reset()
+        return combine_matches(regions != [], matches)
+
+    def record_scale_miss(self, widen_key, scan_regions, widened, frame_width, frame_height):
+        if widened:
+            # Every scale has now been tried there
+            if scan_regions is None:
+                self.scale_misses[widen_key] = 0
+                self.unchecked_regions.pop(widen_key, None)
+        elif scan_regions is None:
+            # Counted per full scan; a small changed area says little about the scale
+            if widen_key not in self.scale_misses:
+                # The first frame may be the last change for a while
+                self.unchecked_regions[widen_key] = [(0, 0, frame_width, frame_height)]
+            self.scale_misses[widen_key] = self.scale_misses.get(widen_key, 0) + 1
+        else:
+            unchecked = self.unchecked_regions.setdefault(widen_key, [])
+            unchecked.extend(scan_regions)
+            if len(unchecked) > self.max_unchecked_regions:
+                left = min(region[0] for region in unchecked)
+                top = min(region[1] for region in unchecked)
+                right = max(region[0] + region[2] for region in unchecked)
+                bottom = max(region[1] + region[3] for region in unchecked)
+                unchecked[:] = [(left, top, right - left, bottom - top)]
+
+    def button_present(self, frame, scale, rule_index=0):
+        """Stateless check of a small frame (the area around a click) for a
+        rule's template at one scale, used to verify that a click took."""
+        rule = self.rules[rule_index]
+        template = rule.template_bank.templates[scale]
+        if template.shape[0] > frame.shape[0] or template.shape[1] > frame.shape[1]:
+            return False
+        result = cv2.matchTemplate(to_gray(frame), template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, _ = cv2.minMaxLoc(result)
+        return max_val > rule.threshold
+
+    def detect_frame(self, frame):
+        gray = to_gray(frame)
+        pyramid = AutoContinueFramePyramid(self.matcher, gray)
+        matches = []
+        for rule_index, rule in enumerate(self.rules):
+            best = detection_result(True)
+            for scale, template in rule.template_bank.templates.items():
+                if template.shape[0] > gray.shape[0] or template.shape[1] > gray.shape[1]:
+                    continue
+                max_val, max_loc = self.matcher.match(gray, template, rule.threshold, pyramid=pyramid)
+                if best["score"] is None or max_val > best["score"]:
+                    if max_val > rule.threshold:
+                        best = detection_result(True, True, max_val, max_loc, template, scale)
+                    else:
+                        best = detection_result(True, score=max_val)
+            best["rule"] = rule_index
+            matches.append(best)
+        return combine_matches(True, matches)
+
+    def buffers_for_monitor(self, state_key):
+        if not self.reuse_buffers:
+            return None
+        buffers = self.frame_buffers.get(state_key)
+        if buffers is None:
+            buffers = self.frame_buffers[state_key] = AutoContinueFrameBuffers()
+        return buffers
+
+    def find_button(self, gray_screenshot, tracker, template, buffers=None, threshold=None, pyramid=None):
+        threshold = self.match_threshold if threshold is None else threshold
+        template_height, template_width = template.shape[:2]
+        frame_height, frame_width = gray_screenshot.shape[:2]
+
+        if not tracker.should_full_scan():
+            tracker.ticks_since_full_scan += 1
+            for left, top, width, height in tracker.candidate_rois(frame_width, frame_height, template_width, template_height):
+                roi = gray_screenshot[top:top + height, left:left + width]
+                result = cv2.matchTemplate(roi, template, cv2.TM_CCOEFF_NORMED)
+                _, max_val, _, max_loc = cv2.minMaxLoc(result)
+                if max_val > threshold:
+                    location = (left + max_loc[0], top + max_loc[1])
+                    tracker.roi_hits += 1
+                    tracker.record_hit(location, template_width, template_height)
+                    return max_val, location
+            tracker.record_roi_miss()
+
+        # Fall back to scanning the whole frame on a miss or every Nth tick
+        tracker.full_scans += 1
+        tracker.ticks_since_full_scan = 0
+        max_val, max_loc = self.matcher.match(gray_screenshot, template, threshold, buffers, pyramid)
+        if max_val > threshold:
+            tracker.record_hit(max_loc, template_width, template_height)
+        return max_val, max_loc
+
+    def find_button_in_regions(self, gray_regions, tracker, template, buffers=None, threshold=None):
+        threshold = self.match_threshold if threshold is None else threshold
+        template_height, template_width = template.shape[:2]
+        best_val, best_loc = -1.0, (0, 0)
+        for left, top, gray_region, pyramid in gray_regions:
+            if gray_region.shape[1] < template_width or gray_region.shape[0] < template_height:
+                continue
+            max_val, max_loc = self.matcher.match(gray_region, template, threshold, buffers, pyramid)
+            if max_val > best_val:
+                best_val, best_loc = max_val, (left + max_loc[0], top + max_loc[1])
+        if best_val > threshold:
+            tracker.record_hit(best_loc, template_width, template_height)
+        return best_val, best_loc
+
+    def get_change_stats(self):
+        return {monitor_index: detector.stats() for monitor_index, detector in self.change_detectors.items()}
+
+    def get_roi_stats(self):
+        # Summed over rules, keyed like the other stats
+        totals = {}
+        for (state_key, rule_index), tracker in self.hit_trackers.items():
+            entry = totals.setdefault(state_key, {"roi_hits": 0, "roi_misses": 0, "full_scans": 0, "tracked_locations": 0})
+            for name, value in tracker.stats().items():
+                if name in entry:
+                    entry[name] += value
+        for entry in totals.values():
+            lookups = entry["roi_hits"] + entry["roi_misses"]
+            entry["roi_hit_rate"] = entry["roi_hits"] / lookups if lookups else 0.0
+        return totals
+
+    def get_buffer_stats(self):
+        return {monitor_index: buffers.stats() for monitor_index, buffers in self.frame_buffers.items()}
+
+def run_detection_job(capture, detector, job):
+    """Grab and match one job: ("detect", monitor_index, region, monitor,
+    region_index[, rule_indices]) returns the detection result dict,
+    ("verify", monitor_index, region, scale[, rule_index]) whether the
+    template is still there."""
+    kind, monitor_index, region = job[:3]
+    screenshot = capture.grab(region, monitor_index)
+    if kind == "verify":
+        return detector.button_present(screenshot, job[3], job[4] if len(job) > 4 else 0)
+    return detector.detect(screenshot, monitor_index, job[3], job[4], job[5] if len(job) > 5 else None)
+
+def to_gray(frame, dst=None):
+    if frame.ndim == 2:
+        return frame
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=dst)
+
+def gray_buffer(buffers, name, frame):
+    if buffers is None or frame.ndim == 2:
+        return None
+    return buffers.get(name, frame.shape[:2])
+
+def result_buffer(buffers, name, image, template):
+    # matchTemplate writes a (H - h + 1) x (W - w + 1) float32 score map
+    if buffers is None:
+        return None
+    shape = (image.shape[0] - template.shape[0] + 1, image.shape[1] - template.shape[1] + 1)
+    return buffers.get(name, shape, np.float32)
+
+def detection_result(changed, found=False, score=None, location=None, template=None, scale=None):
+    result = {"changed": changed, "found": found, "score": None if score is None else float(score),
+              "x": None, "y": None, "scale": scale}
+    if location is not None and template is not None:
+        result["x"] = int(location[0] + template.shape[1] // 2)
+        result["y"] = int(location[1] + template.shape[0] // 2)
+    return result
+
+def combine_matches(changed, matches):
+    # The top level mirrors the first rule found, else the best score, so single-rule callers can ignore `matches`
+    found = [match for match in matches if match["found"]]
+    if found:
+        primary = found[0]
+    elif matches:
+        primary = max(matches, key=lambda match: -1.0 if match["score"] is None else match["score"])
+    else:
+        primary = detection_result(changed)
+    result = dict(primary, changed=changed, matches=matches)
+    result.setdefault("rule", None)
+    return result
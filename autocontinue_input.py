@@ -0,0 +1,252 @@
+"""Click injection for TSTP:Auto Continue.
+
+`pyautogui.click` sleeps for `pyautogui.PAUSE` after every call and leaves
+the cursor on the button. The backends here send the move and the click,
+plus an optional move back to where the cursor was, as one batch:
+
+- win32: a single SendInput call
+- xtest: XTest fake input on X11, flushed with one sync (needs python-xlib)
+- uinput: a virtual absolute pointer, e.g. on Wayland (needs python-evdev and
+  write access to /dev/uinput; the cursor position can't be read, so it
+  isn't restored)
+- pyautogui: the fallback, without the pause
+
+Every backend times its clicks; see `stats`.
+"""
+import logging
+import os
+import sys
+import time
+
+from autocontinue_stats import AutoContinueStageHistogram
+
+BACKENDS = ("auto", "win32", "xtest", "uinput", "pyautogui")
+
+
+class AutoContinueInputBackend:
+    name = "base"
+
+    def __init__(self, restore_cursor=False):
+        self.restore_cursor = restore_cursor
+        self.latency = AutoContinueStageHistogram()
+
+    def click(self, x, y):
+        """Left-click at global screen coordinates; returns the seconds it took."""
+        started = time.perf_counter()
+        self.send_click(int(x), int(y))
+        elapsed = time.perf_counter() - started
+        self.latency.observe(elapsed)
+        return elapsed
+
+    def send_click(self, x, y):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    @property
+    def clicks(self):
+        return self.latency.count
+
+    def stats(self):
+        percentiles = self.latency.percentiles((50, 95))
+        return {
+            "backend": self.name,
+            "clicks": self.latency.count,
+            "mean": self.latency.total / self.latency.count if self.latency.count else None,
+            "p50": percentiles[50],
+            "p95": percentiles[95],
+            "max": max(self.latency.recent) if self.latency.recent else None,
+        }
+
+
+class AutoContinueWin32Input(AutoContinueInputBackend):
+    name = "win32"
+
+    MOUSEEVENTF_MOVE = 0x0001
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+    MOUSEEVENTF_VIRTUALDESK = 0x4000
+    MOUSEEVENTF_ABSOLUTE = 0x8000
+    INPUT_MOUSE = 0
+
+    def __init__(self, restore_cursor=False):
+        super().__init__(restore_cursor)
+        if sys.platform != "win32":
+            raise RuntimeError("The win32 input backend only works on Windows")
+        import ctypes
+        from ctypes import wintypes
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG), ("mouseData", wintypes.DWORD),
+                        ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+        class INPUT(ctypes.Structure):
+            # MOUSEINPUT is the largest member of the INPUT union, so it alone gives the right size
+            _fields_ = [("type", wintypes.DWORD), ("mi", MOUSEINPUT)]
+
+        self.ctypes = ctypes
+        self.wintypes = wintypes
+        self.INPUT = INPUT
+        self.MOUSEINPUT = MOUSEINPUT
+        self.user32 = ctypes.windll.user32
+
+    def mouse_input(self, flags, x=0, y=0):
+        return self.INPUT(self.INPUT_MOUSE, self.MOUSEINPUT(x, y, 0, flags, 0, 0))
+
+    def absolute(self, x, y):
+        # SendInput maps 0..65535 onto the virtual desktop; round up so the pixel lands exactly
+        left, top = self.user32.GetSystemMetrics(76), self.user32.GetSystemMetrics(77)
+        width, height = self.user32.GetSystemMetrics(78), self.user32.GetSystemMetrics(79)
+        return ((x - left) * 65536 + width - 1) // width, ((y - top) * 65536 + height - 1) // height
+
+    def send_click(self, x, y):
+        move = self.MOUSEEVENTF_MOVE | self.MOUSEEVENTF_ABSOLUTE | self.MOUSEEVENTF_VIRTUALDESK
+        inputs = [self.mouse_input(move, *self.absolute(x, y)),
+                  self.mouse_input(self.MOUSEEVENTF_LEFTDOWN),
+                  self.mouse_input(self.MOUSEEVENTF_LEFTUP)]
+        if self.restore_cursor:
+            point = self.wintypes.POINT()
+            if self.user32.GetCursorPos(self.ctypes.byref(point)):
+                inputs.append(self.mouse_input(move, *self.absolute(point.x, point.y)))
+        batch = (self.INPUT * len(inputs))(*inputs)
+        # One call, so no other input can land between the click and the move back
+        if self.user32.SendInput(len(inputs), batch, self.ctypes.sizeof(self.INPUT)) != len(inputs):
+            raise OSError(f"SendInput was blocked (error {self.ctypes.GetLastError()})")
+
+
+class AutoContinueXTestInput(AutoContinueInputBackend):
+    name = "xtest"
+
+    def __init__(self, restore_cursor=False, display_name=None):
+        super().__init__(restore_cursor)
+        try:
+            from Xlib import display
+        except ImportError:
+            raise RuntimeError("The xtest input backend needs python-xlib (pip install python-xlib)")
+        self.display = display.Display(display_name)
+        if not self.display.has_extension("XTEST"):
+            self.display.close()
+            raise RuntimeError("The X server has no XTEST extension")
+        self.root = self.display.screen().root
+
+    def send_click(self, x, y):
+        from Xlib import X
+        from Xlib.ext import xtest
+        original = self.root.query_pointer() if self.restore_cursor else None
+        xtest.fake_input(self.display, X.MotionNotify, x=x, y=y)
+        xtest.fake_input(self.display, X.ButtonPress, 1)
+        xtest.fake_input(self.display, X.ButtonRelease, 1)
+        if original is not None:
+            xtest.fake_input(self.display, X.MotionNotify, x=original.root_x, y=original.root_y)
+        # The requests were only buffered; one round trip sends them together
+        self.display.sync()
+
+    def close(self):
+        try:
+            self.display.close()
+        except Exception as e:
+            logging.error(f"Error closing X display: {e}")
+
+
+class AutoContinueUinputInput(AutoContinueInputBackend):
+    name = "uinput"
+    settle_time = 0.2
+
+    def __init__(self, restore_cursor=False, bounds=None):
+        super().__init__(restore_cursor)
+        try:
+            from evdev import AbsInfo, UInput, ecodes
+        except ImportError:
+            raise RuntimeError("The uinput input backend needs python-evdev (pip install evdev)")
+        if not bounds:
+            raise RuntimeError("The uinput input backend needs the desktop bounds")
+        self.bounds = bounds  # (left, top, width, height) of the whole desktop
+        self.ecodes = ecodes
+        # Shaped like a VM tablet, which compositors map onto the whole desktop
+        capabilities = {
+            ecodes.EV_KEY: [ecodes.BTN_LEFT, ecodes.BTN_RIGHT],
+            ecodes.EV_ABS: [(ecodes.ABS_X, AbsInfo(0, 0, bounds[2] - 1, 0, 0, 0)),
+                            (ecodes.ABS_Y, AbsInfo(0, 0, bounds[3] - 1, 0, 0, 0))],
+        }
+        self.device = UInput(capabilities, name="TSTP Auto Continue pointer")
+        # The compositor only reads the device once udev has announced it; events before that are dropped.
+        # The app creates the backend on the first click and keeps it, so only that click waits.
+        time.sleep(self.settle_time)
+        if restore_cursor:
+            logging.warning("The uinput input backend can't read the cursor position, so it won't be restored")
+
+    def send_click(self, x, y):
+        ecodes = self.ecodes
+        self.device.write(ecodes.EV_ABS, ecodes.ABS_X, x - self.bounds[0])
+        self.device.write(ecodes.EV_ABS, ecodes.ABS_Y, y - self.bounds[1])
+        self.device.syn()
+        self.device.write(ecodes.EV_KEY, ecodes.BTN_LEFT, 1)
+        self.device.syn()
+        self.device.write(ecodes.EV_KEY, ecodes.BTN_LEFT, 0)
+        self.device.syn()
+
+    def close(self):
+        self.device.close()
+
+
+class AutoContinuePyAutoGuiInput(AutoContinueInputBackend):
+    name = "pyautogui"
+
+    def send_click(self, x, y):
+        import pyautogui
+        original = pyautogui.position() if self.restore_cursor else None
+        # _pause=False skips the PAUSE sleep; the fail-safe corner check stays
+        pyautogui.click(x, y, _pause=False)
+        if original is not None:
+            pyautogui.moveTo(original[0], original[1], _pause=False)
+
+
+def enable_dpi_awareness():
+    """Make Windows report physical pixels, the same coordinates mss captures
+    in. Has to run before Qt creates any window: a process's DPI awareness
+    can only be set once, and Qt sets its own on first use."""
+    if sys.platform != "win32":
+        return
+    import ctypes
+    try:
+        ctypes.windll.shcore.SetProcessDpiAwareness(2)  # Per-monitor aware
+    except (AttributeError, OSError) as e:
+        logging.warning(f"Could not enable per-monitor DPI awareness: {e}")
+
+
+def is_wayland_session():
+    return bool(os.environ.get("WAYLAND_DISPLAY")) or os.environ.get("XDG_SESSION_TYPE", "").lower() == "wayland"
+
+
+def candidate_backends():
+    if sys.platform == "win32":
+        return ["win32", "pyautogui"]
+    if sys.platform.startswith("linux"):
+        if is_wayland_session():
+            # DISPLAY may still be set for XWayland, but XTest there only reaches X clients
+            return ["uinput", "xtest", "pyautogui"]
+        if os.environ.get("DISPLAY"):
+            return ["xtest", "uinput", "pyautogui"]
+        return ["uinput", "pyautogui"]
+    return ["pyautogui"]
+
+
+def create_input_backend(name="auto", restore_cursor=False, bounds=None):
+    """Return the requested backend, or for "auto" (and when the requested one
+    can't start) the fastest one that works here, ending with pyautogui."""
+    names = candidate_backends() if name == "auto" else [name, "pyautogui"]
+    for candidate in names:
+        try:
+            if candidate == "win32":
+                return AutoContinueWin32Input(restore_cursor)
+            if candidate == "xtest":
+                return AutoContinueXTestInput(restore_cursor)
+            if candidate == "uinput":
+                return AutoContinueUinputInput(restore_cursor, bounds)
+            if candidate == "pyautogui":
+                return AutoContinuePyAutoGuiInput(restore_cursor)
+            raise RuntimeError(f"Unknown input backend {candidate!r}, expected one of {', '.join(BACKENDS)}")
+        except Exception as e:
+            logging.warning(f"Input backend {candidate} unavailable: {e}")
+    return AutoContinuePyAutoGuiInput(restore_cursor)
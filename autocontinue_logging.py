@@ -0,0 +1,130 @@
+"""Log pipeline for TSTP:Auto Continue.
+
+Standard library only. Loggers only put records on a queue; a listener
+thread writes them to a file that is rotated by size or age, with the old
+segments gzipped. Repeated errors are rate limited before they are queued,
+and how many copies were dropped is logged once the burst's window ends.
+"""
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+
+
+class AutoContinueRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rolls the log over by size or age and gzips the old segments."""
+
+    def __init__(self, filename, max_bytes=5 * 1024 * 1024, backup_count=5, rotate_interval=24 * 3600):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+        self.rotate_interval = rotate_interval
+        self.rollover_at = time.time() + rotate_interval
+        self.namer = lambda name: name + ".gz"
+        self.rotator = compress_log_segment
+
+    def shouldRollover(self, record):
+        if self.rotate_interval and time.time() >= self.rollover_at:
+            return 1
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.rotate_interval
+
+def compress_log_segment(source, dest):
+    # Runs on the queue listener thread, so compression never blocks a logger
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+class AutoContinueRateLimitFilter(logging.Filter):
+    """Lets the first few copies of a repeated error through per time window.
+    How many were dropped is logged through `sink` (the handler the filter is
+    attached to) on the first record of any kind after the window expires,
+    or on `flush(force=True)` at shutdown."""
+
+    def __init__(self, window=60.0, burst=3, min_level=logging.ERROR, sink=None):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.min_level = min_level
+        self.sink = sink
+        self.recent = {}  # (levelno, message) -> [window_start, count, logger name]
+        self.suppressing = set()  # Keys of `recent` with copies dropped in the current window
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if getattr(record, "rate_limit_summary", False):
+            return True
+        now = time.monotonic()
+        self.flush(now)
+        if record.levelno < self.min_level:
+            return True
+        message = record.getMessage()
+        key = (record.levelno, message)
+        with self.lock:
+            entry = self.recent.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                if entry[1] > self.burst:
+                    self.suppressing.add(key)
+                    return False
+                return True
+            self.recent[key] = [now, 1, record.name]
+            if len(self.recent) > 500:
+                self.recent = {k: v for k, v in self.recent.items() if now - v[0] < self.window or k in self.suppressing}
+        return True
+
+    def flush(self, now=None, force=False):
+        """Log a summary for every burst whose window has ended (every burst with `force`)."""
+        now = time.monotonic() if now is None else now
+        summaries = []
+        with self.lock:
+            if not self.suppressing:
+                return
+            for key in list(self.suppressing):
+                window_start, count, name = self.recent[key]
+                if force or now - window_start >= self.window:
+                    self.suppressing.discard(key)
+                    del self.recent[key]
+                    levelno, message = key
+                    summaries.append(logging.makeLogRecord({
+                        "name": name, "levelno": levelno, "levelname": logging.getLevelName(levelno),
+                        "msg": f"{message} (suppressed {count - self.burst} repeats in the previous {self.window:.0f}s)",
+                        "rate_limit_summary": True,
+                    }))
+        for summary in summaries:
+            if self.sink is not None:
+                self.sink(summary)
+
+class AutoContinueLogListener(logging.handlers.QueueListener):
+    """Queue listener that logs the rate limiter's pending summaries before it stops."""
+
+    def __init__(self, queue, *handlers, rate_limit=None, **kwargs):
+        super().__init__(queue, *handlers, **kwargs)
+        self.rate_limit = rate_limit
+
+    def stop(self):
+        if self.rate_limit is not None:
+            self.rate_limit.flush(force=True)
+        super().stop()
+
+def setup_logging(log_path):
+    """Route all logging through a queue so callers never wait on file I/O;
+    a background listener thread writes, rotates and compresses the file."""
+    file_handler = AutoContinueRotatingFileHandler(log_path)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    rate_limit = AutoContinueRateLimitFilter(sink=queue_handler.handle)
+    queue_handler.addFilter(rate_limit)
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    listener = AutoContinueLogListener(queue_handler.queue, file_handler, rate_limit=rate_limit, respect_handler_level=True)
+    listener.start()
+    return listener
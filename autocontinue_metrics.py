@@ -0,0 +1,307 @@
+"""Prometheus metrics endpoint for TSTP:Auto Continue.
+
+Standard library only. The monitor thread updates an `AutoContinueMetrics`
+registry with plain counter bumps; `AutoContinueMetricsServer` renders it in
+the Prometheus text format from its own daemon thread, so a slow scrape never
+holds up a detection tick. It only listens on localhost:
+
+    curl http://127.0.0.1:9464/metrics
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from autocontinue_startup import current_rss_bytes
+from autocontinue_stats import AutoContinueStageHistogram
+
+SCORE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def monitor_label(monitor_index):
+    # 1-based like the tray and the log; tick-wide stages have no monitor
+    return "all" if monitor_index is None else str(monitor_index + 1)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class AutoContinueMetrics:
+    """Counters and gauges shared between the monitor thread, the tray and
+    the metrics server. Stage latency histograms come from `stage_stats`."""
+
+    def __init__(self, stage_stats=None):
+        self.stage_stats = stage_stats
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.ticks = 0
+        self.clicks = {}  # monitor_index -> clicks
+        self.click_outcomes = {}  # (monitor_index, "verified" | "unverified") -> clicks
+        self.rule_actions = {}  # (monitor_index, rule name, action) -> times fired
+        self.click_latencies = {}  # input backend name -> AutoContinueStageHistogram
+        self.scores = {}  # monitor_index -> [bucket counts..., +Inf], sum, count, last
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.watchdog_restarts = 0
+        self.worker_restarts = 0
+        self.stalls = {}  # "stalled" | "died" -> count
+        self.stall_detect_seconds = 0.0
+        self.stall_recover_seconds = 0.0
+        self.worker_restart_seconds = 0.0
+        self.governor = None  # Latest AutoContinueCpuGovernor.status()
+        self.governor_decisions = 0
+        self.monitoring = False
+
+    def record_tick(self):
+        with self.lock:
+            self.ticks += 1
+
+    def record_click(self, monitor_index):
+        with self.lock:
+            self.clicks[monitor_index] = self.clicks.get(monitor_index, 0) + 1
+
+    def record_click_outcome(self, monitor_index, verified):
+        key = (monitor_index, "verified" if verified else "unverified")
+        with self.lock:
+            self.click_outcomes[key] = self.click_outcomes.get(key, 0) + 1
+
+    def record_click_latency(self, backend, seconds):
+        with self.lock:
+            histogram = self.click_latencies.get(backend)
+            if histogram is None:
+                histogram = self.click_latencies[backend] = AutoContinueStageHistogram()
+            histogram.observe(seconds)
+
+    def record_rule_action(self, monitor_index, rule_name, action):
+        key = (monitor_index, rule_name, action)
+        with self.lock:
+            self.rule_actions[key] = self.rule_actions.get(key, 0) + 1
+
+    def record_score(self, monitor_index, score):
+        if score is None:
+            return  # Frame unchanged, nothing was matched
+        with self.lock:
+            entry = self.scores.get(monitor_index)
+            if entry is None:
+                entry = self.scores[monitor_index] = {"buckets": [0] * (len(SCORE_BUCKETS) + 1), "sum": 0.0, "count": 0, "last": 0.0}
+            index = 0
+            while index < len(SCORE_BUCKETS) and score > SCORE_BUCKETS[index]:
+                index += 1
+            entry["buckets"][index] += 1
+            entry["sum"] += score
+            entry["count"] += 1
+            entry["last"] = score
+
+    def record_error(self, consecutive_errors):
+        with self.lock:
+            self.errors += 1
+            self.consecutive_errors = consecutive_errors
+
+    def reset_consecutive_errors(self):
+        self.consecutive_errors = 0
+
+    def record_watchdog_restart(self):
+        with self.lock:
+            self.watchdog_restarts += 1
+
+    def record_stall(self, reason, detect_seconds):
+        with self.lock:
+            self.stalls[reason] = self.stalls.get(reason, 0) + 1
+            self.stall_detect_seconds = detect_seconds
+
+    def record_stall_recovery(self, recover_seconds):
+        self.stall_recover_seconds = recover_seconds
+
+    def record_worker_restart(self, latency):
+        with self.lock:
+            self.worker_restarts += 1
+            self.worker_restart_seconds = latency or 0.0
+
+    def set_governor(self, status):
+        self.governor = status
+
+    def record_governor_decision(self):
+        with self.lock:
+            self.governor_decisions += 1
+
+    def set_monitoring(self, monitoring):
+        self.monitoring = monitoring
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        with self.lock:
+            ticks = self.ticks
+            clicks = dict(self.clicks)
+            click_outcomes = dict(self.click_outcomes)
+            rule_actions = dict(self.rule_actions)
+            click_latencies = {backend: (histogram.buckets, list(histogram.counts), histogram.total, histogram.count)
+                               for backend, histogram in self.click_latencies.items()}
+            scores = {key: dict(entry, buckets=list(entry["buckets"])) for key, entry in self.scores.items()}
+            errors = self.errors
+            consecutive_errors = self.consecutive_errors
+            watchdog_restarts = self.watchdog_restarts
+            worker_restarts = self.worker_restarts
+            stalls = dict(self.stalls)
+            stall_detect_seconds = self.stall_detect_seconds
+            stall_recover_seconds = self.stall_recover_seconds
+            worker_restart_seconds = self.worker_restart_seconds
+            governor = self.governor
+            governor_decisions = self.governor_decisions
+            monitoring = self.monitoring
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{key}="{escape_label(label)}"' for key, label in labels)
+                lines.append(f"{name}{suffix}{{{label_text}}} {format_value(value)}" if label_text
+                             else f"{name}{suffix} {format_value(value)}")
+
+        metric("autocontinue_monitoring", "gauge", "1 while monitoring is enabled.", [("", (), int(monitoring))])
+        metric("autocontinue_ticks_total", "counter", "Detection ticks completed.", [("", (), ticks)])
+        metric("autocontinue_clicks_total", "counter", "Continue buttons clicked, per monitor.",
+               [("", (("monitor", monitor_label(index)),), count) for index, count in sorted(clicks.items())])
+        metric("autocontinue_click_outcomes_total", "counter",
+               "Clicks whose button disappeared (verified) or was still there after the timeout (unverified).",
+               [("", (("monitor", monitor_label(index)), ("outcome", outcome)), count)
+                for (index, outcome), count in sorted(click_outcomes.items())])
+        metric("autocontinue_rule_actions_total", "counter", "Detection rules fired, per monitor, rule and action.",
+               [("", (("monitor", monitor_label(index)), ("rule", rule), ("action", action)), count)
+                for (index, rule, action), count in sorted(rule_actions.items())])
+
+        latency_samples = []
+        for backend, (buckets, counts, total, count) in sorted(click_latencies.items()):
+            label = ("backend", backend)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                latency_samples.append(("_bucket", (label, ("le", format_value(bound))), cumulative))
+            latency_samples.append(("_sum", (label,), total))
+            latency_samples.append(("_count", (label,), count))
+        metric("autocontinue_click_duration_seconds", "histogram",
+               "Time to inject one click, per input backend.", latency_samples)
+
+        score_samples = []
+        last_samples = []
+        for index, entry in sorted(scores.items()):
+            label = ("monitor", monitor_label(index))
+            cumulative = 0
+            for bound, count in zip(SCORE_BUCKETS + (float("inf"),), entry["buckets"]):
+                cumulative += count
+                score_samples.append(("_bucket", (label, ("le", format_value(bound))), cumulative))
+            score_samples.append(("_sum", (label,), entry["sum"]))
+            score_samples.append(("_count", (label,), entry["count"]))
+            last_samples.append(("", (label,), entry["last"]))
+        metric("autocontinue_match_score", "histogram", "Best template match score per matched frame.", score_samples)
+        metric("autocontinue_last_match_score", "gauge", "Best match score of the latest matched frame.", last_samples)
+
+        stage_samples = []
+        snapshot = self.stage_stats.snapshot() if self.stage_stats else {}
+        for (index, stage), stats in sorted(snapshot.items(), key=lambda item: (monitor_label(item[0][0]), item[0][1])):
+            labels = (("monitor", monitor_label(index)), ("stage", stage))
+            cumulative = 0
+            for bound, count in stats["buckets"]:
+                cumulative += count
+                stage_samples.append(("_bucket", labels + (("le", format_value(bound)),), cumulative))
+            stage_samples.append(("_sum", labels, stats["sum"]))
+            stage_samples.append(("_count", labels, stats["count"]))
+        metric("autocontinue_stage_duration_seconds", "histogram",
+               "Hot-path stage latency; only recorded while instrumentation is enabled.", stage_samples)
+
+        metric("autocontinue_errors_total", "counter", "Monitoring loop errors.", [("", (), errors)])
+        metric("autocontinue_consecutive_errors", "gauge", "Current run of consecutive monitoring errors.",
+               [("", (), consecutive_errors)])
+        metric("autocontinue_watchdog_restarts_total", "counter", "Monitor thread restarts by the watchdog.",
+               [("", (), watchdog_restarts)])
+        metric("autocontinue_stalls_total", "counter", "Monitor threads found hung (stalled) or dead (died) by the watchdog.",
+               [("", (("reason", reason),), count) for reason, count in sorted(stalls.items())])
+        metric("autocontinue_stall_detect_seconds", "gauge", "Heartbeat age when the latest stall was detected.",
+               [("", (), stall_detect_seconds)])
+        metric("autocontinue_stall_recover_seconds", "gauge", "Time from the latest stall detection to the new thread's first tick.",
+               [("", (), stall_recover_seconds)])
+        metric("autocontinue_worker_restarts_total", "counter", "Detection worker process restarts.",
+               [("", (), worker_restarts)])
+        metric("autocontinue_worker_restart_seconds", "gauge", "How long the latest detection worker restart took.",
+               [("", (), worker_restart_seconds)])
+        if governor is not None:
+            metric("autocontinue_cpu_budget_ratio", "gauge", "CPU budget for detection as a fraction of one core; 0 is unlimited.",
+                   [("", (), governor["budget"])])
+            metric("autocontinue_cpu_usage_ratio", "gauge", "Detection CPU seconds per second over the governor's window.",
+                   [("", (), governor["usage"])])
+            metric("autocontinue_cpu_seconds_per_tick", "gauge", "Moving average of detection CPU time per tick.",
+                   [("", (), governor["cpu_per_tick"])])
+            metric("autocontinue_governor_level", "gauge", "CPU governor degradation level; 0 is full quality.",
+                   [("", (), governor["level"])])
+            metric("autocontinue_governor_interval_floor_seconds", "gauge", "Shortest tick interval the CPU budget allows.",
+                   [("", (), governor["interval_floor"])])
+        metric("autocontinue_governor_decisions_total", "counter", "CPU governor level changes.",
+               [("", (), governor_decisions)])
+
+        cpu = os.times()
+        metric("process_cpu_seconds_total", "counter", "User and system CPU time spent.", [("", (), cpu.user + cpu.system)])
+        rss = current_rss_bytes()
+        if rss is not None:
+            metric("process_resident_memory_bytes", "gauge", "Resident memory size.", [("", (), rss)])
+        metric("process_start_time_seconds", "gauge", "Start time of the process since the epoch.", [("", (), self.started)])
+        return "\n".join(lines) + "\n"
+
+
+class AutoContinueMetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would drown the application log
+
+
+class AutoContinueMetricsServer:
+    """Serves `metrics` on http://host:port/metrics from a daemon thread.
+    Port 0 picks a free port, see `port` once started."""
+
+    def __init__(self, metrics, host="127.0.0.1", port=9464):
+        self.metrics = metrics
+        self.host = host
+        self.requested_port = port
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1] if self.httpd else None
+
+    def start(self):
+        if self.httpd:
+            return
+        self.httpd = ThreadingHTTPServer((self.host, self.requested_port), AutoContinueMetricsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.metrics = self.metrics
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="AutoContinueMetrics", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.httpd:
+            return
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+        self.httpd = None
+        self.thread = None
@@ -0,0 +1,145 @@
+"""Settings shared by the tray app and the detection core.
+
+Standard library only, so main.py can use these defaults and check
+settings.json without loading OpenCV. `validate_setting` cleans one value
+read from settings.json: numbers are clamped to the range the tray menu
+allows, anything of the wrong shape raises ValueError so the caller can keep
+the value it already has.
+"""
+import logging
+import math
+
+from autocontinue_input import BACKENDS
+
+# Browser zoom / OS scaling factors the button templates are pre-scaled for
+DEFAULT_TEMPLATE_SCALES = (0.75, 1.0, 1.25, 1.5, 1.75, 2.0)
+
+RULE_ACTIONS = ("click", "notify", "hotkey")
+
+
+def clamped_number(key, value, low, high, integer=False):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"expected a number, got {value!r}")
+    if integer:
+        if value != int(value):
+            raise ValueError(f"expected a whole number, got {value!r}")
+        value = int(value)
+    clamped = min(high, max(low, value))
+    if clamped != value:
+        logging.warning(f"{key} {value!r} in settings.json is out of range, using {clamped!r}")
+    return clamped
+
+
+def flag(key, value):
+    if not isinstance(value, bool):
+        raise ValueError(f"expected true or false, got {value!r}")
+    return value
+
+
+def string_list(key, value):
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"expected a list of strings, got {value!r}")
+    return value
+
+
+def monitor_list(key, value):
+    if not isinstance(value, list) or not all(isinstance(index, int) and not isinstance(index, bool) and index >= -1
+                                              for index in value):
+        raise ValueError(f"expected a list of monitor indexes (-1 for all), got {value!r}")
+    return value
+
+
+def capture_regions(key, value):
+    if not isinstance(value, dict):
+        raise ValueError(f"expected an object of monitor index -> rectangles, got {value!r}")
+    for monitor, rects in value.items():
+        if not monitor.isdigit() or not isinstance(rects, list):
+            raise ValueError(f"expected a list of rectangles for monitor {monitor!r}, got {rects!r}")
+        for rect in rects:
+            if (not isinstance(rect, list) or len(rect) != 4
+                    or not all(isinstance(n, int) and not isinstance(n, bool) for n in rect)
+                    or rect[0] < 0 or rect[1] < 0 or rect[2] <= 0 or rect[3] <= 0):
+                raise ValueError(f"expected [left, top, width, height] on monitor {monitor}, got {rect!r}")
+    return value
+
+
+def template_scales(key, value):
+    if not isinstance(value, list) or not value:
+        raise ValueError(f"expected a non-empty list of scales, got {value!r}")
+    return [clamped_number(key, scale, 0.25, 4.0) for scale in value]
+
+
+def detection_rule(rule):
+    """Return a cleaned copy of one detection_rules entry, or raise ValueError."""
+    if not isinstance(rule, dict):
+        raise ValueError(f"expected an object, got {rule!r}")
+    if not isinstance(rule.get("template"), str) or not rule["template"]:
+        raise ValueError("no template")
+    if not isinstance(rule.get("name", ""), str):
+        raise ValueError(f"name {rule['name']!r} is not a string")
+    action = rule.get("action", "click")
+    if action not in RULE_ACTIONS:
+        raise ValueError(f"unknown action {action!r}, expected one of {', '.join(RULE_ACTIONS)}")
+    if action == "hotkey" and (not isinstance(rule.get("hotkey"), str) or not rule["hotkey"].strip()):
+        raise ValueError("no hotkey to press")
+    rule = dict(rule)
+    if "threshold" in rule:
+        rule["threshold"] = clamped_number("threshold", rule["threshold"], 0.0, 1.0)
+    if "cooldown" in rule:
+        rule["cooldown"] = clamped_number("cooldown", rule["cooldown"], 0.0, 86400.0)
+    return rule
+
+
+def detection_rules(key, value):
+    if not isinstance(value, list):
+        raise ValueError(f"expected a list of rules, got {value!r}")
+    rules = []
+    for position, rule in enumerate(value):
+        try:
+            rules.append(detection_rule(rule))
+        except ValueError as e:
+            logging.warning(f"Skipping detection rule {position + 1} in settings.json: {e}")
+    if not rules:
+        raise ValueError("no usable detection rules")
+    return rules
+
+
+def input_backend(key, value):
+    if value not in BACKENDS:
+        raise ValueError(f"unknown input backend {value!r}, expected one of {', '.join(BACKENDS)}")
+    return value
+
+
+def metrics_port(key, value):
+    if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= 65535:
+        raise ValueError(f"expected a port between 1 and 65535, got {value!r}")
+    return value
+
+
+VALIDATORS = {
+    "interval": lambda key, value: clamped_number(key, value, 0.1, 60.0),
+    "min_interval": lambda key, value: clamped_number(key, value, 0.05, 60.0),
+    "pyramid_levels": lambda key, value: clamped_number(key, value, 0, 4, integer=True),
+    "cpu_budget_percent": lambda key, value: clamped_number(key, value, 0, 100, integer=True),
+    "notifications_enabled": flag,
+    "window_targeting": flag,
+    "detection_process": flag,
+    "restore_cursor": flag,
+    "instrumentation_enabled": flag,
+    "metrics_enabled": flag,
+    "selected_monitors": monitor_list,
+    "monitor_keys": string_list,
+    "window_titles": string_list,
+    "window_classes": string_list,
+    "capture_regions": capture_regions,
+    "template_scales": template_scales,
+    "detection_rules": detection_rules,
+    "input_backend": input_backend,
+    "metrics_port": metrics_port,
+}
+
+
+def validate_setting(key, value):
+    """Return `value` cleaned for settings key `key`; raises ValueError if it can't be used."""
+    validator = VALIDATORS.get(key)
+    return validator(key, value) if validator else value
@@ -0,0 +1,76 @@
+"""Startup timing for TSTP:Auto Continue.
+
+Imported first by main.py so it can time every import phase. Only uses the
+standard library (psutil is used for memory when it happens to be installed).
+Run `python main.py --profile-startup` to print the report.
+"""
+import os
+import sys
+import time
+
+
+def current_rss_bytes():
+    """Resident set size of this process, or None if it can't be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        pass
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        except Exception:
+            pass
+    return None
+
+
+class AutoContinueStartupProfiler:
+    """Records elapsed time and resident memory between named phases."""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.last_rss = current_rss_bytes() if enabled else None
+        self.phases = []
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        rss = current_rss_bytes()
+        rss_delta = rss - self.last_rss if rss is not None and self.last_rss is not None else None
+        self.phases.append((name, now - self.last, rss, rss_delta))
+        self.last = now
+        self.last_rss = rss
+
+    def report(self):
+        lines = [f"{'phase':<36} {'time (ms)':>10} {'rss (MB)':>10} {'delta (MB)':>11}"]
+        for name, elapsed, rss, rss_delta in self.phases:
+            rss_text = f"{rss / 1048576:.1f}" if rss is not None else "n/a"
+            delta_text = f"{rss_delta / 1048576:+.1f}" if rss_delta is not None else "n/a"
+            lines.append(f"{name:<36} {elapsed * 1000:>10.1f} {rss_text:>10} {delta_text:>11}")
+        lines.append(f"{'total':<36} {(self.last - self.started) * 1000:>10.1f}")
+        return "\n".join(lines)
+
+
+startup_profiler = AutoContinueStartupProfiler('--profile-startup' in sys.argv)
@@ -0,0 +1,133 @@
+"""Hot-path stage timing for TSTP:Auto Continue.
+
+Standard library only, so the tray can show and toggle instrumentation
+without loading the OpenCV detection stack. Timing is off by default; while
+off, `stage()` hands back a shared no-op context manager and costs one
+attribute check.
+"""
+import threading
+import time
+from collections import deque
+
+# Histogram bucket upper bounds in seconds (0.1 ms .. 2.5 s, then +Inf)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+STAGES = ("grab", "array_conversion", "change_detect", "grayscale", "match", "click", "worker_roundtrip", "tick", "sleep_overshoot")
+
+
+class AutoContinueStageHistogram:
+    """Cumulative bucket counts plus a rolling window of recent samples
+    for percentiles."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=1024):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        index = 0
+        while index < len(self.buckets) and seconds > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.total += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+    def percentiles(self, percents=(50, 95, 99)):
+        samples = sorted(self.recent)
+        if not samples:
+            return {percent: None for percent in percents}
+        return {percent: samples[min(len(samples) - 1, int(len(samples) * percent / 100.0))] for percent in percents}
+
+
+class AutoContinueStageTimer:
+    def __init__(self, stats, monitor_index, stage):
+        self.stats = stats
+        self.monitor_index = monitor_index
+        self.stage = stage
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.record(self.monitor_index, self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class AutoContinueNullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_STAGE = AutoContinueNullStage()
+
+
+class AutoContinueStageStats:
+    """Per-monitor, per-stage latency histograms. `monitor_index` None is used
+    for tick-wide stages such as the tick itself and sleep overshoot."""
+
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS, window=1024):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.window = window
+        self.histograms = {}  # (monitor_index, stage) -> AutoContinueStageHistogram
+        self.lock = threading.Lock()
+
+    def stage(self, monitor_index, stage):
+        if not self.enabled:
+            return NULL_STAGE
+        return AutoContinueStageTimer(self, monitor_index, stage)
+
+    def record(self, monitor_index, stage, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get((monitor_index, stage))
+            if histogram is None:
+                histogram = self.histograms[(monitor_index, stage)] = AutoContinueStageHistogram(self.buckets, self.window)
+            histogram.observe(seconds)
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+    def snapshot(self):
+        """Return {(monitor_index, stage): {count, p50, p95, p99, sum, buckets}} in seconds."""
+        with self.lock:
+            items = [(key, histogram.count, histogram.total, list(histogram.counts), histogram.percentiles())
+                     for key, histogram in self.histograms.items()]
+        snapshot = {}
+        for key, count, total, counts, percentiles in items:
+            snapshot[key] = {
+                "count": count,
+                "sum": total,
+                "buckets": list(zip(self.buckets + (float("inf"),), counts)),
+                "p50": percentiles[50],
+                "p95": percentiles[95],
+                "p99": percentiles[99],
+            }
+        return snapshot
+
+
+class AutoContinueStageRecorder(AutoContinueStageStats):
+    """Collects raw samples instead of histograms, for a process that ships
+    its timings to the one that owns the real `AutoContinueStageStats`."""
+
+    def __init__(self, enabled=False):
+        super().__init__(enabled)
+        self.samples = []
+
+    def record(self, monitor_index, stage, seconds):
+        if self.enabled:
+            self.samples.append((monitor_index, stage, seconds))
+
+    def drain(self):
+        samples, self.samples = self.samples, []
+        return samples
@@ -0,0 +1,182 @@
+"""Out-of-process capture and detection for TSTP:Auto Continue.
+
+`AutoContinueDetectionWorker` runs the Qt-free detection core in a child
+process so a crash in mss or OpenCV, or its memory growth, stays out of the
+tray process. The child grabs and matches the frames itself, so pixels never
+cross the process boundary; only job descriptions and small result dicts
+(hit, coordinates, score, timings) go over the pipe. Clicking stays with the
+caller.
+"""
+import logging
+import multiprocessing
+import time
+
+from autocontinue_stats import AutoContinueStageRecorder
+
+
+class AutoContinueWorkerRestarted(RuntimeError):
+    """The child died or hung during a tick and has been replaced; that
+    tick's results are lost but the worker is ready for the next one."""
+
+
+def worker_main(conn, config):
+    """Child process entry point: build the detection stack, report ready,
+    then answer one request per tick until the pipe closes."""
+    import autocontinue_core as core
+
+    stage_stats = AutoContinueStageRecorder()
+    rules = [core.AutoContinueDetectionRule.from_spec(spec) for spec in config["rules"]]
+    detector = core.AutoContinueDetector(rules=rules, pyramid_levels=config["pyramid_levels"], stage_stats=stage_stats)
+    capture = core.AutoContinueScreenCapture(stage_stats)
+    conn.send({"ready": True})
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                break  # The parent went away
+            if request is None:
+                break
+            stage_stats.enabled = request["instrumentation"]
+            config = request.get("config")
+            if config:
+                rules = config.get("rules")
+                detector.configure(rules=[core.AutoContinueDetectionRule.from_spec(spec) for spec in rules] if rules else None,
+                                   pyramid_levels=config.get("pyramid_levels"))
+            results = []
+            for job in request["jobs"]:
+                try:
+                    results.append(core.run_detection_job(capture, detector, job))
+                except Exception as e:
+                    results.append({"error": str(e)})
+            conn.send({"results": results, "timings": stage_stats.drain(), "cpu": time.process_time()})
+    finally:
+        capture.close()
+
+
+class AutoContinueDetectionWorker:
+    """Parent-side supervisor for `worker_main`. `run` sends one tick's jobs
+    and returns their results in order; a job that failed in the child comes
+    back as an Exception. If the child dies or stops answering it is
+    replaced, the restart time is recorded and the tick raises
+    `AutoContinueWorkerRestarted`."""
+
+    def __init__(self, rule_specs, pyramid_levels=2, reply_timeout=10.0, start_timeout=30.0):
+        self.config = {
+            "rules": list(rule_specs),  # AutoContinueDetectionRule.spec() dicts, rebuilt in the child
+            "pyramid_levels": pyramid_levels,
+        }
+        self.pending_config = {}  # Changes for the running child, sent with the next request
+        self.reply_timeout = reply_timeout
+        self.start_timeout = start_timeout
+        self.context = multiprocessing.get_context("spawn")  # No forking a process that has Qt and threads
+        self.process = None
+        self.conn = None
+        self.start_latency = None
+        self.restarts = 0
+        self.restart_latencies = []
+        self.child_cpu = 0.0  # Latest CPU time reported by the current child
+        self.total_cpu = 0.0  # CPU seconds used by all children so far
+
+    def start(self):
+        started = time.perf_counter()
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=worker_main, args=(child_conn, self.config),
+                                            name="AutoContinueDetection", daemon=True)
+        self.process.start()
+        child_conn.close()
+        if not self.conn.poll(self.start_timeout):
+            self.kill()
+            raise RuntimeError(f"Detection worker did not start within {self.start_timeout:.0f}s")
+        self.conn.recv()
+        self.child_cpu = 0.0  # A new child counts from zero
+        self.start_latency = time.perf_counter() - started
+        logging.info(f"Detection worker started (pid {self.process.pid}) in {self.start_latency:.2f}s")
+        return self.start_latency
+
+    def cpu_time(self):
+        """CPU seconds the children have used, as of their latest replies."""
+        return self.total_cpu
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def configure(self, rule_specs=None, pyramid_levels=None):
+        """Change the rules or pyramid depth without restarting the child; a
+        replacement child starts with them too."""
+        changes = {}
+        if rule_specs is not None:
+            changes["rules"] = list(rule_specs)
+        if pyramid_levels is not None:
+            changes["pyramid_levels"] = pyramid_levels
+        self.config.update(changes)
+        self.pending_config.update(changes)
+
+    def run(self, jobs, stage_stats=None):
+        if not self.is_alive():
+            self.restart("is not running")
+        config, self.pending_config = self.pending_config, {}
+        started = time.perf_counter()
+        try:
+            self.conn.send({"jobs": jobs, "instrumentation": bool(stage_stats and stage_stats.enabled), "config": config})
+            if not self.conn.poll(self.reply_timeout):
+                raise TimeoutError(f"did not answer within {self.reply_timeout:.0f}s")
+            reply = self.conn.recv()
+        except (EOFError, OSError, TimeoutError) as e:
+            reason = f"failed ({e or type(e).__name__})"
+            if self.process is not None and self.process.exitcode is not None:
+                reason = f"exited with code {self.process.exitcode}"
+            latency = self.restart(reason)
+            raise AutoContinueWorkerRestarted(f"Detection worker {reason}; restarted in {latency:.2f}s")
+
+        cpu = reply.get("cpu", 0.0)
+        self.total_cpu += max(0.0, cpu - self.child_cpu)
+        self.child_cpu = cpu
+        if stage_stats is not None:
+            stage_stats.record(None, "worker_roundtrip", time.perf_counter() - started)
+            for monitor_index, stage, seconds in reply["timings"]:
+                stage_stats.record(monitor_index, stage, seconds)
+        results = []
+        for job, result in zip(jobs, reply["results"]):
+            if isinstance(result, dict) and "error" in result:
+                result = Exception(f"Error on monitor {job[1]+1} in detection worker: {result['error']}")
+            results.append(result)
+        return results
+
+    def restart(self, reason):
+        failed_at = time.perf_counter()
+        logging.warning(f"Detection worker {reason}, restarting")
+        self.kill()
+        self.start()
+        latency = time.perf_counter() - failed_at
+        self.restarts += 1
+        self.restart_latencies.append(latency)
+        logging.info(f"Detection worker restarted in {latency:.2f}s")
+        return latency
+
+    def kill(self):
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.kill()
+            self.process.join(5)
+            self.process = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def stop(self):
+        try:
+            if self.is_alive():
+                self.conn.send(None)
+                self.process.join(5)
+        except (EOFError, OSError):
+            pass
+        self.kill()
+
+    def stats(self):
+        return {
+            "start_latency": self.start_latency,
+            "restarts": self.restarts,
+            "last_restart_latency": self.restart_latencies[-1] if self.restart_latencies else None,
+            "mean_restart_latency": sum(self.restart_latencies) / len(self.restart_latencies) if self.restart_latencies else None,
+        }
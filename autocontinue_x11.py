@@ -0,0 +1,272 @@
+"""Window-targeted capture for TSTP:Auto Continue on Linux/X11.
+
+Enumerates top-level windows through EWMH (`_NET_CLIENT_LIST`, or the
+root's children when no window manager runs), keeps the ones whose title
+or WM_CLASS matches the configured rules and reports the parts of them
+that are actually visible, so only those rectangles are grabbed and
+matched. Geometry is cached and refreshed when X reports that
+windows were created, moved, restacked, retitled or closed.
+
+Needs python-xlib (`pip install python-xlib`); it is imported on first use.
+Try it under Xvfb with a dummy window:
+
+    Xvfb :99 -screen 0 1920x1080x24 &
+    DISPLAY=:99 xmessage -geometry 400x200+100+100 -title ChatGPT hello &
+    DISPLAY=:99 python autocontinue_x11.py --title ChatGPT
+"""
+import argparse
+import logging
+import threading
+import time
+
+
+def subtract_rect(rect, occluder):
+    """Return the parts of `rect` not covered by `occluder`, as up to four
+    (left, top, width, height) rectangles."""
+    left, top, width, height = rect
+    right, bottom = left + width, top + height
+    o_left, o_top, o_width, o_height = occluder
+    o_right, o_bottom = o_left + o_width, o_top + o_height
+    if o_left >= right or o_right <= left or o_top >= bottom or o_bottom <= top:
+        return [rect]
+    pieces = []
+    if o_top > top:
+        pieces.append((left, top, width, o_top - top))
+    if o_bottom < bottom:
+        pieces.append((left, o_bottom, width, bottom - o_bottom))
+    middle_top, middle_bottom = max(top, o_top), min(bottom, o_bottom)
+    if o_left > left:
+        pieces.append((left, middle_top, o_left - left, middle_bottom - middle_top))
+    if o_right < right:
+        pieces.append((o_right, middle_top, right - o_right, middle_bottom - middle_top))
+    return pieces
+
+
+def visible_rects(rect, occluders):
+    pieces = [rect]
+    for occluder in occluders:
+        pieces = [piece for current in pieces for piece in subtract_rect(current, occluder)]
+        if not pieces:
+            break
+    return pieces
+
+
+def frame_rect(rect, extents):
+    """Grow a client rectangle by _NET_FRAME_EXTENTS (left, right, top,
+    bottom), so the title bar and borders the WM draws are included."""
+    if not extents:
+        return rect
+    left, right, top, bottom = extents
+    return (rect[0] - left, rect[1] - top, rect[2] + left + right, rect[3] + top + bottom)
+
+
+def intersect_rect(rect, bounds):
+    left, top = max(rect[0], bounds[0]), max(rect[1], bounds[1])
+    right = min(rect[0] + rect[2], bounds[0] + bounds[2])
+    bottom = min(rect[1] + rect[3], bounds[1] + bounds[3])
+    if right <= left or bottom <= top:
+        return None
+    return (left, top, right - left, bottom - top)
+
+
+def rule_matches(title, classes, title_rules, class_rules):
+    # Case-insensitive substring match on the title or either WM_CLASS part
+    title = (title or "").lower()
+    classes = [name.lower() for name in classes if name]
+    if any(rule.lower() in title for rule in title_rules if rule):
+        return True
+    return any(rule.lower() in name for rule in class_rules if rule for name in classes)
+
+
+class AutoContinueWindowTargets:
+    """Cached visible rectangles of matching top-level windows, in root
+    (global) coordinates. Not thread-safe; call from the monitor thread."""
+
+    def __init__(self, title_rules=None, class_rules=None, display_name=None, recheck_interval=5.0, min_size=16):
+        self.title_rules = list(title_rules or [])
+        self.class_rules = list(class_rules or [])
+        self.display_name = display_name
+        self.recheck_interval = recheck_interval  # Safety net for WMs that move frames without telling clients
+        self.min_size = min_size
+        self.display = None
+        self.root = None
+        self.atoms = {}
+        self.watched = set()
+        self.rects = []
+        self.windows = []
+        self.dirty = True
+        self.last_checked = 0.0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        try:
+            from Xlib import X, display
+        except ImportError:
+            raise RuntimeError("Window targeting needs python-xlib (pip install python-xlib)")
+        self.display = display.Display(self.display_name)
+        self.root = self.display.screen().root
+        for name in ("_NET_CLIENT_LIST", "_NET_CLIENT_LIST_STACKING", "_NET_WM_NAME", "UTF8_STRING",
+                     "_NET_WM_STATE", "_NET_WM_STATE_HIDDEN", "_NET_FRAME_EXTENTS"):
+            self.atoms[name] = self.display.intern_atom(name)
+        # Client list changes and restacking show up as root property changes
+        self.root.change_attributes(event_mask=X.PropertyChangeMask | X.SubstructureNotifyMask)
+        self.display.flush()
+
+    def set_rules(self, title_rules, class_rules):
+        with self.lock:
+            self.title_rules = list(title_rules or [])
+            self.class_rules = list(class_rules or [])
+            self.dirty = True
+
+    def invalidate(self):
+        with self.lock:
+            self.dirty = True
+
+    def get_rects(self):
+        """Return [(left, top, width, height), ...] of visible matching window areas."""
+        if self.display is None:
+            self.connect()
+        self.drain_events()
+        with self.lock:
+            now = time.monotonic()
+            if self.dirty or now - self.last_checked >= self.recheck_interval:
+                self.dirty = False
+                self.last_checked = now
+                rects = self.scan()
+                if rects != self.rects:
+                    logging.info(f"Window targets changed: {len(self.windows)} matching windows, {len(rects)} visible areas")
+                self.rects = rects
+            return list(self.rects)
+
+    def drain_events(self):
+        from Xlib import X
+        relevant = (X.ConfigureNotify, X.MapNotify, X.UnmapNotify, X.DestroyNotify, X.CreateNotify, X.PropertyNotify)
+        while self.display.pending_events():
+            event = self.display.next_event()
+            if event.type in relevant:
+                self.dirty = True
+            if event.type == X.DestroyNotify:
+                self.watched.discard(event.window.id)
+
+    def client_windows(self, atom_name):
+        from Xlib import X
+        prop = self.root.get_full_property(self.atoms[atom_name], X.AnyPropertyType)
+        if prop is None:
+            return []
+        return [self.display.create_resource_object("window", window_id) for window_id in prop.value]
+
+    def window_title(self, window):
+        prop = window.get_full_property(self.atoms["_NET_WM_NAME"], self.atoms["UTF8_STRING"])
+        if prop is not None and prop.value:
+            value = prop.value
+            return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+        name = window.get_wm_name()
+        if isinstance(name, bytes):
+            return name.decode("latin-1", "replace")
+        return name or ""
+
+    def window_hidden(self, window):
+        from Xlib import X
+        if window.get_attributes().map_state != X.IsViewable:
+            return True
+        state = window.get_full_property(self.atoms["_NET_WM_STATE"], X.AnyPropertyType)
+        return state is not None and self.atoms["_NET_WM_STATE_HIDDEN"] in state.value
+
+    def window_rect(self, window):
+        from Xlib import X
+        geometry = window.get_geometry()
+        origin = window.translate_coords(self.root, 0, 0)
+        # translate_coords gives the root origin relative to the window, so negate it
+        rect = (-origin.x, -origin.y, geometry.width, geometry.height)
+        # With a reparenting WM the frame is a separate window that also covers whatever is below it
+        extents = window.get_full_property(self.atoms["_NET_FRAME_EXTENTS"], X.AnyPropertyType)
+        return frame_rect(rect, tuple(extents.value) if extents is not None and len(extents.value) == 4 else None)
+
+    def watch(self, window):
+        from Xlib import X
+        if window.id not in self.watched:
+            window.change_attributes(event_mask=X.StructureNotifyMask | X.PropertyChangeMask)
+            self.watched.add(window.id)
+
+    def scan(self):
+        from Xlib.error import XError
+        stacking = self.client_windows("_NET_CLIENT_LIST_STACKING") or self.client_windows("_NET_CLIENT_LIST")
+        if not stacking:
+            # No EWMH window manager (e.g. a bare Xvfb): the root's children are the top-level windows, bottom to top
+            stacking = self.root.query_tree().children
+        layers = []  # Bottom to top: (rect, matched)
+        self.windows = []
+        for window in stacking:
+            try:
+                self.watch(window)
+                if self.window_hidden(window):
+                    continue
+                classes = window.get_wm_class() or ()
+                matched = rule_matches(self.window_title(window), classes, self.title_rules, self.class_rules)
+                layers.append((self.window_rect(window), matched))
+                if matched:
+                    self.windows.append(window.id)
+            except XError:
+                continue  # Closed while we were looking at it
+        self.display.flush()
+
+        root_geometry = self.root.get_geometry()
+        screen = (0, 0, root_geometry.width, root_geometry.height)
+        rects = []
+        for position, (rect, matched) in enumerate(layers):
+            if not matched:
+                continue
+            rect = intersect_rect(rect, screen)
+            if rect is None:
+                continue
+            occluders = [above for above, above_matched in layers[position + 1:]]
+            for piece in visible_rects(rect, occluders):
+                if piece[2] >= self.min_size and piece[3] >= self.min_size:
+                    rects.append(piece)
+        return rects
+
+    def rects_for_monitor(self, monitor_region):
+        """Window areas on one monitor, relative to it, in the
+        [left, top, width, height] form used for capture regions."""
+        bounds = (monitor_region["left"], monitor_region["top"], monitor_region["width"], monitor_region["height"])
+        rects = []
+        for rect in self.get_rects():
+            clipped = intersect_rect(rect, bounds)
+            if clipped is not None:
+                rects.append([clipped[0] - bounds[0], clipped[1] - bounds[1], clipped[2], clipped[3]])
+        return rects
+
+    def close(self):
+        if self.display is not None:
+            try:
+                self.display.close()
+            except Exception as e:
+                logging.error(f"Error closing X display: {e}")
+            self.display = None
+            self.watched = set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the window areas TSTP:Auto Continue would capture on X11.")
+    parser.add_argument("--title", action="append", default=[], help="Window title substring (repeatable)")
+    parser.add_argument("--wm-class", action="append", default=[], help="WM_CLASS substring (repeatable)")
+    parser.add_argument("--watch", action="store_true", help="Keep printing as windows change")
+    args = parser.parse_args(argv)
+
+    targets = AutoContinueWindowTargets(args.title, args.wm_class)
+    previous = None
+    try:
+        while True:
+            rects = targets.get_rects()
+            if rects != previous:
+                print(rects, flush=True)
+                previous = rects
+            if not args.watch:
+                break
+            time.sleep(0.25)
+    finally:
+        targets.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Offline detection benchmark for TSTP:Auto Continue.
+
+Feeds synthetic frames (button placed at known positions, resolutions and
+scales) and optionally recorded screenshots through the autocontinue_core
+detection pipeline without a GUI or a real screen, then reports per-stage
+timings, throughput and accuracy as JSON.
+
+    python benchmark.py --resolutions 1920x1080,3840x2160 --scales 1.0,1.5 --output bench.json
+    python benchmark.py --frames recorded/ --compare bench.json
+
+Recorded frames may ship a labels.json mapping file names to the button
+centre ([x, y]) or null when no button is visible; unlabeled frames are
+timed but not scored.
+
+--track-allocations adds the transient memory each frame needs (tracemalloc
+peak above the starting point); run once with --no-buffer-reuse and compare
+to see what the monitor engine's reused frame buffers save.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from autocontinue_core import AutoContinueDetector, AutoContinuePyramidMatcher, AutoContinueTemplateBank, resource_path
+
+MATCH_THRESHOLD = 0.8
+STAGES = ("convert", "match", "minMaxLoc")
+
+
+def parse_resolutions(value):
+    resolutions = []
+    for item in value.split(','):
+        width, height = item.lower().split('x')
+        resolutions.append((int(width), int(height)))
+    return resolutions
+
+
+def parse_scales(value):
+    return [float(item) for item in value.split(',')]
+
+
+def synthetic_background(width, height, rng):
+    # Light chat-like page: text lines and panels so the matcher sees realistic clutter
+    frame = np.full((height, width, 4), 247, dtype=np.uint8)
+    frame[:, :, 3] = 255
+    for _ in range(max(4, width * height // 200000)):
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        w, h = int(rng.integers(40, 400)), int(rng.integers(20, 200))
+        shade = int(rng.integers(200, 240))
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (shade, shade, shade, 255), thickness=-1)
+    for y in range(30, height, 28):
+        x = int(rng.integers(10, max(11, width // 4)))
+        words = ''.join(chr(int(c)) for c in rng.integers(97, 123, size=int(rng.integers(20, 60))))
+        cv2.putText(frame, words, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (60, 60, 60, 255), 1, cv2.LINE_AA)
+    return frame
+
+
+def synthetic_frames(resolutions, scales, count, rng, base_template):
+    """Yield (name, bgra_frame, truth) where truth is the button centre or None."""
+    for width, height in resolutions:
+        for scale in scales:
+            template = base_template
+            if scale != 1.0:
+                interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+                template = cv2.resize(base_template, None, fx=scale, fy=scale, interpolation=interpolation)
+            template_bgra = cv2.cvtColor(template, cv2.COLOR_GRAY2BGRA)
+            t_height, t_width = template.shape[:2]
+            for i in range(count):
+                frame = synthetic_background(width, height, rng)
+                truth = None
+                # Every other frame is a negative so false positives are measured too
+                if i % 2 == 0 and t_width < width and t_height < height:
+                    x = int(rng.integers(0, width - t_width))
+                    y = int(rng.integers(0, height - t_height))
+                    frame[y:y + t_height, x:x + t_width] = template_bgra
+                    truth = (x + t_width // 2, y + t_height // 2)
+                yield f"synthetic_{width}x{height}_s{scale}_{i}", frame, truth, f"{width}x{height}", scale
+
+
+def recorded_frames(directory):
+    labels = {}
+    labels_path = os.path.join(directory, 'labels.json')
+    if os.path.exists(labels_path):
+        with open(labels_path, 'r') as f:
+            labels = json.load(f)
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
+            continue
+        frame = cv2.imread(os.path.join(directory, name), cv2.IMREAD_COLOR)
+        if frame is None:
+            continue
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+        truth = labels.get(name, "unlabeled")
+        if truth not in (None, "unlabeled"):
+            truth = tuple(truth)
+        yield name, frame, truth, f"{frame.shape[1]}x{frame.shape[0]}", None
+
+
+class AutoContinueBenchmarkEngine:
+    """Times one way of turning a BGRA frame into (score, button centre)."""
+
+    name = "engine"
+
+    def detect(self, frame, timings):
+        raise NotImplementedError
+
+
+class AutoContinueBaselineEngine(AutoContinueBenchmarkEngine):
+    """The original single full-resolution match, split into its stages."""
+
+    name = "baseline"
+
+    def __init__(self, template):
+        self.template = template
+
+    def detect(self, frame, timings):
+        started = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        converted = time.perf_counter()
+        result = cv2.matchTemplate(gray, self.template, cv2.TM_CCOEFF_NORMED)
+        matched = time.perf_counter()
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        located = time.perf_counter()
+        timings["convert"].append(converted - started)
+        timings["match"].append(matched - converted)
+        timings["minMaxLoc"].append(located - matched)
+        return max_val, (max_loc[0] + self.template.shape[1] // 2, max_loc[1] + self.template.shape[0] // 2)
+
+
+class AutoContinuePyramidEngine(AutoContinueBenchmarkEngine):
+    """Coarse-to-fine matcher; its peak search is reported as part of match."""
+
+    name = "pyramid"
+
+    def __init__(self, template, levels):
+        self.template = template
+        self.matcher = AutoContinuePyramidMatcher(levels=levels)
+
+    def detect(self, frame, timings):
+        started = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        converted = time.perf_counter()
+        max_val, max_loc = self.matcher.match(gray, self.template, MATCH_THRESHOLD)
+        matched = time.perf_counter()
+        timings["convert"].append(converted - started)
+        timings["match"].append(matched - converted)
+        return max_val, (max_loc[0] + self.template.shape[1] // 2, max_loc[1] + self.template.shape[0] // 2)
+
+
+class AutoContinueMonitorEngine(AutoContinueBenchmarkEngine):
+    """Runs the live monitoring detection path (change gating, ROI tracking,
+    template bank) that AutoContinueBrowserMonitor uses for every tick."""
+
+    name = "monitor"
+
+    def __init__(self, template_bank, levels, reuse_buffers=True):
+        self.detector = AutoContinueDetector(template_bank, match_threshold=MATCH_THRESHOLD, pyramid_levels=levels,
+                                             reuse_buffers=reuse_buffers)
+        self.monitor_indexes = {}
+
+    def detect(self, frame, timings):
+        height, width = frame.shape[:2]
+        # Keep per-monitor state per resolution, the way distinct screens would
+        monitor_index = self.monitor_indexes.setdefault((width, height), len(self.monitor_indexes))
+        started = time.perf_counter()
+        result = self.detector.detect(frame, monitor_index)
+        timings["total"].append(time.perf_counter() - started)
+        if result["found"]:
+            return result["score"], (result["x"], result["y"])
+        return 0.0, None
+
+
+def percentile_ms(values, percentile):
+    return float(np.percentile(values, percentile) * 1000.0) if values else None
+
+
+def summarize(values):
+    return {
+        "mean_ms": float(np.mean(values) * 1000.0) if values else None,
+        "p50_ms": percentile_ms(values, 50),
+        "p95_ms": percentile_ms(values, 95),
+    }
+
+
+def score(truth, max_val, location, tolerance):
+    """Classify one detection as tp/fp/fn/tn, or None for unlabeled frames."""
+    if truth == "unlabeled":
+        return None
+    detected = max_val > MATCH_THRESHOLD and location is not None
+    if truth is None:
+        return "fp" if detected else "tn"
+    if not detected:
+        return "fn"
+    if abs(location[0] - truth[0]) <= tolerance[0] and abs(location[1] - truth[1]) <= tolerance[1]:
+        return "tp"
+    return "fp"
+
+
+def run_benchmark(engines, frames, tolerance, track_allocations=False):
+    groups = {}
+    if track_allocations:
+        tracemalloc.start()
+    for name, frame, truth, resolution, scale in frames:
+        for engine in engines:
+            key = (engine.name, resolution, scale)
+            group = groups.setdefault(key, {
+                "timings": {stage: [] for stage in STAGES + ("total",)},
+                "outcomes": {"tp": 0, "fp": 0, "fn": 0, "tn": 0},
+                "frames": 0,
+                "allocated_bytes": [],
+            })
+            timings = {stage: [] for stage in STAGES + ("total",)}
+            if track_allocations:
+                tracemalloc.reset_peak()
+                baseline_bytes = tracemalloc.get_traced_memory()[0]
+            started = time.perf_counter()
+            max_val, location = engine.detect(frame, timings)
+            elapsed = time.perf_counter() - started
+            if track_allocations:
+                group["allocated_bytes"].append(tracemalloc.get_traced_memory()[1] - baseline_bytes)
+            if not timings["total"]:
+                timings["total"].append(elapsed)
+            for stage, values in timings.items():
+                group["timings"][stage].extend(values)
+            outcome = score(truth, max_val, location, tolerance)
+            if outcome:
+                group["outcomes"][outcome] += 1
+            group["frames"] += 1
+
+    if track_allocations:
+        tracemalloc.stop()
+
+    results = []
+    for (engine_name, resolution, scale), group in sorted(groups.items(), key=lambda item: (item[0][0], item[0][1], item[0][2] or 0)):
+        outcomes = group["outcomes"]
+        scored = sum(outcomes.values())
+        total_time = sum(group["timings"]["total"])
+        results.append({
+            "engine": engine_name,
+            "resolution": resolution,
+            "scale": scale,
+            "frames": group["frames"],
+            "fps": group["frames"] / total_time if total_time else None,
+            "accuracy": (outcomes["tp"] + outcomes["tn"]) / scored if scored else None,
+            "outcomes": outcomes,
+            "stages": {stage: summarize(values) for stage, values in group["timings"].items() if values},
+        })
+        if group["allocated_bytes"]:
+            results[-1]["allocations"] = {
+                "mean_peak_bytes": float(np.mean(group["allocated_bytes"])),
+                "max_peak_bytes": int(max(group["allocated_bytes"])),
+            }
+    return results
+
+
+def compare(results, previous_path):
+    with open(previous_path, 'r') as f:
+        previous = {(r["engine"], r["resolution"], r["scale"]): r for r in json.load(f)["results"]}
+    for result in results:
+        old = previous.get((result["engine"], result["resolution"], result["scale"]))
+        if not old or not old.get("fps") or not result.get("fps"):
+            continue
+        print(f"{result['engine']:>8} {result['resolution']:>10} scale={result['scale']}: "
+              f"{old['fps']:.1f} -> {result['fps']:.1f} fps ({result['fps'] / old['fps']:.2f}x), "
+              f"accuracy {old['accuracy']} -> {result['accuracy']}", file=sys.stderr)
+        if old.get("allocations") and result.get("allocations"):
+            print(f"{'':>8} {'':>10} transient memory per frame "
+                  f"{old['allocations']['mean_peak_bytes'] / 1048576:.1f} -> "
+                  f"{result['allocations']['mean_peak_bytes'] / 1048576:.1f} MB", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark TSTP:Auto Continue button detection offline.")
+    parser.add_argument("--template", default=resource_path("button_image.png"), help="Button template image")
+    parser.add_argument("--frames", help="Directory of recorded screenshots (optional labels.json)")
+    parser.add_argument("--resolutions", default="1920x1080,2560x1440,3840x2160", help="Synthetic frame sizes, e.g. 1920x1080,3840x2160")
+    parser.add_argument("--scales", default="1.0", help="Button scales to render into synthetic frames")
+    parser.add_argument("--count", type=int, default=10, help="Synthetic frames per resolution and scale")
+    parser.add_argument("--no-synthetic", action="store_true", help="Only benchmark recorded frames")
+    parser.add_argument("--engines", default="baseline,pyramid,monitor", help="Comma separated engines to run")
+    parser.add_argument("--pyramid-levels", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    parser.add_argument("--track-allocations", action="store_true", help="Record transient memory per frame (slower)")
+    parser.add_argument("--no-buffer-reuse", action="store_true", help="Allocate fresh frame buffers every tick in the monitor engine")
+    args = parser.parse_args(argv)
+
+    base_template = cv2.imread(args.template, 0)
+    if base_template is None:
+        parser.error(f"Cannot read template {args.template}")
+    scales = parse_scales(args.scales)
+    template_bank = AutoContinueTemplateBank(args.template, sorted(set(scales) | set(AutoContinueTemplateBank.DEFAULT_SCALES)))
+
+    engines = []
+    for name in args.engines.split(','):
+        if name == "baseline":
+            engines.append(AutoContinueBaselineEngine(base_template))
+        elif name == "pyramid":
+            engines.append(AutoContinuePyramidEngine(base_template, args.pyramid_levels))
+        elif name == "monitor":
+            engines.append(AutoContinueMonitorEngine(template_bank, args.pyramid_levels, not args.no_buffer_reuse))
+        else:
+            parser.error(f"Unknown engine {name}")
+
+    rng = np.random.default_rng(args.seed)
+    frames = []
+    if not args.no_synthetic:
+        frames.append(synthetic_frames(parse_resolutions(args.resolutions), scales, args.count, rng, base_template))
+    if args.frames:
+        frames.append(recorded_frames(args.frames))
+
+    def all_frames():
+        for source in frames:
+            for item in source:
+                yield item
+
+    tolerance = (base_template.shape[1] // 2, base_template.shape[0] // 2)
+    results = run_benchmark(engines, all_frames(), tolerance, args.track_allocations)
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "threshold": MATCH_THRESHOLD,
+        "pyramid_levels": args.pyramid_levels,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""End-to-end detect-to-click latency harness for TSTP:Auto Continue.
+
+Runs the real app (main.py --enable) headless on an Xvfb display next to a
+stand-in page, a full-screen Qt window per monitor that shows the "Continue
+generation" button at seeded random times and positions and timestamps the
+click that arrives for it. Every combination of resolution, monitor count
+and interval gets a fresh display, settings directory and app, and the
+latency from the button being drawn to the click landing is reported as
+JSON:
+
+    python latency_harness.py --resolutions 1920x1080,3840x2160 --monitors 1,2 --intervals 0.25,1 --output latency.json
+
+Needs Xvfb on the PATH (multiple monitors use Xvfb's Xinerama screens) and
+the app's own dependencies. --settings merges extra settings.json keys into
+every run, e.g. '{"detection_process": true}' or '{"input_backend": "pyautogui"}'
+to compare click backends.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import select
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def parse_resolutions(value):
+    resolutions = []
+    for item in value.split(','):
+        width, height = item.lower().split('x')
+        resolutions.append((int(width), int(height)))
+    return resolutions
+
+
+def parse_floats(value):
+    return [float(item) for item in value.split(',')]
+
+
+def parse_ints(value):
+    return [int(item) for item in value.split(',')]
+
+
+def percentile_ms(values, percentile):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percentile / 100.0))] * 1000.0
+
+
+def summarize(values):
+    return {
+        "mean_ms": sum(values) / len(values) * 1000.0 if values else None,
+        "p50_ms": percentile_ms(values, 50),
+        "p90_ms": percentile_ms(values, 90),
+        "p99_ms": percentile_ms(values, 99),
+        "max_ms": max(values) * 1000.0 if values else None,
+    }
+
+
+def start_xvfb(executable, resolution, monitors, timeout=10.0):
+    """Start Xvfb on a free display and return (process, ":N")."""
+    read_fd, write_fd = os.pipe()
+    command = [executable, "-displayfd", str(write_fd), "-nolisten", "tcp"]
+    if monitors > 1:
+        command.append("+xinerama")
+    for screen in range(monitors):
+        command += ["-screen", str(screen), f"{resolution[0]}x{resolution[1]}x24"]
+    process = subprocess.Popen(command, pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    try:
+        # Xvfb writes the display number it picked once it accepts connections
+        ready, _, _ = select.select([read_fd], [], [], timeout)
+        number = os.read(read_fd, 32).decode().strip() if ready else ""
+    finally:
+        os.close(read_fd)
+    if not number:
+        process.kill()
+        raise RuntimeError(f"Xvfb did not start within {timeout:.0f}s")
+    return process, f":{number}"
+
+
+def stop_process(process, timeout=5.0):
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def run_config(args, resolution, monitors, interval, seed):
+    """Run one app + stand-in page session and return its result entry."""
+    entry = {"resolution": f"{resolution[0]}x{resolution[1]}", "monitors": monitors, "interval": interval}
+    with tempfile.TemporaryDirectory(prefix="autocontinue-latency-") as home:
+        settings = {"interval": interval, "min_interval": min(args.min_interval, interval),
+                    "notifications_enabled": False, "selected_monitors": [-1]}
+        settings.update(json.loads(args.settings) if args.settings else {})
+        with open(os.path.join(home, "settings.json"), "w") as f:
+            json.dump(settings, f)
+
+        xvfb, display = start_xvfb(args.xvfb, resolution, monitors)
+        target = app = None
+        try:
+            env = dict(os.environ, DISPLAY=display, AUTOCONTINUE_HOME=home)
+            env.pop("WAYLAND_DISPLAY", None)
+            target = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--target", "--trials", str(args.trials), "--seed", str(seed),
+                 "--warmup", str(args.warmup), "--gap", args.gap, "--timeout", str(args.timeout), "--template", args.template],
+                env=env, stdout=subprocess.PIPE, text=True)
+            # Start the app only once the page is on screen, so its first frames already show it
+            if not target.stdout.readline():
+                raise RuntimeError("Stand-in page exited before showing its windows")
+            app = subprocess.Popen([sys.executable, args.app, "--enable"], env=env, cwd=home,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            session_timeout = args.warmup + args.trials * (args.timeout + float(args.gap.split(',')[1])) + 30
+            output, _ = target.communicate(timeout=session_timeout)
+            session = json.loads(output.strip().splitlines()[-1])
+        finally:
+            stop_process(app)
+            stop_process(target)
+            stop_process(xvfb)
+
+        latencies = session["latencies"]
+        entry.update({"trials": args.trials, "screens": session["screens"], "clicked": len(latencies),
+                      "missed": session["missed"], "latency": summarize(latencies)})
+        if not latencies:
+            log_path = os.path.join(home, "autocontinue.log")
+            if os.path.exists(log_path):
+                with open(log_path, errors="replace") as f:
+                    tail = f.readlines()[-20:]
+                print(f"No clicks for {entry['resolution']} x{monitors} @ {interval}s; app log tail:\n{''.join(tail)}", file=sys.stderr)
+    return entry
+
+
+def target_main(args):
+    """The stand-in page: one full-screen window per screen, the button
+    shown on one of them per trial, clicks timestamped on arrival."""
+    from PyQt5.QtCore import Qt, QTimer
+    from PyQt5.QtGui import QColor, QPainter, QPixmap
+    from PyQt5.QtWidgets import QApplication, QLabel, QWidget
+
+    class AutoContinueLatencyButton(QLabel):
+        def __init__(self, page, pixmap):
+            super().__init__(page)
+            self.page = page
+            self.setPixmap(pixmap)
+            self.resize(pixmap.size())
+            self.hide()
+
+        def mousePressEvent(self, event):
+            self.page.session.button_clicked(time.monotonic())
+
+    class AutoContinueLatencyPage(QWidget):
+        def __init__(self, session, screen, pixmap):
+            super().__init__(None, Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+            self.session = session
+            self.setGeometry(screen.geometry())
+            self.button = AutoContinueLatencyButton(self, pixmap)
+
+        def paintEvent(self, event):
+            # A light chat-like page, static so only the button changes between frames
+            painter = QPainter(self)
+            painter.fillRect(self.rect(), QColor(247, 247, 248))
+            painter.setPen(QColor(90, 90, 90))
+            for y in range(40, self.height(), 28):
+                painter.drawText(40 + (y * 37) % 200, y, "Lorem ipsum dolor sit amet, consectetur adipiscing elit " * 2)
+
+    class AutoContinueLatencySession:
+        def __init__(self, app):
+            self.rng = random.Random(args.seed)
+            pixmap = QPixmap(args.template)
+            self.pages = [AutoContinueLatencyPage(self, screen, pixmap) for screen in app.screens()]
+            self.trial = 0
+            self.shown_at = None
+            self.latencies = []
+            self.missed = 0
+            self.timeout_timer = QTimer()
+            self.timeout_timer.setSingleShot(True)
+            self.timeout_timer.timeout.connect(self.button_missed)
+            self.gap = parse_floats(args.gap)
+
+        def start(self):
+            for page in self.pages:
+                page.show()
+            print(json.dumps({"ready": True, "screens": len(self.pages)}), flush=True)
+            QTimer.singleShot(int(args.warmup * 1000), self.show_button)
+
+        def show_button(self):
+            page = self.pages[self.trial % len(self.pages)]
+            button = page.button
+            button.move(self.rng.randint(0, max(0, page.width() - button.width())),
+                        self.rng.randint(0, max(0, page.height() - button.height())))
+            button.show()
+            page.repaint()  # Paint and flush now, so the timestamp is when the pixels reached the X server
+            self.shown_at = time.monotonic()
+            self.timeout_timer.start(int(args.timeout * 1000))
+
+        def button_clicked(self, clicked_at):
+            if self.shown_at is None:
+                return
+            self.latencies.append(clicked_at - self.shown_at)
+            self.finish_trial()
+
+        def button_missed(self):
+            self.missed += 1
+            self.finish_trial()
+
+        def finish_trial(self):
+            self.timeout_timer.stop()
+            self.shown_at = None
+            for page in self.pages:
+                page.button.hide()
+            self.trial += 1
+            if self.trial >= args.trials:
+                print(json.dumps({"latencies": self.latencies, "missed": self.missed, "screens": len(self.pages)}), flush=True)
+                QApplication.quit()
+                return
+            # Longer than the app's post-click cooldown, so each trial starts from normal scanning
+            QTimer.singleShot(int(self.rng.uniform(*self.gap) * 1000), self.show_button)
+
+    app = QApplication(sys.argv[:1])
+    session = AutoContinueLatencySession(app)
+    session.start()
+    app.exec_()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure button-to-click latency of the running app under Xvfb.")
+    parser.add_argument("--resolutions", default="1920x1080", help="Screen sizes, e.g. 1920x1080,3840x2160")
+    parser.add_argument("--monitors", default="1", help="Monitor counts, e.g. 1,2")
+    parser.add_argument("--intervals", default="1.0", help="App idle intervals in seconds, e.g. 0.25,1")
+    parser.add_argument("--min-interval", type=float, default=0.25, help="App minimum (active) interval")
+    parser.add_argument("--trials", type=int, default=20, help="Button appearances per combination")
+    parser.add_argument("--gap", default="2,4", help="Random pause between trials, min,max seconds")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds before a trial counts as missed")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds for the app to start before the first trial")
+    parser.add_argument("--settings", help="JSON object merged into every run's settings.json")
+    parser.add_argument("--template", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "button_image.png"),
+                        help="Button image the stand-in page shows")
+    parser.add_argument("--app", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py"))
+    parser.add_argument("--xvfb", default="Xvfb", help="Xvfb executable")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--target", action="store_true", help=argparse.SUPPRESS)  # Internal: run the stand-in page
+    args = parser.parse_args(argv)
+
+    if args.target:
+        target_main(args)
+        return
+
+    results = []
+    for resolution in parse_resolutions(args.resolutions):
+        for monitors in parse_ints(args.monitors):
+            for interval in parse_floats(args.intervals):
+                print(f"Measuring {resolution[0]}x{resolution[1]} x{monitors} @ {interval}s ...", file=sys.stderr)
+                try:
+                    results.append(run_config(args, resolution, monitors, interval, args.seed + len(results)))
+                except Exception as e:
+                    results.append({"resolution": f"{resolution[0]}x{resolution[1]}", "monitors": monitors,
+                                    "interval": interval, "error": str(e)})
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "trials": args.trials,
+        "settings": json.loads(args.settings) if args.settings else {},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
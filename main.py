@@ -1,25 +1,33 @@
+from autocontinue_startup import startup_profiler
 import sys
 import os
-import cv2
-import mss
-from PIL import Image
 import time
 import logging
-import pyautogui
+import threading
+import queue
+import multiprocessing
 import webbrowser
-import numpy as np
-from PyQt5 import QtGui
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QTimer, pyqtSlot
-from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction, QInputDialog, QDialog, QVBoxLayout, QTextEdit, QPushButton, QLabel, QCheckBox, QHBoxLayout, QProgressBar, QShortcut
-from PyQt5.QtGui import QIcon, QKeySequence
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-from PyQt5.QtWebChannel import QWebChannel
-from screeninfo import get_monitors
 import json
-import traceback
-
-# Ensure the directory exists
-base_dir = r'C:\TSTP\AutoContinue'
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+startup_profiler.mark("stdlib imports")
+from PyQt5 import QtGui
+from PyQt5.QtCore import QThread, pyqtSignal, Qt, QTimer, pyqtSlot, QFileSystemWatcher, QRect
+from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction, QInputDialog, QDialog, QVBoxLayout, QPushButton, QLabel, QCheckBox, QHBoxLayout, QProgressBar, QShortcut, QPlainTextEdit, QComboBox, QLineEdit, QTableWidget, QTableWidgetItem, QHeaderView, QWidget
+from PyQt5.QtGui import QIcon, QKeySequence, QGuiApplication, QPainter, QColor, QPen
+startup_profiler.mark("PyQt5 widgets")
+from autocontinue_stats import AutoContinueStageStats, STAGES
+from autocontinue_metrics import AutoContinueMetrics, AutoContinueMetricsServer
+from autocontinue_settings import DEFAULT_TEMPLATE_SCALES, validate_setting
+from autocontinue_x11 import AutoContinueWindowTargets
+from autocontinue_logging import setup_logging
+from autocontinue_worker import AutoContinueDetectionWorker, AutoContinueWorkerRestarted
+from autocontinue_input import enable_dpi_awareness
+# QtWebEngine, OpenCV, mss and pyautogui are imported on first use; see load_detection_stack
+# and AutoContinueTutorialWindow.
+
+# Ensure the directory exists; AUTOCONTINUE_HOME moves settings and logs elsewhere (e.g. test runs)
+base_dir = os.environ.get('AUTOCONTINUE_HOME', r'C:\TSTP\AutoContinue')
 os.makedirs(base_dir, exist_ok=True)
 
 
@@ -32,8 +40,137 @@ def resource_path(relative_path):
         logging.error(f"Error in resource_path: {e}")
         return relative_path
 
+detection_core = None
+
+def load_detection_stack():
+    """Import the OpenCV/numpy detection core, mss and pyautogui. Deferred until
+    monitoring starts so the tray icon doesn't wait on them."""
+    global detection_core
+    if detection_core is None:
+        import autocontinue_core
+        startup_profiler.mark("detection core (cv2, numpy)")
+        import mss
+        startup_profiler.mark("mss")
+        import pyautogui
+        startup_profiler.mark("pyautogui")
+        detection_core = autocontinue_core
+    return detection_core
+
+
+class AutoContinueLogReader:
+    """Reads autocontinue.log by byte offset so the viewer never loads the whole file."""
+
+    LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+    def __init__(self, path, block_size=65536):
+        self.path = path
+        self.block_size = block_size
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def complete_size(self):
+        """Offset just past the last complete line, ignoring a half-written one."""
+        size = self.size()
+        if size == 0:
+            return 0
+        with open(self.path, 'rb') as f:
+            start = max(0, size - self.block_size)
+            f.seek(start)
+            data = f.read(size - start)
+        newline = data.rfind(b"\n")
+        return start + newline + 1 if newline >= 0 else start
+
+    def read_before(self, end_offset, count):
+        """Return up to `count` (offset, line) pairs ending at `end_offset`."""
+        data = b""
+        start = end_offset
+        with open(self.path, 'rb') as f:
+            while start > 0 and data.count(b"\n") <= count:
+                step = min(self.block_size, start)
+                start -= step
+                f.seek(start)
+                data = f.read(step) + data
+        lines = self.split(data, start)
+        if start > 0 and lines:
+            lines = lines[1:]  # The first line is probably cut in half
+        return lines[-count:]
+
+    def read_after(self, start_offset, count=None, max_bytes=None):
+        """Return complete (offset, line) pairs from `start_offset` and the offset after them."""
+        with open(self.path, 'rb') as f:
+            f.seek(start_offset)
+            data = f.read(max_bytes) if max_bytes else f.read()
+        end = data.rfind(b"\n") + 1  # Leave a partially written last line for the next read
+        lines = self.split(data[:end], start_offset)
+        if count is not None and len(lines) > count:
+            return lines[:count], lines[count][0]
+        return lines, start_offset + end
+
+    def split(self, data, base_offset):
+        lines = []
+        offset = base_offset
+        for raw in data.split(b"\n"):
+            if raw:
+                lines.append((offset, raw.rstrip(b"\r").decode('utf-8', 'replace')))
+            offset += len(raw) + 1
+        return lines
+
+    @classmethod
+    def line_level(cls, line):
+        parts = line.split(" - ", 2)
+        if len(parts) >= 2 and parts[1] in cls.LEVELS:
+            return parts[1]
+        return None
+
+class AutoContinueLogFilterWorker(QThread):
+    """Scans the whole log for matching lines off the GUI thread."""
+    result_signal = pyqtSignal(int, list, int)
+
+    def __init__(self, reader, generation, min_level, text, max_lines):
+        super().__init__()
+        self.reader = reader
+        self.generation = generation
+        self.min_level = min_level
+        self.text = text.lower()
+        self.max_lines = max_lines
+        self.cancelled = False
+
+    def run(self):
+        try:
+            matches = deque(maxlen=self.max_lines)
+            offset = 0
+            current_level = None
+            with open(self.reader.path, 'rb') as f:
+                for raw in f:
+                    if self.cancelled:
+                        return
+                    if not raw.endswith(b"\n"):
+                        break  # Still being written; left for the tail reader, like read_after does
+                    line = raw.rstrip(b"\r\n").decode('utf-8', 'replace')
+                    # Traceback lines inherit the level of the record they belong to
+                    current_level = AutoContinueLogReader.line_level(line) or current_level
+                    if line and line_matches(line, current_level, self.min_level, self.text):
+                        matches.append((offset, line))
+                    offset += len(raw)
+            self.result_signal.emit(self.generation, list(matches), offset)
+        except Exception as e:
+            logging.error(f"Error in AutoContinueLogFilterWorker.run: {e}")
+            self.result_signal.emit(self.generation, [(0, f"Error filtering log file: {e}")], 0)
+
+    def cancel(self):
+        self.cancelled = True
+
+def line_matches(line, level, min_level, text):
+    if min_level and (level is None or AutoContinueLogReader.LEVELS.index(level) < AutoContinueLogReader.LEVELS.index(min_level)):
+        return False
+    return not text or text in line.lower()
+
 class AutoContinueLogWindow(QDialog):
-    def __init__(self):
+    def __init__(self, max_lines=2000, page_lines=500):
         try:
             super().__init__()
             self.setWindowTitle("Log Window")
@@ -41,29 +178,315 @@ class AutoContinueLogWindow(QDialog):
             self.setGeometry(300, 300, 600, 400)
             self.layout = QVBoxLayout()
 
-            self.log_text = QTextEdit()
+            self.reader = AutoContinueLogReader(os.path.join(base_dir, 'autocontinue.log'))
+            self.max_lines = max_lines  # Upper bound on lines held in memory and shown
+            self.page_lines = page_lines
+            self.lines = deque(maxlen=self.max_lines)
+            self.tail_offset = 0
+            self.live = True
+            self.filter_worker = None
+            self.cancelled_filter_workers = []  # Cancelled scans that haven't returned yet
+            self.filter_generation = 0
+            self.filter_level = None
+            self.filter_text = ""
+
+            self.filter_layout = QHBoxLayout()
+            self.level_combo = QComboBox()
+            self.level_combo.addItems(["All levels"] + AutoContinueLogReader.LEVELS[1:])
+            self.level_combo.currentIndexChanged.connect(self.schedule_filter)
+            self.filter_layout.addWidget(self.level_combo)
+            self.filter_edit = QLineEdit()
+            self.filter_edit.setPlaceholderText("Filter text")
+            self.filter_edit.textChanged.connect(self.schedule_filter)
+            self.filter_layout.addWidget(self.filter_edit)
+            self.layout.addLayout(self.filter_layout)
+
+            self.log_text = QPlainTextEdit()
             self.log_text.setReadOnly(True)
+            self.log_text.setMaximumBlockCount(self.max_lines)
             self.layout.addWidget(self.log_text)
 
-            self.refresh_button = QPushButton("Refresh Log")
+            self.status_label = QLabel()
+            self.layout.addWidget(self.status_label)
+
+            self.navigation_layout = QHBoxLayout()
+            self.older_button = QPushButton("Older")
+            self.older_button.clicked.connect(self.show_older)
+            self.navigation_layout.addWidget(self.older_button)
+            self.newer_button = QPushButton("Newer")
+            self.newer_button.clicked.connect(self.show_newer)
+            self.navigation_layout.addWidget(self.newer_button)
+            self.refresh_button = QPushButton("Jump to Latest")
             self.refresh_button.clicked.connect(self.load_log)
-            self.layout.addWidget(self.refresh_button)
+            self.navigation_layout.addWidget(self.refresh_button)
+            self.layout.addLayout(self.navigation_layout)
 
             self.setLayout(self.layout)
+
+            # Coalesce bursts of writes into one read
+            self.tail_timer = QTimer(self)
+            self.tail_timer.setSingleShot(True)
+            self.tail_timer.setInterval(250)
+            self.tail_timer.timeout.connect(self.read_new_lines)
+            self.filter_timer = QTimer(self)
+            self.filter_timer.setSingleShot(True)
+            self.filter_timer.setInterval(300)
+            self.filter_timer.timeout.connect(self.apply_filter)
+
+            self.watcher = QFileSystemWatcher(self)
+            self.watcher.fileChanged.connect(self.on_log_changed)
+            self.watcher.directoryChanged.connect(self.on_log_changed)
+
             self.load_log()
         except Exception as e:
             logging.error(f"Error in AutoContinueLogWindow.__init__: {e}")
 
+    def showEvent(self, event):
+        self.watch_log(True)
+        self.read_new_lines()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        # Nothing to keep up to date while the window is closed
+        self.watch_log(False)
+        super().hideEvent(event)
+
+    def watch_log(self, enabled):
+        try:
+            paths = [self.reader.path, os.path.dirname(self.reader.path)]
+            watched = self.watcher.files() + self.watcher.directories()
+            if enabled:
+                missing = [path for path in paths if path not in watched and os.path.exists(path)]
+                if missing:
+                    self.watcher.addPaths(missing)
+            elif watched:
+                self.watcher.removePaths(watched)
+        except Exception as e:
+            logging.error(f"Error in watch_log: {e}")
+
+    def on_log_changed(self, path):
+        if self.isVisible():
+            # Some platforms drop the watch when the file is replaced
+            self.watch_log(True)
+            self.tail_timer.start()
+
     def load_log(self):
         try:
-            with open(os.path.join(base_dir, 'autocontinue.log'), 'r') as file:
-                self.log_text.setPlainText(file.read())
+            self.live = True
+            size = self.reader.complete_size()
+            self.lines = deque(self.reader.read_before(size, self.max_lines) if size else [], maxlen=self.max_lines)
+            self.tail_offset = size
+            self.render()
         except Exception as e:
             self.log_text.setPlainText(f"Error loading log file: {e}")
             logging.error(f"Error in load_log: {e}")
 
+    def read_new_lines(self):
+        try:
+            size = self.reader.size()
+            if size < self.tail_offset:
+                self.load_log()  # The file was truncated or rotated
+                return
+            if not self.live or size == self.tail_offset:
+                return
+            # Don't pull in more than the window can show after a long pause
+            skipped = size - self.max_lines * 512 > self.tail_offset
+            start = size - self.max_lines * 512 if skipped else self.tail_offset
+            new_lines, self.tail_offset = self.reader.read_after(start)
+            if skipped:
+                new_lines = new_lines[1:]  # Started mid-line
+            if self.filter_active():
+                new_lines = self.filter_lines(new_lines)
+            self.lines.extend(new_lines)
+            if new_lines:
+                scrollbar = self.log_text.verticalScrollBar()
+                at_bottom = scrollbar.value() == scrollbar.maximum()
+                self.log_text.appendPlainText("\n".join(line for offset, line in new_lines))
+                if at_bottom:
+                    scrollbar.setValue(scrollbar.maximum())
+            self.update_status()
+        except Exception as e:
+            logging.error(f"Error in read_new_lines: {e}")
+
+    def show_older(self):
+        try:
+            if self.filter_active() or not self.lines:
+                return
+            older = self.reader.read_before(self.lines[0][0], self.page_lines)
+            if not older:
+                return
+            self.live = False
+            self.lines = deque(older + list(self.lines)[:self.max_lines - len(older)], maxlen=self.max_lines)
+            self.render(scroll_to_end=False)
+        except Exception as e:
+            logging.error(f"Error in show_older: {e}")
+
+    def show_newer(self):
+        try:
+            if self.filter_active() or self.live or not self.lines:
+                return
+            # Re-read from the last shown line so the next offset is exact
+            last_offset = self.lines[-1][0]
+            newer, end = self.reader.read_after(last_offset, self.page_lines + 1, max_bytes=self.page_lines * 1024)
+            newer = newer[1:]
+            self.lines.extend(newer)
+            if not newer or end >= self.reader.size():
+                self.live = True
+                self.tail_offset = end
+            self.render()
+        except Exception as e:
+            logging.error(f"Error in show_newer: {e}")
+
+    def render(self, scroll_to_end=True):
+        self.log_text.setPlainText("\n".join(line for offset, line in self.lines))
+        scrollbar = self.log_text.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum() if scroll_to_end else scrollbar.minimum())
+        self.update_status()
+
+    def update_status(self):
+        if self.filter_active():
+            mode = "filtered"
+        else:
+            mode = "following" if self.live else "browsing history"
+        self.status_label.setText(f"{len(self.lines)} lines shown, {mode} ({self.reader.size() / 1048576:.1f} MB log)")
+        self.older_button.setEnabled(not self.filter_active())
+        self.newer_button.setEnabled(not self.filter_active() and not self.live)
+
+    def filter_active(self):
+        return bool(self.filter_level or self.filter_text)
+
+    def filter_lines(self, lines):
+        matching = []
+        for offset, line in lines:
+            if line_matches(line, AutoContinueLogReader.line_level(line), self.filter_level, self.filter_text.lower()):
+                matching.append((offset, line))
+        return matching
+
+    def schedule_filter(self, *args):
+        self.filter_timer.start()
+
+    def apply_filter(self):
+        try:
+            self.filter_level = self.level_combo.currentText() if self.level_combo.currentIndex() > 0 else None
+            self.filter_text = self.filter_edit.text()
+            self.filter_generation += 1
+            if self.filter_worker:
+                self.retire_filter_worker(self.filter_worker)
+                self.filter_worker = None
+            if not self.filter_active():
+                self.load_log()
+                return
+            self.status_label.setText("Filtering...")
+            self.filter_worker = AutoContinueLogFilterWorker(self.reader, self.filter_generation, self.filter_level,
+                                                             self.filter_text, self.max_lines)
+            self.filter_worker.result_signal.connect(self.on_filter_result)
+            self.filter_worker.start()
+        except Exception as e:
+            logging.error(f"Error in apply_filter: {e}")
+
+    def retire_filter_worker(self, worker):
+        worker.cancel()
+        if worker.isRunning():
+            # Keep a reference until it finishes; destroying a running QThread aborts the process
+            self.cancelled_filter_workers.append(worker)
+            worker.finished.connect(lambda: self.cancelled_filter_workers.remove(worker))
+
+    def on_filter_result(self, generation, lines, end_offset):
+        # Results from a filter the user has since changed are stale
+        if generation != self.filter_generation:
+            return
+        self.live = True
+        self.lines = deque(lines, maxlen=self.max_lines)
+        self.tail_offset = end_offset
+        self.render()
+
+class AutoContinueRegionPickerOverlay(QWidget):
+    """Translucent full-screen overlay for drawing capture regions on one
+    monitor. Drag to add a rectangle, right-click one to remove it, Enter to
+    save, Escape to cancel. Regions are emitted in monitor pixels."""
+
+    regions_selected = pyqtSignal(int, list)
+
+    def __init__(self, monitor_index, monitor, rects, parent=None):
+        try:
+            super().__init__(parent, Qt.Window | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
+            self.setAttribute(Qt.WA_TranslucentBackground)
+            self.setAttribute(Qt.WA_DeleteOnClose)
+            self.setCursor(Qt.CrossCursor)
+            self.monitor_index = monitor_index
+            screen = self.find_screen(monitor)
+            geometry = screen.geometry()
+            self.setGeometry(geometry)
+            # screeninfo reports physical pixels, Qt lays the overlay out in logical ones
+            self.scale_x = monitor.width / float(geometry.width())
+            self.scale_y = monitor.height / float(geometry.height())
+            self.rects = [QRect(int(left / self.scale_x), int(top / self.scale_y),
+                                int(width / self.scale_x), int(height / self.scale_y))
+                          for left, top, width, height in rects]
+            self.drag_start = None
+            self.drag_rect = None
+        except Exception as e:
+            logging.error(f"Error in AutoContinueRegionPickerOverlay.__init__: {e}")
+
+    def find_screen(self, monitor):
+        screens = QGuiApplication.screens()
+        name = getattr(monitor, "name", None)
+        for screen in screens:
+            if name and screen.name() == name:
+                return screen
+        for screen in screens:
+            ratio = screen.devicePixelRatio()
+            if screen.geometry().contains(int(monitor.x / ratio) + 1, int(monitor.y / ratio) + 1):
+                return screen
+        return QGuiApplication.primaryScreen()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 110))
+        pen = QPen(QColor(0, 170, 255), 2)
+        for rect in self.rects + ([self.drag_rect] if self.drag_rect else []):
+            # Nearly, not fully, transparent: fully transparent pixels let clicks through on Windows
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            painter.fillRect(rect, QColor(0, 0, 0, 1))
+            painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+            painter.setPen(pen)
+            painter.drawRect(rect)
+        painter.setPen(Qt.white)
+        painter.drawText(self.rect().adjusted(0, 20, 0, 0), Qt.AlignHCenter | Qt.AlignTop,
+                         "Drag to add a capture region, right-click to remove one. Enter saves, Esc cancels.")
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.drag_start = event.pos()
+            self.drag_rect = QRect(self.drag_start, self.drag_start)
+        elif event.button() == Qt.RightButton:
+            self.rects = [rect for rect in self.rects if not rect.contains(event.pos())]
+            self.update()
+
+    def mouseMoveEvent(self, event):
+        if self.drag_start is not None:
+            self.drag_rect = QRect(self.drag_start, event.pos()).normalized()
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton and self.drag_rect is not None:
+            if self.drag_rect.width() >= 8 and self.drag_rect.height() >= 8:
+                self.rects.append(self.drag_rect)
+            self.drag_start = None
+            self.drag_rect = None
+            self.update()
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            self.regions_selected.emit(self.monitor_index, [
+                [int(rect.x() * self.scale_x), int(rect.y() * self.scale_y),
+                 int(rect.width() * self.scale_x), int(rect.height() * self.scale_y)] for rect in self.rects])
+            self.close()
+        elif event.key() == Qt.Key_Escape:
+            self.close()
+
 class AutoContinueMonitorSelectionWindow(QDialog):
-    def __init__(self, selected_monitors):
+    def __init__(self, selected_monitors, topology, capture_regions):
         try:
             super().__init__()
             self.setWindowTitle("Select Monitors")
@@ -73,13 +496,28 @@ class AutoContinueMonitorSelectionWindow(QDialog):
 
             self.monitor_checkboxes = []
             self.selected_monitors = selected_monitors
+            self.capture_regions = capture_regions
+            self.pending_regions = {key: list(rects) for key, rects in capture_regions.items()}
+            self.region_buttons = {}
+            self.overlay = None
 
-            monitors = get_monitors()
-            for i, monitor in enumerate(monitors):
+            for i, monitor, region in topology.get_entries():
+                row = QHBoxLayout()
                 checkbox = QCheckBox(f"Monitor {i + 1} ({monitor.width}x{monitor.height})")
                 checkbox.setChecked(i in self.selected_monitors)
-                self.monitor_checkboxes.append(checkbox)
-                self.layout.addWidget(checkbox)
+                self.monitor_checkboxes.append((i, checkbox))
+                row.addWidget(checkbox)
+
+                regions_button = QPushButton()
+                regions_button.clicked.connect(lambda checked, i=i, monitor=monitor: self.pick_regions(i, monitor))
+                self.region_buttons[i] = regions_button
+                row.addWidget(regions_button)
+
+                clear_button = QPushButton("Whole Screen")
+                clear_button.clicked.connect(lambda checked, i=i: self.set_regions(i, []))
+                row.addWidget(clear_button)
+                self.layout.addLayout(row)
+                self.update_region_button(i)
 
             self.all_monitors_checkbox = QCheckBox("All Monitors")
             self.all_monitors_checkbox.setChecked(-1 in self.selected_monitors)
@@ -95,16 +533,41 @@ class AutoContinueMonitorSelectionWindow(QDialog):
 
     def save_selection(self):
         try:
-            self.selected_monitors.clear()
-            for i, checkbox in enumerate(self.monitor_checkboxes):
+            # Keep selections for monitors that are currently unplugged
+            shown = [i for i, checkbox in self.monitor_checkboxes]
+            self.selected_monitors[:] = [i for i in self.selected_monitors if i >= 0 and i not in shown]
+            for i, checkbox in self.monitor_checkboxes:
                 if checkbox.isChecked():
                     self.selected_monitors.append(i)
             if self.all_monitors_checkbox.isChecked():
                 self.selected_monitors.append(-1)
+            self.capture_regions.clear()
+            self.capture_regions.update(self.pending_regions)
             self.accept()
         except Exception as e:
             logging.error(f"Error in save_selection: {e}")
 
+    def pick_regions(self, monitor_index, monitor):
+        try:
+            # Parented to this dialog so the modal dialog doesn't block its input
+            self.overlay = AutoContinueRegionPickerOverlay(monitor_index, monitor, self.pending_regions.get(str(monitor_index), []), self)
+            self.overlay.regions_selected.connect(self.set_regions)
+            self.overlay.show()
+            self.overlay.activateWindow()
+        except Exception as e:
+            logging.error(f"Error in pick_regions: {e}")
+
+    def set_regions(self, monitor_index, rects):
+        if rects:
+            self.pending_regions[str(monitor_index)] = rects
+        else:
+            self.pending_regions.pop(str(monitor_index), None)
+        self.update_region_button(monitor_index)
+
+    def update_region_button(self, monitor_index):
+        count = len(self.pending_regions.get(str(monitor_index), []))
+        self.region_buttons[monitor_index].setText(f"Regions ({count})..." if count else "Pick Regions...")
+
 class AutoContinueInfoWindow(QDialog):
     def __init__(self, title, content):
         try:
@@ -156,77 +619,552 @@ class AutoContinueDonateWindow(QDialog):
         except Exception as e:
             logging.error(f"Error in donate: {e}")
 
+class AutoContinuePerformanceWindow(QDialog):
+    def __init__(self, app):
+        try:
+            super().__init__()
+            self.app = app
+            self.setWindowTitle("Performance")
+            self.setWindowIcon(QtGui.QIcon(resource_path("app_icon.ico")))
+            self.setGeometry(300, 300, 620, 420)
+            self.layout = QVBoxLayout()
+
+            self.enable_checkbox = QCheckBox("Record stage timings")
+            self.enable_checkbox.setChecked(app.stage_stats.enabled)
+            self.enable_checkbox.toggled.connect(app.set_instrumentation_enabled)
+            self.layout.addWidget(self.enable_checkbox)
+
+            self.rate_label = QLabel()
+            self.layout.addWidget(self.rate_label)
+
+            self.table = QTableWidget(0, 6)
+            self.table.setHorizontalHeaderLabels(["Monitor", "Stage", "Samples", "p50 (ms)", "p95 (ms)", "p99 (ms)"])
+            self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            self.table.verticalHeader().setVisible(False)
+            self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+            self.layout.addWidget(self.table)
+
+            self.buttons_layout = QHBoxLayout()
+            self.reset_button = QPushButton("Reset")
+            self.reset_button.clicked.connect(self.reset_stats)
+            self.buttons_layout.addWidget(self.reset_button)
+            self.close_button = QPushButton("Close")
+            self.close_button.clicked.connect(self.close)
+            self.buttons_layout.addWidget(self.close_button)
+            self.layout.addLayout(self.buttons_layout)
+
+            self.setLayout(self.layout)
+
+            self.refresh_timer = QTimer(self)
+            self.refresh_timer.timeout.connect(self.refresh)
+        except Exception as e:
+            logging.error(f"Error in AutoContinuePerformanceWindow.__init__: {e}")
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start(1000)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def reset_stats(self):
+        self.app.stage_stats.reset()
+        self.refresh()
+
+    def refresh(self):
+        try:
+            thread = self.app.monitor_thread
+            if self.app.monitoring and thread:
+                text = f"Effective rate: {thread.scheduler.effective_rate():.2f} ticks/s"
+                if thread.governor.enabled:
+                    text += f"\n{thread.governor.describe()}"
+                self.rate_label.setText(text)
+            else:
+                self.rate_label.setText("Monitoring is off")
+
+            snapshot = self.app.stage_stats.snapshot()
+            # Tick-wide stages (monitor None) first, then each monitor in pipeline order
+            keys = sorted(snapshot, key=lambda key: (key[0] is not None, key[0] or 0,
+                                                     STAGES.index(key[1]) if key[1] in STAGES else len(STAGES)))
+            self.table.setRowCount(len(keys))
+            for row, (monitor_index, stage) in enumerate(keys):
+                stats = snapshot[(monitor_index, stage)]
+                cells = ["All" if monitor_index is None else str(monitor_index + 1), stage, str(stats["count"])]
+                cells += ["-" if stats[p] is None else f"{stats[p] * 1000:.2f}" for p in ("p50", "p95", "p99")]
+                for column, text in enumerate(cells):
+                    self.table.setItem(row, column, QTableWidgetItem(text))
+        except Exception as e:
+            logging.error(f"Error in AutoContinuePerformanceWindow.refresh: {e}")
+
 class AutoContinueBrowserMonitor(QThread):
-    log_signal = pyqtSignal(str)
     notification_signal = pyqtSignal(str, str, int)
     error_signal = pyqtSignal(str)
+    rate_signal = pyqtSignal(float)
 
-    def __init__(self, interval, button_image_path, notifications_enabled, selected_monitors):
+    def __init__(self, interval, button_image_path, notifications_enabled, selected_monitors, pyramid_levels=2, min_interval=0.25, topology=None, rules=None, stage_stats=None, metrics=None, capture_regions=None, window_rules=None, detection_process=False, cpu_budget=0.0, input_backend="auto", restore_cursor=False):
         try:
             super().__init__()
+            core = load_detection_stack()
             self.interval = interval
+            self.min_interval = min_interval
+            self.scheduler = core.AutoContinuePollScheduler(min_interval=min(min_interval, interval), max_interval=interval)
+            self.reported_rate = 0.0
             self.button_image_path = button_image_path
             self.notifications_enabled = notifications_enabled
             self.monitoring = True
-            self.selected_monitors = selected_monitors
-            self.button_template = cv2.imread(self.button_image_path, 0)
+            self.selected_monitors = list(selected_monitors)
+            self.capture_regions = dict(capture_regions or {})  # str(monitor index) -> [[left, top, width, height], ...]
+            # X11 only: (title rules, class rules) to capture matching windows instead of whole monitors
+            self.window_rules = window_rules
+            self.window_targets = AutoContinueWindowTargets(*window_rules) if window_rules else None
+            self.pyramid_levels = pyramid_levels
+            self.governor = core.AutoContinueCpuGovernor(cpu_budget, interval)
+            # Latest settings from the tray, applied by the monitor thread before its next tick
+            self.config_updates = queue.Queue()
+            self.topology = topology or core.AutoContinueMonitorTopology()
+            self.rules = rules or [core.AutoContinueDetectionRule("Continue generation", core.AutoContinueTemplateBank(self.button_image_path))]
+            self.stage_stats = stage_stats or AutoContinueStageStats()
+            self.metrics = metrics or AutoContinueMetrics(self.stage_stats)
+            self.detector = core.AutoContinueDetector(rules=self.rules, pyramid_levels=pyramid_levels, stage_stats=self.stage_stats)
+            self.governor.set_pyramid_headroom(self.pyramid_headroom())
+            self.max_workers = min(4, os.cpu_count() or 1)
+            self.capture = core.AutoContinueScreenCapture(self.stage_stats)
+            self.pool_cpu = 0.0  # CPU seconds spent in capture pool threads
+            self.pool_cpu_lock = threading.Lock()
             self.consecutive_errors = 0
             self.max_consecutive_errors = 5
+            self.click_verifiers = {}  # monitor_index -> AutoContinueClickVerifier
+            self.rule_cooldowns = {}  # (monitor_index, rule index) -> monotonic time the rule may fire again
+            self.input_backend = input_backend
+            self.restore_cursor = restore_cursor
+            self.input = None  # Opened by the monitor thread on its first click, see get_input
+            self.input_stats = []  # stats() of backends replaced while running
+            # Monotonic time of the last sign of life, read by the tray's watchdog
+            self.heartbeat = time.monotonic()
+            self.first_tick_at = None
+            self.stall_ticks = 3
+            self.min_stall_deadline = 5.0
+            self.detection_worker = self.create_detection_worker() if detection_process else None
         except Exception as e:
             logging.error(f"Error in AutoContinueBrowserMonitor.__init__: {e}")
             self.error_signal.emit(f"Error initializing AutoContinueBrowserMonitor: {str(e)}")
 
     def run(self):
         try:
-            with mss.mss() as sct:
+            if self.detection_worker:
+                self.detection_worker.start()
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="AutoContinueCapture") as pool:
                 while self.monitoring:
+                    tick_started = self.scheduler.start_tick()
+                    self.heartbeat = tick_started
+                    if self.first_tick_at is None:
+                        self.first_tick_at = tick_started
+                    active = False
+                    restarts = self.detection_worker.restarts if self.detection_worker else 0
                     try:
-                        self.process_monitors(sct)
+                        self.apply_config_updates()
+                        cpu_started = self.cpu_time()
+                        with self.stage_stats.stage(None, "tick"):
+                            active = self.process_monitors(pool)
+                        self.governor.record_tick(tick_started, max(0.0, self.cpu_time() - cpu_started))
+                        self.apply_governor()
                         self.consecutive_errors = 0  # Reset error count on successful iteration
+                        self.metrics.reset_consecutive_errors()
+                    except AutoContinueWorkerRestarted as e:
+                        # Only this tick is lost; the replacement worker is already running
+                        logging.warning(f"Skipped a tick: {e}")
                     except Exception as e:
                         self.handle_error(e)
-                    
-                    time.sleep(self.interval)
+                    if self.detection_worker and self.detection_worker.restarts != restarts:
+                        self.metrics.record_worker_restart(self.detection_worker.stats()["last_restart_latency"])
+
+                    self.metrics.record_tick()
+                    self.scheduler.record_activity(active)
+                    self.report_rate()
+                    overshoot = self.scheduler.wait_for_next_tick(tick_started, self.still_monitoring)
+                    self.stage_stats.record(None, "sleep_overshoot", overshoot)
+            self.capture.close()
+            if self.window_targets:
+                self.window_targets.close()
+            if self.detection_worker:
+                self.log_worker_stats()
+                self.detection_worker.stop()
+            self.close_input()
+            self.log_detection_stats()
         except Exception as e:
             logging.error(f"Critical error in AutoContinueBrowserMonitor.run: {e}")
             self.error_signal.emit(f"Critical error in monitoring: {str(e)}")
 
-    def process_monitors(self, sct):
-        monitors = get_monitors()
-        for i, monitor in enumerate(monitors):
+    def still_monitoring(self):
+        # Polled every sleep slice, so an idle thread keeps beating between ticks;
+        # new settings cut the sleep short so they don't wait out a long idle interval
+        self.heartbeat = time.monotonic()
+        return self.monitoring and self.config_updates.empty()
+
+    def create_detection_worker(self):
+        return AutoContinueDetectionWorker([rule.spec() for rule in self.rules], pyramid_levels=self.effective_pyramid_levels())
+
+    def cpu_time(self):
+        # Detection only: this thread, the capture pool's jobs and the detection worker, if any.
+        # process_time would also bill the GUI thread and the metrics server to the budget.
+        with self.pool_cpu_lock:
+            pool_cpu = self.pool_cpu
+        return time.thread_time() + pool_cpu + (self.detection_worker.cpu_time() if self.detection_worker else 0.0)
+
+    def effective_pyramid_levels(self):
+        return self.pyramid_levels + self.governor.extra_pyramid_levels
+
+    def pyramid_headroom(self):
+        # Extra levels beyond what the templates allow match exactly like the levels below them
+        limit = self.pyramid_levels + self.governor.MAX_EXTRA_PYRAMID_LEVELS
+        return self.detector.useful_pyramid_levels(limit) - self.pyramid_levels
+
+    def apply_governor(self):
+        # The tick that just ran sets how soon the next may start, so one slow tick can't make the rest late
+        self.scheduler.floor_interval = self.governor.interval_floor()
+        if self.governor.adjust():
+            levels = self.effective_pyramid_levels()
+            self.detector.configure(pyramid_levels=levels)
+            if self.detection_worker:
+                self.detection_worker.configure(pyramid_levels=levels)
+            self.metrics.record_governor_decision()
+            logging.info(f"CPU governor: {self.governor.describe()}")
+        self.metrics.set_governor(self.governor.status() if self.governor.enabled else None)
+
+    def update_config(self, config):
+        """Thread-safe: hand the monitor a full settings snapshot (see
+        AutoContinueApp.monitor_config) to apply before its next tick."""
+        self.config_updates.put(config)
+
+    def apply_config_updates(self):
+        config = None
+        while True:
+            try:
+                config = self.config_updates.get_nowait()  # Only the newest snapshot matters
+            except queue.Empty:
+                break
+        if config is None:
+            return
+        changed = []
+        if config["interval"] != self.interval or config["min_interval"] != self.min_interval:
+            self.interval = config["interval"]
+            self.min_interval = config["min_interval"]
+            self.scheduler.set_intervals(min(self.min_interval, self.interval), self.interval)
+            self.governor.target_interval = self.interval
+            changed.append("interval")
+        if config["notifications_enabled"] != self.notifications_enabled:
+            self.notifications_enabled = config["notifications_enabled"]
+            changed.append("notifications")
+        if config["selected_monitors"] != self.selected_monitors:
+            self.selected_monitors = list(config["selected_monitors"])
+            changed.append("monitors")
+        if config["capture_regions"] != self.capture_regions:
+            self.capture_regions = dict(config["capture_regions"])
+            changed.append("capture regions")
+        if config["window_rules"] != self.window_rules:
+            self.set_window_rules(config["window_rules"])
+            changed.append("window rules")
+        rules = config["rules"] if config["rules"] is not self.rules else None
+        pyramid_levels = config["pyramid_levels"] if config["pyramid_levels"] != self.pyramid_levels else None
+        if rules is not None or pyramid_levels is not None:
+            self.set_detection(rules, pyramid_levels)
+            changed.append("detection rules" if rules is not None else "pyramid depth")
+        if config["cpu_budget"] != self.governor.budget:
+            self.governor.budget = config["cpu_budget"]
+            changed.append("CPU budget")
+        if config["detection_process"] != (self.detection_worker is not None):
+            self.set_detection_process(config["detection_process"])
+            changed.append("detection process")
+        if config["input_backend"] != self.input_backend or config["restore_cursor"] != self.restore_cursor:
+            self.input_backend = config["input_backend"]
+            self.restore_cursor = config["restore_cursor"]
+            self.close_input()  # Reopened with the new settings on the next click
+            changed.append("input backend")
+        if changed:
+            logging.info(f"Applied new settings to the running monitor: {', '.join(changed)}")
+
+    def set_window_rules(self, window_rules):
+        self.window_rules = window_rules
+        if not window_rules:
+            if self.window_targets:
+                self.window_targets.close()
+            self.window_targets = None
+        elif self.window_targets:
+            self.window_targets.set_rules(*window_rules)
+        else:
+            self.window_targets = AutoContinueWindowTargets(*window_rules)
+
+    def set_detection(self, rules, pyramid_levels):
+        if pyramid_levels is not None:
+            self.pyramid_levels = pyramid_levels
+        if rules is not None:
+            self.rules = rules
+            self.rule_cooldowns = {}
+            for verifier in self.click_verifiers.values():
+                verifier.reset()
+        self.detector.configure(rules)
+        self.governor.set_pyramid_headroom(self.pyramid_headroom())
+        levels = self.effective_pyramid_levels()
+        self.detector.configure(pyramid_levels=levels)
+        if self.detection_worker:
+            self.detection_worker.configure([rule.spec() for rule in rules] if rules is not None else None, levels)
+
+    def set_detection_process(self, enabled):
+        if enabled:
+            self.detection_worker = self.create_detection_worker()
+            self.detection_worker.start()
+        else:
+            self.log_worker_stats()
+            self.detection_worker.stop()
+            self.detection_worker = None
+
+    def stall_deadline(self):
+        """Seconds without a heartbeat after which the thread counts as hung."""
+        deadline = max(self.stall_ticks * self.interval, self.min_stall_deadline)
+        if self.detection_worker:
+            # The worker supervisor has its own timeouts; give it the chance to recover first
+            deadline += self.detection_worker.reply_timeout
+            if self.detection_worker.start_latency is None:
+                deadline += self.detection_worker.start_timeout
+        return deadline
+
+    def report_rate(self):
+        # Only signal the tray when the rate moved noticeably to avoid flooding the GUI thread
+        rate = self.scheduler.effective_rate()
+        if abs(rate - self.reported_rate) > max(0.05, self.reported_rate * 0.1):
+            self.reported_rate = rate
+            self.rate_signal.emit(rate)
+
+    def process_monitors(self, pool):
+        # One job per capture region; monitors without regions are grabbed whole
+        jobs = []
+        detect_entries = []
+        now = time.monotonic()
+        for i, monitor, region in self.topology.get_entries():
             if -1 in self.selected_monitors or i in self.selected_monitors:
-                self.process_single_monitor(sct, monitor, i)
-
-    def process_single_monitor(self, sct, monitor, monitor_index):
+                verifier = self.click_verifiers.setdefault(i, detection_core.AutoContinueClickVerifier())
+                action = verifier.next_action(now)
+                self.log_click_outcome(i, verifier)
+                if action == "skip":
+                    continue  # Waiting for the page to react, or cooling down after a verified click
+                if action == "verify":
+                    # Only the clicked area is grabbed until the button is gone
+                    left, top, width, height = verifier.click_rect
+                    rect = [left - region["left"], top - region["top"], width, height]
+                    for verify_region in detection_core.capture_regions_for_monitor(region, [rect]):
+                        jobs.append(("verify", i, verify_region, verifier.scale, verifier.rule_index))
+                    continue
+                rule_indices = self.ready_rules(i, now)
+                if not rule_indices:
+                    continue  # Every rule is cooling down on this monitor
+                detect_entries.append((i, monitor, region, None if len(rule_indices) == len(self.rules) else rule_indices))
+
+        # Over its CPU budget the governor has only some monitors scanned per tick, in rotation
+        scanned = set(self.governor.pick_monitors([entry[0] for entry in detect_entries]))
+        for i, monitor, region, rule_indices in detect_entries:
+            if i not in scanned:
+                continue
+            if self.window_targets:
+                rects = self.window_targets.rects_for_monitor(region)
+                if not rects:
+                    continue  # No matching window on this monitor, nothing to grab
+            else:
+                rects = self.capture_regions.get(str(i))
+            for region_index, capture_region in enumerate(detection_core.capture_regions_for_monitor(region, rects)):
+                jobs.append(("detect", i, capture_region, monitor, region_index if rects else None, rule_indices))
+
+        if self.detection_worker:
+            # Capture and matching happen in the worker process; failed jobs come back as exceptions
+            results = self.detection_worker.run(jobs, self.stage_stats)
+        elif len(jobs) == 1:
+            results = [self.run_job(jobs[0])]
+        else:
+            # Capture and match every region concurrently; OpenCV and mss release the GIL
+            futures = [pool.submit(self.run_pooled_job, job) for job in jobs]
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+
+        # Clicks and hotkeys move the shared cursor or focus, so they stay on this thread and in monitor order
+        active = False
+        clicked = set()
+        fired = set()
+        first_error = None
+        for job, result in zip(jobs, results):
+            kind, monitor_index, region = job[:3]
+            if isinstance(result, Exception):
+                if first_error is None:
+                    first_error = result
+            elif kind == "verify":
+                self.click_verifiers[monitor_index].record_verification(result)
+                active = True  # Keep ticking fast until the click is settled
+            else:
+                self.metrics.record_score(monitor_index, result["score"])
+                for match in result["matches"]:
+                    # Overlapping regions can see the same template; fire each rule and click each monitor once per tick
+                    rule = self.rules[match["rule"]]
+                    if not match["found"] or (monitor_index, match["rule"]) in fired:
+                        continue
+                    if rule.action == "click":
+                        if monitor_index in clicked:
+                            continue
+                        clicked.add(monitor_index)
+                    fired.add((monitor_index, match["rule"]))
+                    self.fire_rule(monitor_index, match["rule"], region["left"] + match["x"], region["top"] + match["y"], match["scale"])
+                active = active or result["changed"] or result["found"]
+        if first_error is not None:
+            raise first_error
+        return active
+
+    def ready_rules(self, monitor_index, now):
+        return [rule_index for rule_index in range(len(self.rules))
+                if self.rule_cooldowns.get((monitor_index, rule_index), 0.0) <= now]
+
+    def fire_rule(self, monitor_index, rule_index, x, y, scale):
+        if not self.monitoring:
+            # Stopped or retired (e.g. replaced by the watchdog after hanging) while this tick ran;
+            # the match is stale and a newer thread may be clicking the same button
+            logging.info(f"Dropped a match on monitor {monitor_index+1}, monitoring was stopped during the tick")
+            return
+        rule = self.rules[rule_index]
+        if rule.action == "click":
+            self.click_button(monitor_index, x, y, rule.name)
+            template_height, template_width = rule.template_bank.templates[scale].shape[:2]
+            # Re-check the button's own area with a margin for re-layout
+            click_rect = (x - template_width, y - template_height, template_width * 2, template_height * 2)
+            self.click_verifiers[monitor_index].record_click(click_rect, scale, rule_index)
+        elif rule.action == "hotkey":
+            self.press_hotkey(monitor_index, rule)
+        else:
+            logging.info(f"Found '{rule.name}' on monitor {monitor_index+1}")
+            # Notifying is all this rule does, so it isn't muted with the click notifications
+            self.notification_signal.emit("TSTP:Auto Continue", f"Found '{rule.name}' on monitor {monitor_index+1}", QSystemTrayIcon.Information)
+        self.metrics.record_rule_action(monitor_index, rule.name, rule.action)
+        if rule.cooldown > 0:
+            self.rule_cooldowns[(monitor_index, rule_index)] = time.monotonic() + rule.cooldown
+
+    def run_pooled_job(self, job):
+        started = time.thread_time()
         try:
-            monitor_dict = {
-                "top": monitor.y,
-                "left": monitor.x,
-                "width": monitor.width,
-                "height": monitor.height
-            }
-            screenshot = np.array(sct.grab(monitor_dict))
-            gray_screenshot = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-
-            result = cv2.matchTemplate(gray_screenshot, self.button_template, cv2.TM_CCOEFF_NORMED)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-            if max_val > 0.8:  # Adjust this threshold as needed
-                button_x = monitor.x + max_loc[0] + self.button_template.shape[1] // 2
-                button_y = monitor.y + max_loc[1] + self.button_template.shape[0] // 2
-
-                pyautogui.click(button_x, button_y)
-
-                self.log_signal.emit(f"Clicked 'Continue generation' button on monitor {monitor_index+1}")
-                if self.notifications_enabled:
-                    self.notification_signal.emit("TSTP:Auto Continue", f"Clicked button on monitor {monitor_index+1}", QSystemTrayIcon.Information)
+            return self.run_job(job)
+        finally:
+            with self.pool_cpu_lock:
+                self.pool_cpu += time.thread_time() - started
+
+    def run_job(self, job):
+        import mss
+        monitor_index = job[1]
+        try:
+            return detection_core.run_detection_job(self.capture, self.detector, job)
         except mss.exception.ScreenShotError as e:
             raise Exception(f"ScreenShotError on monitor {monitor_index+1}: {e}")
         except Exception as e:
             raise Exception(f"Unexpected error on monitor {monitor_index+1}: {e}")
 
+    def log_click_outcome(self, monitor_index, verifier):
+        outcome = verifier.take_outcome()
+        if outcome is None:
+            return
+        verified, elapsed = outcome
+        self.metrics.record_click_outcome(monitor_index, verified)
+        if verified:
+            logging.info(f"Verified click on monitor {monitor_index+1}: button gone after {elapsed:.2f}s")
+        else:
+            logging.warning(f"Unverified click on monitor {monitor_index+1}: button still visible after {elapsed:.2f}s")
+
+    def get_input(self):
+        if self.input is None:
+            from autocontinue_input import create_input_backend
+            regions = [region for i, monitor, region in self.topology.get_entries()]
+            left = min(region["left"] for region in regions)
+            top = min(region["top"] for region in regions)
+            bounds = (left, top, max(region["left"] + region["width"] for region in regions) - left,
+                      max(region["top"] + region["height"] for region in regions) - top)
+            self.input = create_input_backend(self.input_backend, self.restore_cursor, bounds)
+            logging.info(f"Clicking through the {self.input.name} input backend"
+                         + (", restoring the cursor" if self.restore_cursor else ""))
+        return self.input
+
+    def close_input(self):
+        if self.input is not None:
+            if self.input.clicks:
+                self.input_stats.append(self.input.stats())
+            self.input.close()
+            self.input = None
+
+    def click_button(self, monitor_index, button_x, button_y, name="Continue generation"):
+        try:
+            backend = self.get_input()
+            with self.stage_stats.stage(monitor_index, "click"):
+                latency = backend.click(button_x, button_y)
+            self.metrics.record_click(monitor_index)
+            self.metrics.record_click_latency(backend.name, latency)
+
+            logging.info(f"Clicked '{name}' button on monitor {monitor_index+1}")
+            if self.notifications_enabled:
+                self.notification_signal.emit("TSTP:Auto Continue", f"Clicked button on monitor {monitor_index+1}", QSystemTrayIcon.Information)
+        except Exception as e:
+            raise Exception(f"Unexpected error clicking on monitor {monitor_index+1}: {e}")
+
+    def press_hotkey(self, monitor_index, rule):
+        import pyautogui
+        try:
+            # Goes to whichever window has focus, e.g. "ctrl+shift+r"
+            pyautogui.hotkey(*[key.strip() for key in rule.hotkey.split('+')])
+            logging.info(f"Pressed {rule.hotkey} for '{rule.name}' on monitor {monitor_index+1}")
+            if self.notifications_enabled:
+                self.notification_signal.emit("TSTP:Auto Continue", f"Pressed {rule.hotkey} for '{rule.name}' on monitor {monitor_index+1}", QSystemTrayIcon.Information)
+        except Exception as e:
+            raise Exception(f"Unexpected error pressing {rule.hotkey} on monitor {monitor_index+1}: {e}")
+
+    def get_change_stats(self):
+        return self.detector.get_change_stats()
+
+    def get_roi_stats(self):
+        return self.detector.get_roi_stats()
+
+    def log_worker_stats(self):
+        stats = self.detection_worker.stats()
+        message = f"Detection worker: started in {stats['start_latency'] or 0:.2f}s, {stats['restarts']} restarts"
+        if stats["restarts"]:
+            message += f" (last {stats['last_restart_latency']:.2f}s, mean {stats['mean_restart_latency']:.2f}s)"
+        logging.info(message)
+
+    def log_detection_stats(self):
+        for stats in self.input_stats:
+            logging.info(
+                f"Clicks through {stats['backend']}: {stats['clicks']} clicks, mean {stats['mean'] * 1000:.2f} ms, "
+                f"p50 {stats['p50'] * 1000:.2f} ms, p95 {stats['p95'] * 1000:.2f} ms, max {stats['max'] * 1000:.2f} ms")
+        for monitor_index, verifier in sorted(self.click_verifiers.items()):
+            stats = verifier.stats()
+            if stats["clicks"]:
+                logging.info(
+                    f"Clicks on monitor {monitor_index+1}: {stats['clicks']} clicks, {stats['verified']} verified, "
+                    f"{stats['unverified']} unverified ({stats['success_rate']:.0%} success rate)")
+        # Stats are keyed by monitor index, or (monitor index, region index) for capture regions
+        for key, stats in sorted(self.get_roi_stats().items(), key=source_sort_key):
+            logging.info(
+                f"ROI stats for {describe_source(key)}: {stats['roi_hits']} hits, {stats['roi_misses']} misses "
+                f"({stats['roi_hit_rate']:.0%} hit rate), {stats['full_scans']} full scans")
+        for key, stats in sorted(self.get_change_stats().items(), key=source_sort_key):
+            logging.info(
+                f"Change gating for {describe_source(key)}: skipped {stats['skipped_frames']} of {stats['frames']} frames "
+                f"({stats['skip_ratio']:.0%}), {stats['partial_frames']} partial scans, "
+                f"{stats['mean_scanned_fraction']:.0%} of the screen matched on average")
+        for key, stats in sorted(self.detector.get_buffer_stats().items(), key=source_sort_key):
+            logging.info(
+                f"Frame buffers for {describe_source(key)}: {stats['allocations']} allocations "
+                f"({stats['allocated_bytes'] / 1048576:.1f} MB), {stats['reuses']} reuses, "
+                f"{stats['resident_bytes'] / 1048576:.1f} MB resident")
+
     def handle_error(self, error):
         self.consecutive_errors += 1
+        self.metrics.record_error(self.consecutive_errors)
         error_msg = f"Error in monitoring: {str(error)}"
         logging.error(error_msg)
         self.error_signal.emit(error_msg)
@@ -244,6 +1182,21 @@ class AutoContinueBrowserMonitor(QThread):
             logging.error(f"Error in AutoContinueBrowserMonitor.stop: {e}")
             self.error_signal.emit(f"Error stopping AutoContinueBrowserMonitor: {str(e)}")
 
+def rule_template_path(template):
+    if os.path.isabs(template):
+        return template
+    user_template = os.path.join(base_dir, template)
+    return user_template if os.path.exists(user_template) else resource_path(template)
+
+def describe_source(key):
+    if isinstance(key, tuple):
+        return f"monitor {key[0]+1} region {key[1]+1}"
+    return f"monitor {key+1}"
+
+def source_sort_key(item):
+    key = item[0]
+    return key if isinstance(key, tuple) else (key, -1)
+
 class AutoContinueApp(QSystemTrayIcon):
     def __init__(self):
         try:
@@ -252,18 +1205,41 @@ class AutoContinueApp(QSystemTrayIcon):
             self.setToolTip("TSTP:Auto Continue")
 
             # Setup logging
-            logging.basicConfig(filename=os.path.join(base_dir, 'autocontinue.log'), level=logging.INFO,
-                                format='%(asctime)s - %(levelname)s - %(message)s')
+            self.log_listener = setup_logging(os.path.join(base_dir, 'autocontinue.log'))
 
             # Load settings
             self.settings_file = os.path.join(base_dir, 'settings.json')
             self.interval = 1  # Default to 1 second
+            self.min_interval = 0.25
             self.notifications_enabled = True
             self.selected_monitors = [-1]  # Default to all monitors
+            self.pyramid_levels = 2
+            self.cpu_budget_percent = 0  # Of one core; 0 = unlimited
+            self.monitor_keys = []
+            self.capture_regions = {}  # Monitor index (as a string) -> [[left, top, width, height], ...] in monitor pixels
+            self.window_targeting = False
+            self.window_titles = ["ChatGPT"]
+            self.window_classes = []
+            self.detection_process = False
+            self.input_backend = "auto"  # Or win32, xtest, uinput, pyautogui; see autocontinue_input
+            self.restore_cursor = False
+            self.template_scales = list(DEFAULT_TEMPLATE_SCALES)
+            # Matched in order against the same capture; templates are looked up next to settings.json, then bundled
+            self.detection_rules = [{"name": "Continue generation", "template": "button_image.png", "threshold": 0.8, "action": "click"}]
+            self.instrumentation_enabled = False
+            self.metrics_enabled = False
+            self.metrics_port = 9464
+            self.settings_text = None  # Last settings.json contents we read or wrote
             self.load_settings()
+            self.stage_stats = AutoContinueStageStats(self.instrumentation_enabled)
+            self.metrics = AutoContinueMetrics(self.stage_stats)
+            self.metrics_server = None
+            self.topology = None  # Built on first use, it needs the detection core
+            self.watch_screen_changes()
 
             # Button image path
             self.button_image_path = resource_path("button_image.png")
+            self.rules = None  # Built on first use, like the topology
 
             # Create the menu
             self.create_menu()
@@ -271,11 +1247,18 @@ class AutoContinueApp(QSystemTrayIcon):
             self.monitoring = False
             self.monitor_thread = None
             self.log_window = None
+            self.performance_window = None
+            self.retired_threads = []  # Stopped or hung monitor threads that haven't finished yet
+            self.stall_detected_at = None
+            if self.metrics_enabled:
+                self.start_metrics_server()
 
-            # Setup watchdog timer
+            # Setup watchdog timer; it only compares timestamps, so checking often is cheap
             self.watchdog_timer = QTimer(self)
             self.watchdog_timer.timeout.connect(self.check_monitoring_status)
-            self.watchdog_timer.start(60000)  # Check every minute
+            self.watchdog_timer.start(1000)
+
+            self.watch_settings_file()
 
             # Setup global shortcuts
             self.setup_shortcuts()
@@ -300,14 +1283,51 @@ class AutoContinueApp(QSystemTrayIcon):
             self.interval_action.triggered.connect(self.set_interval)
             self.menu.addAction(self.interval_action)
 
+            self.min_interval_action = QAction("Set Minimum Interval", self)
+            self.min_interval_action.triggered.connect(self.set_min_interval)
+            self.menu.addAction(self.min_interval_action)
+
+            self.pyramid_action = QAction("Set Pyramid Depth", self)
+            self.pyramid_action.triggered.connect(self.set_pyramid_levels)
+            self.menu.addAction(self.pyramid_action)
+
+            self.cpu_budget_action = QAction("Set CPU Budget", self)
+            self.cpu_budget_action.triggered.connect(self.set_cpu_budget)
+            self.menu.addAction(self.cpu_budget_action)
+
             self.monitor_action = QAction("Select Monitors", self)
             self.monitor_action.triggered.connect(self.select_monitors)
             self.menu.addAction(self.monitor_action)
 
+            if sys.platform.startswith('linux'):
+                self.window_targeting_action = QAction("Disable Window Targeting" if self.window_targeting else "Enable Window Targeting", self)
+                self.window_targeting_action.triggered.connect(self.toggle_window_targeting)
+                self.menu.addAction(self.window_targeting_action)
+
+                self.window_rules_action = QAction("Set Window Rules", self)
+                self.window_rules_action.triggered.connect(self.set_window_rules)
+                self.menu.addAction(self.window_rules_action)
+
+            self.detection_process_action = QAction("Detect In-Process" if self.detection_process else "Detect In Separate Process", self)
+            self.detection_process_action.triggered.connect(self.toggle_detection_process)
+            self.menu.addAction(self.detection_process_action)
+
+            self.restore_cursor_action = QAction("Disable Cursor Restore" if self.restore_cursor else "Enable Cursor Restore", self)
+            self.restore_cursor_action.triggered.connect(self.toggle_restore_cursor)
+            self.menu.addAction(self.restore_cursor_action)
+
             self.log_action = QAction("Show Log", self)
             self.log_action.triggered.connect(self.show_log_window)
             self.menu.addAction(self.log_action)
 
+            self.performance_action = QAction("Performance", self)
+            self.performance_action.triggered.connect(self.show_performance_window)
+            self.menu.addAction(self.performance_action)
+
+            self.metrics_action = QAction("Disable Metrics Endpoint" if self.metrics_enabled else "Enable Metrics Endpoint", self)
+            self.metrics_action.triggered.connect(self.toggle_metrics)
+            self.menu.addAction(self.metrics_action)
+
             self.about_action = QAction("About", self)
             self.about_action.triggered.connect(lambda: self.show_info_window("About", "TSTP:Auto Continue\nVersion 1.0\nDeveloped by TSTP"))
             self.menu.addAction(self.about_action)
@@ -344,6 +1364,108 @@ class AutoContinueApp(QSystemTrayIcon):
             logging.error(f"Error in setup_shortcuts: {e}")
             self.show_error_message(f"Error setting up shortcuts: {str(e)}")
 
+    def watch_settings_file(self):
+        try:
+            # Coalesce the several change events of one save into one reload
+            self.settings_reload_timer = QTimer(self)
+            self.settings_reload_timer.setSingleShot(True)
+            self.settings_reload_timer.setInterval(500)
+            self.settings_reload_timer.timeout.connect(self.reload_settings)
+            self.settings_watcher = QFileSystemWatcher(self)
+            self.settings_watcher.fileChanged.connect(self.on_settings_changed)
+            self.settings_watcher.directoryChanged.connect(self.on_settings_changed)
+            self.settings_watcher.addPath(base_dir)
+            if os.path.exists(self.settings_file):
+                self.settings_watcher.addPath(self.settings_file)
+        except Exception as e:
+            logging.error(f"Error in watch_settings_file: {e}")
+
+    def on_settings_changed(self, path):
+        # Editors that save by replacing the file drop it from the watcher
+        if os.path.exists(self.settings_file) and self.settings_file not in self.settings_watcher.files():
+            self.settings_watcher.addPath(self.settings_file)
+        self.settings_reload_timer.start()
+
+    def reload_settings(self):
+        """Apply external edits to settings.json to the tray and the running monitor."""
+        try:
+            if not os.path.exists(self.settings_file):
+                return
+            with open(self.settings_file, 'r') as f:
+                text = f.read()
+            if text == self.settings_text:
+                return  # Our own save, or a change that didn't touch the contents
+            try:
+                json.loads(text)
+            except ValueError as e:
+                logging.warning(f"Ignoring settings.json change, not valid JSON yet: {e}")
+                return
+            detection = (self.detection_rules, self.template_scales)
+            metrics = (self.metrics_enabled, self.metrics_port)
+            self.load_settings()
+            if (self.detection_rules, self.template_scales) != detection:
+                self.rules = None  # Rebuilt from the new rule table by get_detection_rules
+            self.notification_action.setText("Disable Notifications" if self.notifications_enabled else "Enable Notifications")
+            self.detection_process_action.setText("Detect In-Process" if self.detection_process else "Detect In Separate Process")
+            self.restore_cursor_action.setText("Disable Cursor Restore" if self.restore_cursor else "Enable Cursor Restore")
+            if sys.platform.startswith('linux'):
+                self.window_targeting_action.setText("Disable Window Targeting" if self.window_targeting else "Enable Window Targeting")
+            self.stage_stats.enabled = self.instrumentation_enabled
+            if (self.metrics_enabled, self.metrics_port) != metrics:
+                self.stop_metrics_server()
+                if self.metrics_enabled:
+                    self.start_metrics_server()
+                self.metrics_action.setText("Disable Metrics Endpoint" if self.metrics_server else "Enable Metrics Endpoint")
+            self.push_monitor_config()
+            logging.info("Reloaded settings.json")
+        except Exception as e:
+            logging.error(f"Error in reload_settings: {e}")
+            self.show_error_message(f"Error reloading settings: {str(e)}")
+
+    def get_topology(self):
+        if self.topology is None:
+            self.topology = load_detection_stack().AutoContinueMonitorTopology(self.monitor_keys)
+        return self.topology
+
+    def get_detection_rules(self):
+        if self.rules is None:
+            core = load_detection_stack()
+            rules = []
+            for entry in self.detection_rules:
+                try:
+                    template = rule_template_path(entry["template"])
+                    name = os.path.splitext(os.path.basename(template))[0]
+                    rules.append(core.AutoContinueDetectionRule.from_spec(dict(
+                        entry, template=template, scales=self.template_scales,
+                        cache_path=os.path.join(base_dir, f'template_bank_{name}.npz'))))
+                except Exception as e:
+                    logging.error(f"Skipping detection rule {entry.get('name') or entry.get('template')!r}: {e}")
+            if not rules:
+                raise Exception("No usable detection rules in settings.json")
+            self.rules = rules
+        return self.rules
+
+    def watch_screen_changes(self):
+        try:
+            gui_app = QGuiApplication.instance()
+            gui_app.screenAdded.connect(self.on_screen_added)
+            gui_app.screenRemoved.connect(self.invalidate_topology)
+            for screen in gui_app.screens():
+                screen.geometryChanged.connect(self.invalidate_topology)
+        except Exception as e:
+            logging.error(f"Error in watch_screen_changes: {e}")
+
+    def on_screen_added(self, screen):
+        try:
+            screen.geometryChanged.connect(self.invalidate_topology)
+            self.invalidate_topology()
+        except Exception as e:
+            logging.error(f"Error in on_screen_added: {e}")
+
+    def invalidate_topology(self, *args):
+        if self.topology is not None:
+            self.topology.invalidate()
+
     def toggle_monitoring(self):
         try:
             if not self.monitoring:
@@ -355,19 +1477,20 @@ class AutoContinueApp(QSystemTrayIcon):
             logging.error(f"Error in toggle_monitoring: {e}")
             self.show_error_message(f"Error toggling monitoring: {str(e)}")
 
-    def start_monitoring(self):
+    def start_monitoring(self, notify=True):
         try:
             self.monitoring = True
             self.toggle_action.setText("Disable")
-            if self.notifications_enabled:
+            if self.notifications_enabled and notify:
                 self.showMessage("TSTP:Auto Continue", "Monitoring enabled.", QSystemTrayIcon.Information)
             logging.info("Monitoring enabled")
 
-            self.monitor_thread = AutoContinueBrowserMonitor(self.interval, self.button_image_path, self.notifications_enabled, self.selected_monitors)
-            self.monitor_thread.log_signal.connect(self.log_message)
+            self.monitor_thread = AutoContinueBrowserMonitor(self.interval, self.button_image_path, self.notifications_enabled, self.selected_monitors, self.pyramid_levels, self.min_interval, self.get_topology(), self.get_detection_rules(), self.stage_stats, self.metrics, self.capture_regions, self.get_window_rules(), self.detection_process, self.cpu_budget_percent / 100.0, self.input_backend, self.restore_cursor)
+            self.monitor_thread.rate_signal.connect(self.update_rate_tooltip)
             self.monitor_thread.notification_signal.connect(self.showMessage)
             self.monitor_thread.error_signal.connect(self.handle_monitor_error)
             self.monitor_thread.start()
+            self.metrics.set_monitoring(True)
         except Exception as e:
             logging.error(f"Error in start_monitoring: {e}")
             self.show_error_message(f"Error starting monitoring: {str(e)}")
@@ -380,8 +1503,10 @@ class AutoContinueApp(QSystemTrayIcon):
                 self.showMessage("TSTP:Auto Continue", "Monitoring disabled.", QSystemTrayIcon.Information)
             logging.info("Monitoring disabled")
             if self.monitor_thread:
-                self.monitor_thread.stop()
-                self.monitor_thread.wait()
+                self.retire_monitor_thread(self.monitor_thread)
+                self.monitor_thread = None
+            self.metrics.set_monitoring(False)
+            self.setToolTip("TSTP:Auto Continue")
         except Exception as e:
             logging.error(f"Error in stop_monitoring: {e}")
             self.show_error_message(f"Error stopping monitoring: {str(e)}")
@@ -394,13 +1519,50 @@ class AutoContinueApp(QSystemTrayIcon):
 
     def check_monitoring_status(self):
         try:
-            if self.monitoring and (not self.monitor_thread or not self.monitor_thread.isRunning()):
+            self.retired_threads = [thread for thread in self.retired_threads if thread.isRunning()]
+            thread = self.monitor_thread
+            now = time.monotonic()
+            if self.stall_detected_at is not None and thread and thread.first_tick_at is not None:
+                recover_seconds = thread.first_tick_at - self.stall_detected_at
+                self.metrics.record_stall_recovery(recover_seconds)
+                logging.info(f"Monitoring recovered {recover_seconds:.2f}s after the stall was detected")
+                self.stall_detected_at = None
+            if not self.monitoring:
+                return
+
+            if not thread or not thread.isRunning():
+                reason = "died"
                 logging.warning("Monitoring thread stopped unexpectedly. Restarting...")
-                self.stop_monitoring()
-                self.start_monitoring()
+            elif now - thread.heartbeat > thread.stall_deadline():
+                reason = "stalled"
+                logging.warning(f"Monitoring thread has not ticked for {now - thread.heartbeat:.1f}s "
+                                f"(deadline {thread.stall_deadline():.1f}s). Restarting...")
+            else:
+                return
+            # Time to detect: how long the thread had been silent when we noticed
+            self.metrics.record_stall(reason, now - thread.heartbeat if thread else 0.0)
+            self.metrics.record_watchdog_restart()
+            self.stall_detected_at = now
+            # A hung thread can't be joined without freezing the tray; retire it and start a fresh one
+            if thread:
+                self.retire_monitor_thread(thread)
+            self.monitor_thread = None
+            self.start_monitoring(notify=False)
         except Exception as e:
             logging.error(f"Error in check_monitoring_status: {e}")
 
+    def retire_monitor_thread(self, thread):
+        try:
+            thread.rate_signal.disconnect()
+            thread.notification_signal.disconnect()
+            thread.error_signal.disconnect()
+        except TypeError:
+            pass  # Already disconnected
+        thread.stop()
+        if thread.isRunning():
+            # Keep a reference until it finishes; destroying a running QThread aborts the process
+            self.retired_threads.append(thread)
+
     def show_error_message(self, message):
         logging.error(message)
         self.showMessage("TSTP:Auto Continue Error", message, QSystemTrayIcon.Critical)
@@ -411,16 +1573,19 @@ class AutoContinueApp(QSystemTrayIcon):
             self.notification_action.setText("Disable Notifications" if self.notifications_enabled else "Enable Notifications")
             logging.info(f"Notifications {'enabled' if self.notifications_enabled else 'disabled'}")
             self.save_settings()
+            self.push_monitor_config()
         except Exception as e:
             logging.error(f"Error in toggle_notifications: {e}")
             self.show_error_message(f"Error toggling notifications: {str(e)}")
 
     def set_interval(self):
         try:
-            interval, ok = QInputDialog.getInt(None, "Set Interval", "Enter interval (seconds):", self.interval, 1, 60, 1)
+            interval, ok = QInputDialog.getDouble(None, "Set Interval", "Enter maximum (idle) interval (seconds):", self.interval, 0.1, 60, 1)
             if ok:
                 self.interval = interval
+                self.min_interval = min(self.min_interval, self.interval)
                 self.save_settings()
+                self.push_monitor_config()
                 if self.notifications_enabled:
                     self.showMessage("TSTP:Auto Continue", f"Interval set to {self.interval} seconds.", QSystemTrayIcon.Information)
                 logging.info(f"Interval set to {self.interval} seconds")
@@ -428,11 +1593,133 @@ class AutoContinueApp(QSystemTrayIcon):
             logging.error(f"Error in set_interval: {e}")
             self.show_error_message(f"Error setting interval: {str(e)}")
 
+    def set_min_interval(self):
+        try:
+            min_interval, ok = QInputDialog.getDouble(None, "Set Minimum Interval", "Enter minimum (active) interval (seconds):", self.min_interval, 0.05, self.interval, 2)
+            if ok:
+                self.min_interval = min_interval
+                self.save_settings()
+                self.push_monitor_config()
+                if self.notifications_enabled:
+                    self.showMessage("TSTP:Auto Continue", f"Minimum interval set to {self.min_interval} seconds.", QSystemTrayIcon.Information)
+                logging.info(f"Minimum interval set to {self.min_interval} seconds")
+        except Exception as e:
+            logging.error(f"Error in set_min_interval: {e}")
+            self.show_error_message(f"Error setting minimum interval: {str(e)}")
+
+    def set_pyramid_levels(self):
+        try:
+            levels, ok = QInputDialog.getInt(None, "Set Pyramid Depth", "Enter pyramid depth (0 = full resolution only):", self.pyramid_levels, 0, 4, 1)
+            if ok:
+                self.pyramid_levels = levels
+                self.save_settings()
+                self.push_monitor_config()
+                if self.notifications_enabled:
+                    self.showMessage("TSTP:Auto Continue", f"Pyramid depth set to {self.pyramid_levels}.", QSystemTrayIcon.Information)
+                logging.info(f"Pyramid depth set to {self.pyramid_levels}")
+        except Exception as e:
+            logging.error(f"Error in set_pyramid_levels: {e}")
+            self.show_error_message(f"Error setting pyramid depth: {str(e)}")
+
+    def set_cpu_budget(self):
+        try:
+            percent, ok = QInputDialog.getInt(None, "Set CPU Budget", "Maximum detection CPU use, in % of one core (0 = unlimited):", self.cpu_budget_percent, 0, 100, 5)
+            if ok:
+                self.cpu_budget_percent = percent
+                self.save_settings()
+                self.push_monitor_config()
+                if self.notifications_enabled:
+                    self.showMessage("TSTP:Auto Continue", f"CPU budget set to {f'{percent}%' if percent else 'unlimited'}.", QSystemTrayIcon.Information)
+                logging.info(f"CPU budget set to {f'{percent}% of one core' if percent else 'unlimited'}")
+        except Exception as e:
+            logging.error(f"Error in set_cpu_budget: {e}")
+            self.show_error_message(f"Error setting CPU budget: {str(e)}")
+
+    def get_window_rules(self):
+        if self.window_targeting and sys.platform.startswith('linux'):
+            return list(self.window_titles), list(self.window_classes)
+        return None
+
+    def toggle_window_targeting(self):
+        try:
+            self.window_targeting = not self.window_targeting
+            self.window_targeting_action.setText("Disable Window Targeting" if self.window_targeting else "Enable Window Targeting")
+            self.save_settings()
+            self.push_monitor_config()
+            logging.info(f"Window targeting {'enabled' if self.window_targeting else 'disabled'}")
+        except Exception as e:
+            logging.error(f"Error in toggle_window_targeting: {e}")
+            self.show_error_message(f"Error toggling window targeting: {str(e)}")
+
+    def set_window_rules(self):
+        try:
+            titles, ok = QInputDialog.getText(None, "Set Window Rules", "Window titles to capture (comma separated):",
+                                              QLineEdit.Normal, ", ".join(self.window_titles))
+            if not ok:
+                return
+            classes, ok = QInputDialog.getText(None, "Set Window Rules", "Window classes to capture, e.g. firefox (comma separated):",
+                                               QLineEdit.Normal, ", ".join(self.window_classes))
+            if not ok:
+                return
+            self.window_titles = [title.strip() for title in titles.split(',') if title.strip()]
+            self.window_classes = [name.strip() for name in classes.split(',') if name.strip()]
+            self.save_settings()
+            self.push_monitor_config()
+            logging.info(f"Window rules set to titles {self.window_titles}, classes {self.window_classes}")
+        except Exception as e:
+            logging.error(f"Error in set_window_rules: {e}")
+            self.show_error_message(f"Error setting window rules: {str(e)}")
+
+    def toggle_detection_process(self):
+        try:
+            self.detection_process = not self.detection_process
+            self.detection_process_action.setText("Detect In-Process" if self.detection_process else "Detect In Separate Process")
+            self.save_settings()
+            self.push_monitor_config()
+            logging.info(f"Detection {'moved to a separate process' if self.detection_process else 'moved back in-process'}")
+        except Exception as e:
+            logging.error(f"Error in toggle_detection_process: {e}")
+            self.show_error_message(f"Error switching detection process: {str(e)}")
+
+    def toggle_restore_cursor(self):
+        try:
+            self.restore_cursor = not self.restore_cursor
+            self.restore_cursor_action.setText("Disable Cursor Restore" if self.restore_cursor else "Enable Cursor Restore")
+            self.save_settings()
+            self.push_monitor_config()
+            logging.info(f"Cursor restore after clicks {'enabled' if self.restore_cursor else 'disabled'}")
+        except Exception as e:
+            logging.error(f"Error in toggle_restore_cursor: {e}")
+            self.show_error_message(f"Error toggling cursor restore: {str(e)}")
+
+    def monitor_config(self):
+        # Everything AutoContinueBrowserMonitor.apply_config_updates can change on a running thread
+        return {
+            'interval': self.interval,
+            'min_interval': self.min_interval,
+            'notifications_enabled': self.notifications_enabled,
+            'selected_monitors': list(self.selected_monitors),
+            'capture_regions': {key: [list(rect) for rect in rects] for key, rects in self.capture_regions.items()},
+            'window_rules': self.get_window_rules(),
+            'pyramid_levels': self.pyramid_levels,
+            'cpu_budget': self.cpu_budget_percent / 100.0,
+            'rules': self.get_detection_rules(),
+            'detection_process': self.detection_process,
+            'input_backend': self.input_backend,
+            'restore_cursor': self.restore_cursor,
+        }
+
+    def push_monitor_config(self):
+        # The running monitor picks this up before its next tick; no thread restart, no template reload
+        if self.monitor_thread:
+            self.monitor_thread.update_config(self.monitor_config())
+
     def select_monitors(self):
         try:
-            dialog = AutoContinueMonitorSelectionWindow(self.selected_monitors)
+            dialog = AutoContinueMonitorSelectionWindow(self.selected_monitors, self.get_topology(), self.capture_regions)
             if dialog.exec_():
                 self.save_settings()
+                self.push_monitor_config()
                 if self.notifications_enabled:
                     self.showMessage("TSTP:Auto Continue", "Monitor selection updated.", QSystemTrayIcon.Information)
                 logging.info("Monitor selection updated")
@@ -440,11 +1727,12 @@ class AutoContinueApp(QSystemTrayIcon):
             logging.error(f"Error in select_monitors: {e}")
             self.show_error_message(f"Error selecting monitors: {str(e)}")
 
-    def log_message(self, message):
+    def update_rate_tooltip(self, rate):
         try:
-            logging.info(message)
+            if self.monitoring:
+                self.setToolTip(f"TSTP:Auto Continue\nScanning at {rate:.1f} ticks/s")
         except Exception as e:
-            logging.error(f"Error in log_message: {e}")
+            logging.error(f"Error in update_rate_tooltip: {e}")
 
     def show_log_window(self):
         try:
@@ -454,6 +1742,55 @@ class AutoContinueApp(QSystemTrayIcon):
         except Exception as e:
             logging.error(f"Error in show_log_window: {e}")
 
+    def show_performance_window(self):
+        try:
+            if not self.performance_window:
+                self.performance_window = AutoContinuePerformanceWindow(self)
+            self.performance_window.show()
+        except Exception as e:
+            logging.error(f"Error in show_performance_window: {e}")
+
+    def set_instrumentation_enabled(self, enabled):
+        try:
+            self.instrumentation_enabled = enabled
+            self.stage_stats.enabled = enabled  # Picked up by the running monitor on its next stage
+            self.save_settings()
+            logging.info(f"Stage timing {'enabled' if enabled else 'disabled'}")
+        except Exception as e:
+            logging.error(f"Error in set_instrumentation_enabled: {e}")
+
+    def toggle_metrics(self):
+        try:
+            if self.metrics_server:
+                self.stop_metrics_server()
+            else:
+                self.start_metrics_server()
+            self.metrics_enabled = self.metrics_server is not None
+            self.metrics_action.setText("Disable Metrics Endpoint" if self.metrics_enabled else "Enable Metrics Endpoint")
+            self.save_settings()
+        except Exception as e:
+            logging.error(f"Error in toggle_metrics: {e}")
+            self.show_error_message(f"Error toggling metrics endpoint: {str(e)}")
+
+    def start_metrics_server(self):
+        try:
+            self.metrics_server = AutoContinueMetricsServer(self.metrics, port=self.metrics_port)
+            self.metrics_server.start()
+            logging.info(f"Metrics endpoint listening on http://127.0.0.1:{self.metrics_server.port}/metrics")
+        except Exception as e:
+            self.metrics_server = None
+            logging.error(f"Error in start_metrics_server: {e}")
+            self.show_error_message(f"Could not start metrics endpoint on port {self.metrics_port}: {str(e)}")
+
+    def stop_metrics_server(self):
+        try:
+            if self.metrics_server:
+                self.metrics_server.stop()
+                self.metrics_server = None
+                logging.info("Metrics endpoint stopped")
+        except Exception as e:
+            logging.error(f"Error in stop_metrics_server: {e}")
+
     def show_info_window(self, title, content):
         try:
             info_window = AutoContinueInfoWindow(title, content)
@@ -479,10 +1816,15 @@ class AutoContinueApp(QSystemTrayIcon):
         try:
             self.monitoring = False
             if self.monitor_thread:
-                self.monitor_thread.stop()
-                self.monitor_thread.wait()
+                self.retire_monitor_thread(self.monitor_thread)
+            for thread in self.retired_threads:
+                # Bounded so a thread stuck in a grab or click can't stop the app from exiting
+                if not thread.wait(5000):
+                    logging.warning("Monitoring thread did not stop within 5s")
             logging.info("Application exited")
             self.save_settings()
+            self.stop_metrics_server()
+            self.log_listener.stop()  # Flushes whatever is still queued
             QApplication.quit()
         except Exception as e:
             logging.error(f"Error in exit_app: {e}")
@@ -491,10 +1833,40 @@ class AutoContinueApp(QSystemTrayIcon):
         try:
             if os.path.exists(self.settings_file):
                 with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
-                    self.interval = settings.get('interval', 5)
-                    self.notifications_enabled = settings.get('notifications_enabled', True)
-                    self.selected_monitors = settings.get('selected_monitors', [-1])
+                    text = f.read()
+                    settings = json.loads(text)
+                    if not isinstance(settings, dict):
+                        raise ValueError("settings.json doesn't hold a JSON object")
+                    self.settings_text = text
+
+                    def setting(key, default):
+                        # A bad value is logged and the current one kept, so one typo can't break monitoring
+                        try:
+                            return validate_setting(key, settings.get(key, default))
+                        except ValueError as e:
+                            logging.warning(f"Ignoring {key} in settings.json, keeping {getattr(self, key)!r}: {e}")
+                            return getattr(self, key)
+
+                    self.interval = setting('interval', 5)
+                    self.notifications_enabled = setting('notifications_enabled', True)
+                    self.selected_monitors = setting('selected_monitors', [-1])
+                    self.pyramid_levels = setting('pyramid_levels', 2)
+                    self.cpu_budget_percent = setting('cpu_budget_percent', 0)
+                    self.min_interval = setting('min_interval', 0.25)
+                    self.monitor_keys = setting('monitor_keys', [])
+                    self.capture_regions = setting('capture_regions', {})
+                    self.window_targeting = setting('window_targeting', False)
+                    self.window_titles = setting('window_titles', self.window_titles)
+                    self.window_classes = setting('window_classes', self.window_classes)
+                    self.detection_process = setting('detection_process', False)
+                    self.input_backend = setting('input_backend', 'auto')
+                    self.restore_cursor = setting('restore_cursor', False)
+                    self.template_scales = setting('template_scales', self.template_scales)
+                    self.detection_rules = setting('detection_rules', self.detection_rules)
+                    self.instrumentation_enabled = setting('instrumentation_enabled', False)
+                    self.metrics_enabled = setting('metrics_enabled', False)
+                    self.metrics_port = setting('metrics_port', 9464)
+                    self.min_interval = min(self.min_interval, self.interval)
         except Exception as e:
             logging.error(f"Error in load_settings: {e}")
 
@@ -503,10 +1875,28 @@ class AutoContinueApp(QSystemTrayIcon):
             settings = {
                 'interval': self.interval,
                 'notifications_enabled': self.notifications_enabled,
-                'selected_monitors': self.selected_monitors
+                'selected_monitors': self.selected_monitors,
+                'pyramid_levels': self.pyramid_levels,
+                'cpu_budget_percent': self.cpu_budget_percent,
+                'min_interval': self.min_interval,
+                'monitor_keys': self.topology.get_known_keys() if getattr(self, 'topology', None) else self.monitor_keys,
+                'capture_regions': self.capture_regions,
+                'window_targeting': self.window_targeting,
+                'window_titles': self.window_titles,
+                'window_classes': self.window_classes,
+                'detection_process': self.detection_process,
+                'input_backend': self.input_backend,
+                'restore_cursor': self.restore_cursor,
+                'template_scales': self.template_scales,
+                'detection_rules': self.detection_rules,
+                'instrumentation_enabled': self.instrumentation_enabled,
+                'metrics_enabled': self.metrics_enabled,
+                'metrics_port': self.metrics_port
             }
+            text = json.dumps(settings)
+            self.settings_text = text
             with open(self.settings_file, 'w') as f:
-                json.dump(settings, f)
+                f.write(text)
         except Exception as e:
             logging.error(f"Error in save_settings: {e}")
 
@@ -519,6 +1909,10 @@ class AutoContinueTutorialWindow(QDialog):
 
         self.layout = QVBoxLayout()
 
+        # Chromium is only started the first time someone opens the tutorial
+        from PyQt5.QtWebEngineWidgets import QWebEngineView
+        from PyQt5.QtWebChannel import QWebChannel
+
         self.webView = QWebEngineView()
         self.layout.addWidget(self.webView)
 
@@ -549,13 +1943,15 @@ class AutoContinueTutorialWindow(QDialog):
 
         self.current_page_index = 0
         self.page_history = [self.current_page_index]
-        self.tutorial_pages = [
-            self.create_index_page(),
-            self.create_intro_page(),
-            self.create_features_page(),
-            self.create_usage_page(),
-            self.create_shortcuts_page(),
+        # Pages are rendered on first visit and kept for later navigation
+        self.page_builders = [
+            self.create_index_page,
+            self.create_intro_page,
+            self.create_features_page,
+            self.create_usage_page,
+            self.create_shortcuts_page,
         ]
+        self.tutorial_pages = {}
 
         self.load_tutorial_page(self.current_page_index)
 
@@ -582,8 +1978,10 @@ class AutoContinueTutorialWindow(QDialog):
         try:
             self.log_debug(f"Loading tutorial page {index}")
             self.current_page_index = index
+            if index not in self.tutorial_pages:
+                self.tutorial_pages[index] = self.page_builders[index]()
             self.webView.setHtml(self.tutorial_pages[index])
-            self.progress_bar.setValue(int((index + 1) / len(self.tutorial_pages) * 100))
+            self.progress_bar.setValue(int((index + 1) / len(self.page_builders) * 100))
         except Exception as e:
             self.log_error(f"Error loading tutorial page {index}: " + str(e))
 
@@ -606,7 +2004,7 @@ class AutoContinueTutorialWindow(QDialog):
 
     def go_to_next_page(self):
         try:
-            if self.current_page_index < len(self.tutorial_pages) - 1:
+            if self.current_page_index < len(self.page_builders) - 1:
                 next_page = self.current_page_index + 1
                 self.load_tutorial_page(next_page)
                 self.page_history.append(next_page)
@@ -771,12 +2169,30 @@ class AutoContinueTutorialWindow(QDialog):
         """
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # The detection worker is spawned from the frozen executable too
     try:
+        enable_dpi_awareness()  # Before Qt picks its own DPI mode, so clicks and captures share coordinates
+        # Lets QtWebEngine be imported after the QApplication exists (lazy tutorial)
+        QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
         app = QApplication(sys.argv)
         QApplication.setQuitOnLastWindowClosed(False)
+        startup_profiler.mark("QApplication")
         tray_app = AutoContinueApp()
+        startup_profiler.mark("tray app")
         tray_app.show()
+        startup_profiler.mark("tray icon shown")
         logging.info("Application started")
+        if "--enable" in sys.argv[1:]:
+            tray_app.start_monitoring(notify=False)  # E.g. from autostart or latency_harness.py
+        if startup_profiler.enabled:
+            # Also time what is deferred so the savings are visible in one report
+            load_detection_stack()
+            from PyQt5.QtWebEngineWidgets import QWebEngineView
+            startup_profiler.mark("QtWebEngine (deferred)")
+            report = startup_profiler.report()
+            print(report)
+            logging.info("Startup profile:\n" + report)
+            sys.exit(0)
         sys.exit(app.exec_())
     except Exception as e:
         logging.critical(f"Critical error on startup: {e}")
@@ -0,0 +1,70 @@
+import cv2
+import numpy as np
+import pytest
+
+import autocontinue_batch
+from autocontinue_core import AutoContinueTemplateBank, resource_path
+
+
+@pytest.fixture(scope="module", autouse=True)
+def detector():
+    autocontinue_batch.init_worker(resource_path("button_image.png"), AutoContinueTemplateBank.DEFAULT_SCALES, 0.8, 2)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "recording.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (320, 240))
+    if not writer.isOpened():
+        pytest.skip("OpenCV build can't write MJPG video")
+    template = cv2.imread(resource_path("button_image.png"))
+    for i in range(7):
+        frame = np.full((240, 320, 3), 247, dtype=np.uint8)
+        if i % 2 == 0:
+            frame[100:100 + template.shape[0], 50:50 + template.shape[1]] = template
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+RealVideoCapture = cv2.VideoCapture
+
+
+class CountlessCapture:
+    """A VideoCapture whose container reports no frame count, like many webm files."""
+
+    def __init__(self, path):
+        self.capture = RealVideoCapture(path)
+
+    def get(self, prop):
+        return 0.0 if prop == cv2.CAP_PROP_FRAME_COUNT else self.capture.get(prop)
+
+    def __getattr__(self, name):
+        return getattr(self.capture, name)
+
+
+def run(tasks):
+    return [record for function, argument in tasks for record in function(argument)]
+
+
+def test_video_is_split_into_chunks_and_every_frame_read(video):
+    tasks = autocontinue_batch.collect_tasks([video], False, 1, 3)
+    assert [task[1][1:3] for task in tasks] == [(0, 3), (3, 6), (6, None)]
+    records = run(tasks)
+    assert [record["frame"] for record in records] == list(range(7))
+    assert [record["found"] for record in records] == [i % 2 == 0 for i in range(7)]
+
+
+def test_video_without_a_frame_count_is_read_to_the_end(video, monkeypatch):
+    monkeypatch.setattr(autocontinue_batch.cv2, "VideoCapture", CountlessCapture)
+    tasks = autocontinue_batch.collect_tasks([video], False, 2, 240)
+    assert [task[1] for task in tasks] == [(video, 0, None, 2)]
+    assert [record["frame"] for record in run(tasks)] == [0, 2, 4, 6]
+
+
+def test_unreadable_video_gives_an_error_record(tmp_path):
+    path = str(tmp_path / "broken.webm")
+    with open(path, "wb") as f:
+        f.write(b"not a video")
+    records = run(autocontinue_batch.collect_tasks([path], False, 1, 240))
+    assert len(records) == 1 and "error" in records[0]
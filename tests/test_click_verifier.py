@@ -0,0 +1,91 @@
+from autocontinue_core import AutoContinueClickVerifier
+
+
+def clicked(now=100.0):
+    verifier = AutoContinueClickVerifier(settle_delay=0.3, verify_timeout=3.0, cooldown=1.5)
+    verifier.record_click((10, 20, 50, 30), 1.25, rule_index=1, now=now)
+    return verifier
+
+
+def test_idle_verifier_detects():
+    verifier = AutoContinueClickVerifier()
+    assert verifier.state == AutoContinueClickVerifier.IDLE
+    assert verifier.next_action(now=0.0) == "detect"
+
+
+def test_monitor_is_left_alone_while_the_page_settles():
+    verifier = clicked()
+    assert verifier.state == AutoContinueClickVerifier.CLICKED
+    assert (verifier.click_rect, verifier.scale, verifier.rule_index) == ((10, 20, 50, 30), 1.25, 1)
+    assert verifier.next_action(now=100.2) == "skip"
+    assert verifier.next_action(now=100.3) == "verify"
+    assert verifier.state == AutoContinueClickVerifier.VERIFYING
+
+
+def test_button_still_there_keeps_verifying():
+    verifier = clicked()
+    verifier.next_action(now=100.5)
+    verifier.record_verification(True, now=100.5)
+    assert verifier.next_action(now=101.0) == "verify"
+    assert verifier.verified == verifier.unverified == 0
+
+
+def test_button_gone_verifies_the_click_then_cools_down():
+    verifier = clicked()
+    verifier.next_action(now=100.5)
+    verifier.record_verification(False, now=100.8)
+    assert verifier.state == AutoContinueClickVerifier.COOLDOWN
+    assert verifier.verified == 1 and verifier.click_rect is None
+    assert verifier.last_outcome[0] is True and abs(verifier.last_outcome[1] - 0.8) < 1e-9
+    assert verifier.next_action(now=102.2) == "skip"
+    assert verifier.next_action(now=102.3) == "detect"
+
+
+def test_verification_before_settling_is_ignored():
+    verifier = clicked()
+    verifier.record_verification(False, now=100.1)
+    assert verifier.state == AutoContinueClickVerifier.CLICKED
+    assert verifier.verified == 0
+
+
+def test_timeout_counts_the_click_as_unverified_without_cooldown():
+    verifier = clicked()
+    verifier.next_action(now=100.5)
+    assert verifier.next_action(now=103.0) == "detect"
+    assert verifier.unverified == 1 and verifier.verified == 0
+    assert verifier.last_outcome == (False, 3.0)
+
+
+def test_timeout_is_noticed_even_if_the_settle_tick_was_missed():
+    verifier = clicked()
+    assert verifier.next_action(now=110.0) == "detect"
+    assert verifier.unverified == 1
+
+
+def test_reset_drops_a_pending_click_without_counting_it():
+    verifier = clicked()
+    verifier.reset()
+    assert verifier.state == AutoContinueClickVerifier.IDLE and verifier.click_rect is None
+    assert verifier.clicks == 1 and verifier.verified == verifier.unverified == 0
+    assert verifier.next_action(now=100.1) == "detect"
+
+
+def test_stats_after_several_clicks():
+    verifier = clicked(now=0.0)
+    verifier.next_action(now=0.5)
+    verifier.record_verification(False, now=0.5)
+    verifier.next_action(now=5.0)
+    verifier.record_click((10, 20, 50, 30), 1.0, now=5.0)
+    verifier.next_action(now=20.0)
+    stats = verifier.stats()
+    assert (stats["clicks"], stats["verified"], stats["unverified"]) == (2, 1, 1)
+    assert stats["success_rate"] == 0.5
+
+
+def test_take_outcome_reports_each_finished_click_once():
+    verifier = clicked()
+    assert verifier.take_outcome() is None
+    verifier.next_action(now=100.5)
+    verifier.record_verification(False, now=100.5)
+    assert verifier.take_outcome()[0] is True
+    assert verifier.take_outcome() is None
@@ -0,0 +1,53 @@
+import pytest
+
+from autocontinue_core import AutoContinueDetectionRule, AutoContinueTemplateBank, resource_path
+
+TEMPLATE = resource_path("button_image.png")
+
+
+def test_defaults_for_a_bare_click_rule():
+    rule = AutoContinueDetectionRule.from_spec({"template": TEMPLATE})
+    assert rule.name == "button_image.png"
+    assert (rule.threshold, rule.action, rule.hotkey, rule.cooldown) == (0.8, "click", "", 0.0)
+    assert rule.template_bank.scales == sorted(AutoContinueTemplateBank.DEFAULT_SCALES)
+
+
+def test_non_click_rules_default_to_a_cooldown():
+    assert AutoContinueDetectionRule.from_spec({"template": TEMPLATE, "action": "notify"}).cooldown == 30.0
+    rule = AutoContinueDetectionRule.from_spec({"template": TEMPLATE, "action": "hotkey", "hotkey": "ctrl+r", "cooldown": 5})
+    assert (rule.hotkey, rule.cooldown) == ("ctrl+r", 5.0)
+
+
+def test_numbers_from_json_are_converted():
+    rule = AutoContinueDetectionRule.from_spec({"name": "Retry", "template": TEMPLATE, "threshold": "0.9", "cooldown": "12"})
+    assert rule.name == "Retry" and rule.threshold == 0.9 and rule.cooldown == 12.0
+
+
+def test_scales_always_include_one():
+    rule = AutoContinueDetectionRule.from_spec({"template": TEMPLATE, "scales": [1.5, 2]})
+    assert rule.template_bank.scales == [1.0, 1.5, 2.0]
+    assert set(rule.template_bank.templates) == {1.0, 1.5, 2.0}
+
+
+def test_unknown_action_is_rejected():
+    with pytest.raises(ValueError, match="Unknown action"):
+        AutoContinueDetectionRule.from_spec({"template": TEMPLATE, "action": "doubleclick"})
+
+
+def test_hotkey_rule_needs_a_hotkey():
+    with pytest.raises(ValueError, match="no hotkey"):
+        AutoContinueDetectionRule.from_spec({"template": TEMPLATE, "action": "hotkey"})
+
+
+def test_missing_template_is_an_error(tmp_path):
+    with pytest.raises(OSError):
+        AutoContinueDetectionRule.from_spec({"template": str(tmp_path / "missing.png")})
+
+
+def test_spec_round_trips(tmp_path):
+    spec = {"name": "Regenerate", "template": TEMPLATE, "scales": [1.0, 1.25], "cache_path": str(tmp_path / "cache.npz"),
+            "threshold": 0.85, "action": "hotkey", "hotkey": "ctrl+shift+r", "cooldown": 30.0}
+    rule = AutoContinueDetectionRule.from_spec(spec)
+    assert rule.spec() == spec
+    rebuilt = AutoContinueDetectionRule.from_spec(rule.spec())
+    assert rebuilt.template_bank.scales == rule.template_bank.scales
@@ -0,0 +1,245 @@
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from autocontinue_core import (AutoContinueDetectionRule, AutoContinueDetector, AutoContinueFrameChangeDetector, AutoContinueHitTracker, AutoContinueMonitorTopology,
+                               AutoContinueTemplateBank, capture_regions_for_monitor, resource_path)
+
+
+@pytest.fixture(scope="module")
+def template_bank():
+    return AutoContinueTemplateBank(resource_path("button_image.png"))
+
+
+def page(width=960, height=540, seed=0):
+    # A light chat-like page with some text, like the benchmark's synthetic frames
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width, 4), 247, dtype=np.uint8)
+    for y in range(30, height, 28):
+        words = ''.join(chr(int(c)) for c in rng.integers(97, 123, size=40))
+        cv2.putText(frame, words, (int(rng.integers(10, 200)), y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (60, 60, 60, 255), 1, cv2.LINE_AA)
+    return frame
+
+
+def with_button(frame, template, x, y):
+    frame = frame.copy()
+    height, width = template.shape[:2]
+    frame[y:y + height, x:x + width] = cv2.cvtColor(template, cv2.COLOR_GRAY2BGRA)
+    return frame
+
+
+def test_hit_tracker_drops_locations_after_repeated_misses():
+    tracker = AutoContinueHitTracker(stale_after_misses=3)
+    tracker.record_hit((100, 100), 50, 20)
+    tracker.record_roi_miss()
+    tracker.record_roi_miss()
+    assert tracker.hits == [(100, 100)]
+    tracker.record_roi_miss()
+    assert tracker.hits == []
+    assert tracker.should_full_scan()
+
+
+def test_hit_resets_the_miss_run():
+    tracker = AutoContinueHitTracker(stale_after_misses=2)
+    tracker.record_hit((100, 100), 50, 20)
+    tracker.record_roi_miss()
+    tracker.record_hit((100, 100), 50, 20)
+    tracker.record_roi_miss()
+    assert tracker.hits == [(100, 100)]
+
+
+def test_find_button_stops_checking_a_stale_location(template_bank):
+    detector = AutoContinueDetector(template_bank)
+    template = template_bank.templates[1.0]
+    tracker = AutoContinueHitTracker(stale_after_misses=3)
+    gray = cv2.cvtColor(with_button(page(), template, 300, 200), cv2.COLOR_BGRA2GRAY)
+    score, location = detector.find_button(gray, tracker, template)
+    assert score > 0.8 and location == (300, 200)
+
+    empty = cv2.cvtColor(page(), cv2.COLOR_BGRA2GRAY)
+    for _ in range(5):
+        detector.find_button(empty, tracker, template)
+    assert tracker.roi_misses == 3
+    assert tracker.hits == []
+
+
+def scaled(template_bank, scale):
+    return template_bank.templates[scale]
+
+
+def test_first_pass_tries_the_dpi_guess_and_one(template_bank):
+    detector = AutoContinueDetector(template_bank)
+    monitor = SimpleNamespace(width=2880, width_mm=508)  # 144 DPI, guessed as 150%
+    assert [scale for scale, template in detector.templates_for_monitor(0, monitor)] == [1.5, 1.0]
+    widened = [scale for scale, template in detector.templates_for_monitor(0, monitor, widen=True)]
+    assert widened[:2] == [1.5, 1.0] and sorted(widened) == template_bank.scales
+
+
+def test_button_at_another_scale_is_found_on_a_static_page(template_bank):
+    detector = AutoContinueDetector(template_bank)
+    frame = with_button(page(), scaled(template_bank, 1.25), 400, 300)
+    assert not detector.detect(frame)["found"]
+    # The page doesn't change again, so the other scales must be tried on the unchanged frame
+    result = detector.detect(frame)
+    assert result["found"] and result["scale"] == 1.25
+    assert not result["changed"]
+
+
+def test_button_appearing_at_another_scale_is_found_once_the_page_settles(template_bank):
+    detector = AutoContinueDetector(template_bank)
+    empty = page()
+    detector.detect(empty)
+    detector.detect(empty)
+    frame = with_button(empty, scaled(template_bank, 1.5), 500, 200)
+    assert not detector.detect(frame)["found"]  # Only the changed tiles, at the likely scales
+    result = detector.detect(frame)
+    assert result["found"] and result["scale"] == 1.5
+    assert (result["x"], result["y"]) == (500 + scaled(template_bank, 1.5).shape[1] // 2, 200 + scaled(template_bank, 1.5).shape[0] // 2)
+
+
+def test_misses_are_counted_per_full_scan(template_bank):
+    detector = AutoContinueDetector(template_bank, widen_after_misses=3)
+    empty = page()
+    detector.detect(empty)
+    assert detector.scale_misses[(0, 0)] == 1
+    changed = empty.copy()
+    cv2.putText(changed, "typing", (700, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (60, 60, 60, 255), 1, cv2.LINE_AA)
+    detector.detect(changed)
+    assert detector.scale_misses[(0, 0)] == 1  # A partial scan doesn't count
+
+
+def test_due_widened_pass_is_not_lost_on_an_unchanged_frame(template_bank):
+    detector = AutoContinueDetector(template_bank, widen_after_misses=2)
+    frame = with_button(page(), scaled(template_bank, 1.75), 100, 100)
+    detector.detect(frame)
+    detector.unchecked_regions.clear()  # Only the miss counter is under test here
+    detector.scale_misses[(0, 0)] = 2
+    result = detector.detect(frame)
+    assert result["found"] and result["scale"] == 1.75
+    assert detector.scale_misses[(0, 0)] == 0
+
+
+def retry_template(tmp_path):
+    image = np.full((32, 90, 3), 230, dtype=np.uint8)
+    cv2.rectangle(image, (1, 1), (88, 30), (90, 90, 90), 2)
+    cv2.putText(image, "Retry", (18, 22), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (30, 30, 30), 2, cv2.LINE_AA)
+    path = tmp_path / "retry.png"
+    cv2.imwrite(str(path), image)
+    return AutoContinueTemplateBank(str(path), [1.0])
+
+
+def test_rule_left_out_while_the_frame_changed_scans_once_it_is_back(template_bank, tmp_path):
+    retry = retry_template(tmp_path)
+    detector = AutoContinueDetector(rules=[AutoContinueDetectionRule("Continue", template_bank),
+                                           AutoContinueDetectionRule("Retry", retry, action="notify", cooldown=30.0)])
+    empty = page()
+    detector.detect(empty)
+    detector.detect(empty)
+    # The retry button shows up while that rule is cooling down
+    frame = with_button(empty, retry.templates[1.0], 500, 200)
+    assert not detector.detect(frame, rule_indices=[0])["found"]
+    # The cooldown ends on a page that has stopped changing
+    result = detector.detect(frame)
+    assert result["found"] and result["rule"] == 1
+    assert (result["x"], result["y"]) == (545, 216)
+
+
+def test_change_detector_pads_a_changed_tile_by_the_template_size():
+    change_detector = AutoContinueFrameChangeDetector()
+    frame = page()
+    assert change_detector.dirty_regions(frame, 80, 30) is None  # Nothing to compare the first frame with
+    assert change_detector.dirty_regions(frame, 80, 30) == []
+    changed = frame.copy()
+    changed[150:170, 270:310] = 0  # Inside the tile at (256, 128)
+    assert change_detector.dirty_regions(changed, 80, 30) == [(256 - 80, 128 - 30, 128 + 160, 128 + 60)]
+
+
+def test_change_detector_clips_padding_to_the_frame():
+    change_detector = AutoContinueFrameChangeDetector()
+    frame = page()
+    change_detector.dirty_regions(frame, 80, 30)
+    changed = frame.copy()
+    changed[520:530, 920:930] = 0  # Last tile column and row of a 960x540 frame
+    assert change_detector.dirty_regions(changed, 80, 30) == [(896 - 80, 512 - 30, 960 - 816, 540 - 482)]
+
+
+def test_change_detector_scans_everything_when_most_tiles_changed():
+    change_detector = AutoContinueFrameChangeDetector(max_dirty_fraction=0.5)
+    change_detector.dirty_regions(page(seed=0), 80, 30)
+    assert change_detector.dirty_regions(page(seed=0)[::-1].copy(), 80, 30) is None
+    assert change_detector.stats()["full_frames"] == 2
+
+
+def test_unchanged_frame_skips_matching(template_bank, monkeypatch):
+    detector = AutoContinueDetector(template_bank)
+    frame = page()
+    detector.detect(frame)
+    detector.detect(frame)  # Tries the remaining scales on the frame that just settled
+    calls = []
+    monkeypatch.setattr(detector, "find_button", lambda *args, **kwargs: calls.append(args) or (0.0, (0, 0)))
+    monkeypatch.setattr(detector, "find_button_in_regions", lambda *args, **kwargs: calls.append(args) or (0.0, (0, 0)))
+    result = detector.detect(frame)
+    assert not result["changed"] and result["matches"] == []
+    assert calls == []
+    assert detector.get_change_stats()[0]["skipped_frames"] == 2
+
+
+def screen(x, y, width=1920, height=1080, name=None):
+    return SimpleNamespace(x=x, y=y, width=width, height=height, name=name)
+
+
+def test_monitor_indexes_survive_a_reordered_layout():
+    topology = AutoContinueMonitorTopology()
+    left, right = screen(0, 0, name="DP-1"), screen(1920, 0, name="HDMI-1")
+    assert [(index, monitor.name) for index, monitor, region in topology.build_entries([left, right])] == [(0, "DP-1"), (1, "HDMI-1")]
+    # The OS lists them the other way round after a reconnect
+    entries = topology.build_entries([right, left])
+    assert [(index, monitor.name) for index, monitor, region in entries] == [(0, "DP-1"), (1, "HDMI-1")]
+    assert entries[1][2] == {"top": 0, "left": 1920, "width": 1920, "height": 1080}
+
+
+def test_new_monitors_are_appended_and_removed_ones_leave_a_gap():
+    topology = AutoContinueMonitorTopology(known_keys=["DP-1", "HDMI-1"])
+    entries = topology.build_entries([screen(0, 0, name="USB-C"), screen(0, 0, name="HDMI-1")])
+    assert [(index, monitor.name) for index, monitor, region in entries] == [(1, "HDMI-1"), (2, "USB-C")]
+    assert topology.get_known_keys() == ["DP-1", "HDMI-1", "USB-C"]
+
+
+def test_unnamed_monitors_are_keyed_by_geometry():
+    topology = AutoContinueMonitorTopology()
+    topology.build_entries([screen(0, 0), screen(1920, 0, 2560, 1440)])
+    entries = topology.build_entries([screen(1920, 0, 2560, 1440), screen(0, 0)])
+    assert [(index, monitor.x) for index, monitor, region in entries] == [(0, 0), (1, 1920)]
+    assert topology.get_known_keys() == ["0,0,1920x1080", "1920,0,2560x1440"]
+
+
+SECOND_MONITOR = {"left": 1920, "top": -200, "width": 1280, "height": 1024}
+
+
+def test_no_capture_regions_means_the_whole_monitor():
+    assert capture_regions_for_monitor(SECOND_MONITOR, None) == [SECOND_MONITOR]
+    assert capture_regions_for_monitor(SECOND_MONITOR, []) == [SECOND_MONITOR]
+
+
+def test_capture_regions_are_moved_to_global_coordinates():
+    regions = capture_regions_for_monitor(SECOND_MONITOR, [[100, 50, 400, 300], [0, 0, 10, 10]])
+    assert regions == [{"left": 2020, "top": -150, "width": 400, "height": 300},
+                       {"left": 1920, "top": -200, "width": 10, "height": 10}]
+
+
+def test_capture_regions_are_clipped_to_the_monitor():
+    regions = capture_regions_for_monitor(SECOND_MONITOR, [[1000, 900, 500, 500]])
+    assert regions == [{"left": 2920, "top": 700, "width": 280, "height": 124}]
+
+
+def test_capture_region_hanging_off_the_top_left_keeps_only_the_visible_part():
+    # e.g. a click-verify rectangle for a button at the monitor's edge
+    regions = capture_regions_for_monitor(SECOND_MONITOR, [[-30, -20, 100, 50]])
+    assert regions == [{"left": 1920, "top": -200, "width": 70, "height": 30}]
+
+
+def test_capture_regions_outside_the_monitor_are_dropped():
+    rects = [[1280, 0, 100, 100], [0, 1024, 100, 100], [-100, 0, 100, 100], [10, 10, 0, 10]]
+    assert capture_regions_for_monitor(SECOND_MONITOR, rects) == []
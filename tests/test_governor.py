@@ -0,0 +1,101 @@
+import pytest
+
+from autocontinue_core import AutoContinueCpuGovernor, AutoContinueDetector, AutoContinueTemplateBank, resource_path
+
+
+def over_budget(governor, now):
+    governor.record_tick(now, 1.0)  # 1 CPU second per tick against a 10% budget: floor 10s
+    return governor.adjust(now)
+
+
+@pytest.mark.parametrize("headroom, ladder", [
+    (0, ((0, 1.0), (0, 0.5), (0, 0.0))),
+    (1, ((0, 1.0), (1, 1.0), (1, 0.5), (1, 0.0))),
+    (2, ((0, 1.0), (1, 1.0), (2, 1.0), (2, 0.5), (2, 0.0))),
+    (5, ((0, 1.0), (1, 1.0), (2, 1.0), (2, 0.5), (2, 0.0))),
+    (-1, ((0, 1.0), (0, 0.5), (0, 0.0))),
+])
+def test_ladder_only_has_the_pyramid_levels_the_templates_allow(headroom, ladder):
+    assert AutoContinueCpuGovernor.build_ladder(headroom) == ladder
+
+
+def test_default_template_leaves_one_useful_extra_level_at_depth_two():
+    detector = AutoContinueDetector(AutoContinueTemplateBank(resource_path("button_image.png")))
+    # 49 px high: 1.0 bottoms out at two levels, only the 1.75 and 2.0 copies can go one further
+    assert detector.useful_pyramid_levels(4) == 3
+    assert detector.useful_pyramid_levels(2) == 2
+    small = AutoContinueDetector(AutoContinueTemplateBank(resource_path("button_image.png"), scales=[0.75, 1.0]))
+    assert small.useful_pyramid_levels(4) == 2
+
+
+def test_disabled_governor_sets_no_floor_and_stays_at_full_quality():
+    governor = AutoContinueCpuGovernor(budget=0.0)
+    governor.record_tick(0.0, 5.0)
+    assert governor.interval_floor() == 0.0
+    assert not governor.adjust(100.0)
+    assert governor.level == 0
+
+
+def test_interval_floor_follows_the_moving_average():
+    governor = AutoContinueCpuGovernor(budget=0.5, smoothing=0.5)
+    governor.record_tick(0.0, 0.1)
+    assert governor.interval_floor() == pytest.approx(0.2)
+    governor.record_tick(1.0, 0.3)
+    assert governor.cpu_per_tick == pytest.approx(0.2)
+    assert governor.interval_floor() == pytest.approx(0.4)
+
+
+def test_steps_down_one_level_at_a_time_and_waits_between_steps():
+    governor = AutoContinueCpuGovernor(budget=0.1, target_interval=1.0, adjust_every=3.0, pyramid_headroom=1)
+    assert over_budget(governor, 10.0) and governor.level == 1
+    assert governor.extra_pyramid_levels == 1 and governor.monitor_share == 1.0
+    assert not over_budget(governor, 11.0)  # Too soon after the last step
+    assert over_budget(governor, 13.0) and governor.monitor_share == 0.5
+    assert over_budget(governor, 16.0) and governor.monitor_share == 0.0
+    assert not over_budget(governor, 19.0)  # Already at the bottom
+    assert governor.decisions == 3
+
+
+def test_climbs_back_once_there_is_headroom():
+    governor = AutoContinueCpuGovernor(budget=0.1, target_interval=1.0, adjust_every=0.0, headroom=0.4, pyramid_headroom=0)
+    over_budget(governor, 0.0)
+    assert governor.monitor_share == 0.5
+    governor.cpu_per_tick = 0.05  # Floor 0.5s: under budget but not under 40% of the interval
+    assert not governor.adjust(1.0)
+    governor.cpu_per_tick = 0.01
+    assert governor.adjust(2.0) and governor.level == 0
+
+
+def test_turning_the_budget_off_restores_full_quality_at_once():
+    governor = AutoContinueCpuGovernor(budget=0.1, adjust_every=0.0)
+    for now in range(4):
+        over_budget(governor, float(now))
+    governor.budget = 0.0
+    assert governor.adjust(4.0) and governor.level == 0
+
+
+def test_new_headroom_keeps_the_monitor_share():
+    governor = AutoContinueCpuGovernor(budget=0.1, adjust_every=0.0, pyramid_headroom=2)
+    for now in range(3):
+        over_budget(governor, float(now))
+    assert (governor.extra_pyramid_levels, governor.monitor_share) == (2, 0.5)
+    governor.set_pyramid_headroom(0)
+    assert (governor.extra_pyramid_levels, governor.monitor_share) == (0, 0.5)
+
+    governor = AutoContinueCpuGovernor(budget=0.1, adjust_every=0.0, pyramid_headroom=2)
+    over_budget(governor, 0.0)
+    over_budget(governor, 1.0)
+    governor.set_pyramid_headroom(1)
+    assert (governor.level, governor.extra_pyramid_levels) == (1, 1)
+
+
+def test_pick_monitors_rotates_through_every_monitor():
+    governor = AutoContinueCpuGovernor(budget=0.1, adjust_every=0.0, pyramid_headroom=0)
+    assert governor.pick_monitors([0, 1, 2, 3]) == [0, 1, 2, 3]
+    over_budget(governor, 0.0)
+    assert governor.pick_monitors([0, 1, 2, 3]) == [0, 1]
+    assert governor.pick_monitors([0, 1, 2, 3]) == [2, 3]
+    over_budget(governor, 1.0)
+    seen = [governor.pick_monitors([0, 1, 2]) for _ in range(3)]
+    assert sorted(index for picked in seen for index in picked) == [0, 1, 2]
+    assert governor.pick_monitors([5]) == [5]
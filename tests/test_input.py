@@ -0,0 +1,56 @@
+import pytest
+
+import autocontinue_input
+from autocontinue_input import candidate_backends, create_input_backend
+
+
+@pytest.fixture
+def linux(monkeypatch):
+    monkeypatch.setattr(autocontinue_input.sys, "platform", "linux")
+    for name in ("DISPLAY", "WAYLAND_DISPLAY", "XDG_SESSION_TYPE"):
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+def test_x11_prefers_xtest(linux):
+    linux.setenv("DISPLAY", ":0")
+    linux.setenv("XDG_SESSION_TYPE", "x11")
+    assert candidate_backends() == ["xtest", "uinput", "pyautogui"]
+
+
+def test_wayland_prefers_uinput_even_with_xwayland(linux):
+    linux.setenv("DISPLAY", ":0")
+    linux.setenv("WAYLAND_DISPLAY", "wayland-0")
+    assert candidate_backends() == ["uinput", "xtest", "pyautogui"]
+
+
+def test_wayland_session_type_alone_is_enough(linux):
+    linux.setenv("DISPLAY", ":0")
+    linux.setenv("XDG_SESSION_TYPE", "wayland")
+    assert candidate_backends()[0] == "uinput"
+
+
+def test_no_display_server_uses_uinput(linux):
+    assert candidate_backends() == ["uinput", "pyautogui"]
+
+
+def test_windows_uses_sendinput(monkeypatch):
+    monkeypatch.setattr(autocontinue_input.sys, "platform", "win32")
+    assert candidate_backends() == ["win32", "pyautogui"]
+
+
+def test_unavailable_backend_falls_back_to_pyautogui(linux):
+    backend = create_input_backend("win32")
+    assert backend.name == "pyautogui"
+    backend = create_input_backend("nonsense", restore_cursor=True)
+    assert backend.name == "pyautogui" and backend.restore_cursor
+
+
+def test_click_timings_are_recorded():
+    backend = autocontinue_input.AutoContinueInputBackend()
+    backend.send_click = lambda x, y: None
+    assert backend.stats()["clicks"] == 0 and backend.stats()["p50"] is None
+    for _ in range(3):
+        backend.click(10.6, 20.2)
+    stats = backend.stats()
+    assert stats["clicks"] == 3 and stats["p50"] is not None and stats["max"] >= stats["p50"]
@@ -0,0 +1,92 @@
+import logging
+import queue
+
+import autocontinue_logging
+from autocontinue_logging import AutoContinueLogListener, AutoContinueRateLimitFilter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def record(message, level=logging.ERROR):
+    return logging.makeLogRecord({"name": "test", "levelno": level, "levelname": logging.getLevelName(level),
+                                  "msg": message})
+
+
+def rate_limit(monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(autocontinue_logging.time, "monotonic", clock)
+    summaries = []
+    return AutoContinueRateLimitFilter(sink=summaries.append, **kwargs), clock, summaries
+
+
+def test_burst_is_limited(monkeypatch):
+    limiter, clock, summaries = rate_limit(monkeypatch, window=60.0, burst=3)
+    passed = [limiter.filter(record("Error in capture: boom")) for _ in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    assert limiter.filter(record("Error in click: other"))
+    assert limiter.filter(record("info", logging.INFO))
+    assert summaries == []
+
+
+def test_summary_logged_on_next_record_of_any_kind(monkeypatch):
+    limiter, clock, summaries = rate_limit(monkeypatch, window=60.0, burst=3)
+    for _ in range(10):
+        limiter.filter(record("Error in capture: boom"))
+    clock.now += 61
+    assert limiter.filter(record("Monitoring stopped", logging.INFO))
+    assert [summary.getMessage() for summary in summaries] == [
+        "Error in capture: boom (suppressed 7 repeats in the previous 60s)"]
+    assert summaries[0].levelno == logging.ERROR
+    # The summary itself goes through the handler untouched
+    assert limiter.filter(summaries[0])
+    clock.now += 61
+    limiter.filter(record("Monitoring started", logging.INFO))
+    assert len(summaries) == 1
+
+
+def test_repeat_after_window_starts_a_new_burst(monkeypatch):
+    limiter, clock, summaries = rate_limit(monkeypatch, window=60.0, burst=1)
+    limiter.filter(record("Error in capture: boom"))
+    limiter.filter(record("Error in capture: boom"))
+    clock.now += 61
+    assert limiter.filter(record("Error in capture: boom"))
+    assert [summary.getMessage() for summary in summaries] == [
+        "Error in capture: boom (suppressed 1 repeats in the previous 60s)"]
+    assert not limiter.filter(record("Error in capture: boom"))
+
+
+def test_listener_stop_flushes_pending_summaries(monkeypatch):
+    limiter, clock, summaries = rate_limit(monkeypatch, window=60.0, burst=2)
+    for _ in range(5):
+        limiter.filter(record("Error in capture: boom"))
+    listener = AutoContinueLogListener(queue.SimpleQueue(), rate_limit=limiter)
+    listener.start()
+    listener.stop()
+    assert [summary.getMessage() for summary in summaries] == [
+        "Error in capture: boom (suppressed 3 repeats in the previous 60s)"]
+
+
+def test_setup_logging_writes_summary_to_file(tmp_path):
+    root = logging.getLogger()
+    saved = list(root.handlers), root.level
+    log_path = tmp_path / "autocontinue.log"
+    try:
+        listener = autocontinue_logging.setup_logging(str(log_path))
+        for _ in range(5):
+            logging.error("Error in capture: boom")
+        listener.stop()
+    finally:
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in saved[0]:
+            root.addHandler(handler)
+        root.setLevel(saved[1])
+    lines = log_path.read_text(encoding="utf-8").splitlines()
+    assert sum("Error in capture: boom" in line for line in lines) == 4
+    assert lines[-1].endswith("Error in capture: boom (suppressed 2 repeats in the previous 60s)")
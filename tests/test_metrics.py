@@ -0,0 +1,62 @@
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+
+from autocontinue_metrics import CONTENT_TYPE, AutoContinueMetrics, AutoContinueMetricsServer
+from autocontinue_stats import AutoContinueStageStats
+
+
+@pytest.fixture
+def server():
+    stage_stats = AutoContinueStageStats(enabled=True)
+    stage_stats.record(0, "grab", 0.003)
+    metrics = AutoContinueMetrics(stage_stats)
+    metrics.record_tick()
+    metrics.record_click(0)
+    metrics.record_score(0, 0.93)
+    server = AutoContinueMetricsServer(metrics, port=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def fetch(server, path="/metrics"):
+    return urllib.request.urlopen(f"http://127.0.0.1:{server.port}{path}", timeout=5)
+
+
+def test_metrics_are_served_in_the_prometheus_text_format(server):
+    with fetch(server) as response:
+        assert response.status == 200
+        assert response.headers["Content-Type"] == CONTENT_TYPE
+        body = response.read().decode("utf-8")
+    lines = body.splitlines()
+    assert "autocontinue_ticks_total 1" in lines
+    assert 'autocontinue_clicks_total{monitor="1"} 1' in lines
+    assert "# TYPE autocontinue_match_score histogram" in lines
+    assert 'autocontinue_match_score_bucket{monitor="1",le="0.9"} 0' in lines
+    assert 'autocontinue_match_score_bucket{monitor="1",le="0.95"} 1' in lines
+    assert 'autocontinue_match_score_bucket{monitor="1",le="+Inf"} 1' in lines
+    assert 'autocontinue_match_score_count{monitor="1"} 1' in lines
+    assert 'autocontinue_stage_duration_seconds_bucket{monitor="1",stage="grab",le="0.0025"} 0' in lines
+    assert 'autocontinue_stage_duration_seconds_bucket{monitor="1",stage="grab",le="0.005"} 1' in lines
+    assert 'autocontinue_stage_duration_seconds_count{monitor="1",stage="grab"} 1' in lines
+
+
+def test_other_paths_are_not_found(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        fetch(server, "/")
+    assert error.value.code == 404
+
+
+def test_server_only_listens_on_localhost(server):
+    assert server.httpd.server_address[0] == "127.0.0.1"
+    try:
+        address = socket.gethostbyname(socket.gethostname())
+    except OSError:
+        address = None
+    if not address or address.startswith("127."):
+        pytest.skip("No non-loopback address to try")
+    with pytest.raises(OSError):
+        socket.create_connection((address, server.port), timeout=2).close()
@@ -0,0 +1,69 @@
+import time
+
+from autocontinue_core import AutoContinuePollScheduler
+
+
+def test_idle_ticks_back_off_to_the_maximum():
+    scheduler = AutoContinuePollScheduler(min_interval=0.25, max_interval=1.0, backoff_factor=2.0)
+    assert scheduler.current_interval == 0.25
+    scheduler.record_activity(False)
+    assert scheduler.current_interval == 0.5
+    for _ in range(5):
+        scheduler.record_activity(False)
+    assert scheduler.current_interval == 1.0
+
+
+def test_activity_drops_back_to_the_minimum():
+    scheduler = AutoContinuePollScheduler(min_interval=0.25, max_interval=1.0)
+    for _ in range(10):
+        scheduler.record_activity(False)
+    scheduler.record_activity(True)
+    assert scheduler.current_interval == 0.25
+
+
+def test_max_interval_is_never_below_min():
+    scheduler = AutoContinuePollScheduler(min_interval=2.0, max_interval=1.0)
+    assert scheduler.max_interval == 2.0
+
+
+def test_set_intervals_clamps_the_current_interval():
+    scheduler = AutoContinuePollScheduler(min_interval=0.25, max_interval=4.0)
+    for _ in range(10):
+        scheduler.record_activity(False)
+    scheduler.set_intervals(0.1, 1.0)
+    assert scheduler.current_interval == 1.0
+    scheduler.set_intervals(2.0, 3.0)
+    assert scheduler.current_interval == 2.0
+
+
+def test_wait_only_sleeps_for_what_is_left_of_the_interval():
+    scheduler = AutoContinuePollScheduler(min_interval=0.2, max_interval=0.2, sleep_slice=0.01)
+    tick_started = scheduler.start_tick()
+    time.sleep(0.1)
+    before = time.monotonic()
+    overshoot = scheduler.wait_for_next_tick(tick_started, lambda: True)
+    waited = time.monotonic() - before
+    assert 0.05 < waited < 0.18
+    assert 0.0 <= overshoot < 0.05
+
+
+def test_wait_honours_the_governor_floor():
+    scheduler = AutoContinuePollScheduler(min_interval=0.01, max_interval=0.01, sleep_slice=0.01)
+    scheduler.floor_interval = 0.15
+    tick_started = scheduler.start_tick()
+    scheduler.wait_for_next_tick(tick_started, lambda: True)
+    assert time.monotonic() - tick_started >= 0.15
+
+
+def test_wait_returns_as_soon_as_told_to_stop():
+    scheduler = AutoContinuePollScheduler(min_interval=5.0, max_interval=5.0)
+    started = time.monotonic()
+    scheduler.wait_for_next_tick(scheduler.start_tick(), lambda: False)
+    assert time.monotonic() - started < 0.1
+
+
+def test_effective_rate_counts_recent_ticks():
+    scheduler = AutoContinuePollScheduler()
+    assert scheduler.effective_rate() == 0.0
+    scheduler.tick_starts.extend([10.0, 10.5, 11.0])
+    assert scheduler.effective_rate() == 2.0
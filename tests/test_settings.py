@@ -0,0 +1,96 @@
+import logging
+
+import pytest
+
+from autocontinue_settings import DEFAULT_TEMPLATE_SCALES, validate_setting
+
+RULE = {"name": "Continue generation", "template": "button_image.png", "threshold": 0.8, "action": "click"}
+
+
+@pytest.mark.parametrize("key, value", [
+    ("interval", 2.5),
+    ("pyramid_levels", 3),
+    ("notifications_enabled", False),
+    ("selected_monitors", [-1]),
+    ("selected_monitors", []),
+    ("capture_regions", {"0": [[10, 20, 300, 200]], "2": []}),
+    ("window_titles", ["ChatGPT"]),
+    ("template_scales", list(DEFAULT_TEMPLATE_SCALES)),
+    ("detection_rules", [RULE]),
+    ("input_backend", "xtest"),
+    ("metrics_port", 9464),
+    ("some_future_key", {"anything": 1}),
+])
+def test_valid_values_are_kept(key, value):
+    assert validate_setting(key, value) == value
+
+
+@pytest.mark.parametrize("key, value, expected", [
+    ("interval", 0, 0.1),
+    ("interval", 1000, 60.0),
+    ("min_interval", 0.001, 0.05),
+    ("pyramid_levels", 9, 4),
+    ("pyramid_levels", 2.0, 2),
+    ("cpu_budget_percent", -5, 0),
+    ("cpu_budget_percent", 250, 100),
+    ("template_scales", [0.1, 1.0, 10], [0.25, 1.0, 4.0]),
+])
+def test_numbers_are_clamped(key, value, expected, caplog):
+    with caplog.at_level(logging.WARNING):
+        assert validate_setting(key, value) == expected
+    if value != expected:
+        assert "out of range" in caplog.text
+
+
+@pytest.mark.parametrize("key, value", [
+    ("interval", "5"),
+    ("interval", None),
+    ("interval", float("nan")),
+    ("interval", True),
+    ("pyramid_levels", 1.5),
+    ("notifications_enabled", "yes"),
+    ("notifications_enabled", 1),
+    ("selected_monitors", -1),
+    ("selected_monitors", [-2]),
+    ("selected_monitors", ["0"]),
+    ("capture_regions", []),
+    ("capture_regions", {"0": [[10, 20, 0, 200]]}),
+    ("capture_regions", {"0": [[10, 20, 300]]}),
+    ("capture_regions", {"primary": [[10, 20, 300, 200]]}),
+    ("window_titles", "ChatGPT"),
+    ("window_classes", [None]),
+    ("template_scales", []),
+    ("template_scales", 1.0),
+    ("template_scales", [1.0, "2x"]),
+    ("detection_rules", {}),
+    ("detection_rules", []),
+    ("input_backend", "evdev"),
+    ("metrics_port", 0),
+    ("metrics_port", 70000),
+    ("metrics_port", "9464"),
+])
+def test_invalid_values_are_rejected(key, value):
+    with pytest.raises(ValueError):
+        validate_setting(key, value)
+
+
+def test_malformed_rules_are_dropped_and_the_rest_kept(caplog):
+    rules = [
+        RULE,
+        "button_image.png",
+        {"name": "No template"},
+        {"template": "retry.png", "action": "doubleclick"},
+        {"template": "regenerate.png", "action": "hotkey"},
+        {"template": "regenerate.png", "action": "hotkey", "hotkey": "ctrl+shift+r", "cooldown": -1, "threshold": 3},
+    ]
+    with caplog.at_level(logging.WARNING):
+        cleaned = validate_setting("detection_rules", rules)
+    assert cleaned == [RULE, {"template": "regenerate.png", "action": "hotkey", "hotkey": "ctrl+shift+r",
+                              "cooldown": 0.0, "threshold": 1.0}]
+    assert caplog.text.count("Skipping detection rule") == 4
+    assert rules[-1]["cooldown"] == -1  # The settings as read are left alone
+
+
+def test_only_malformed_rules_is_an_error():
+    with pytest.raises(ValueError, match="no usable detection rules"):
+        validate_setting("detection_rules", [{"template": ""}, {"template": "x.png", "threshold": "high"}])
@@ -0,0 +1,55 @@
+from autocontinue_stats import AutoContinueStageHistogram, AutoContinueStageStats
+
+
+def test_values_land_in_the_first_bucket_they_fit():
+    histogram = AutoContinueStageHistogram(buckets=(0.001, 0.01, 0.1))
+    for seconds in (0.0005, 0.001, 0.002, 0.1, 5.0):
+        histogram.observe(seconds)
+    # Upper bounds are inclusive, like Prometheus "le"; the last slot is +Inf
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5
+    assert abs(histogram.total - 5.1035) < 1e-9
+
+
+def test_percentiles_of_an_empty_histogram_are_none():
+    assert AutoContinueStageHistogram().percentiles((50, 99)) == {50: None, 99: None}
+
+
+def test_percentiles_are_nearest_rank():
+    histogram = AutoContinueStageHistogram()
+    for ms in range(100, 0, -1):
+        histogram.observe(ms / 1000.0)
+    assert histogram.percentiles() == {50: 0.051, 95: 0.096, 99: 0.1}
+    histogram.observe(2.0)
+    assert histogram.percentiles((100,)) == {100: 2.0}
+
+
+def test_percentiles_only_use_the_recent_window():
+    histogram = AutoContinueStageHistogram(window=10)
+    for _ in range(100):
+        histogram.observe(1.0)
+    for _ in range(10):
+        histogram.observe(0.001)
+    assert histogram.percentiles((50, 99)) == {50: 0.001, 99: 0.001}
+    assert histogram.count == 110  # The bucket counts still cover everything
+
+
+def test_disabled_stats_record_nothing():
+    stats = AutoContinueStageStats(enabled=False)
+    with stats.stage(0, "grab"):
+        pass
+    stats.record(0, "match", 0.5)
+    assert stats.snapshot() == {}
+
+
+def test_snapshot_reports_buckets_and_percentiles_per_stage():
+    stats = AutoContinueStageStats(enabled=True, buckets=(0.01, 0.1))
+    stats.record(0, "grab", 0.005)
+    stats.record(0, "grab", 0.05)
+    stats.record(None, "tick", 1.0)
+    snapshot = stats.snapshot()
+    assert set(snapshot) == {(0, "grab"), (None, "tick")}
+    grab = snapshot[(0, "grab")]
+    assert grab["count"] == 2 and grab["p50"] == 0.05 and grab["p99"] == 0.05
+    assert grab["buckets"] == [(0.01, 1), (0.1, 1), (float("inf"), 0)]
+    assert snapshot[(None, "tick")]["buckets"][-1] == (float("inf"), 1)
@@ -0,0 +1,60 @@
+import os
+import signal
+import sys
+
+import pytest
+
+from autocontinue_core import AutoContinueDetectionRule, AutoContinueTemplateBank, resource_path
+from autocontinue_worker import AutoContinueDetectionWorker, AutoContinueWorkerRestarted
+
+
+@pytest.fixture
+def worker():
+    rule = AutoContinueDetectionRule("Continue generation", AutoContinueTemplateBank(resource_path("button_image.png")))
+    worker = AutoContinueDetectionWorker([rule.spec()], reply_timeout=2.0)
+    worker.start()
+    yield worker
+    worker.stop()
+
+
+def test_dead_child_is_replaced_before_the_tick(worker):
+    pid = worker.process.pid
+    worker.process.kill()
+    worker.process.join()
+    assert worker.run([]) == []
+    assert worker.restarts == 1 and worker.process.pid != pid
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Needs SIGSTOP")
+def test_hung_child_is_replaced_and_the_next_tick_works(worker):
+    os.kill(worker.process.pid, signal.SIGSTOP)
+    with pytest.raises(AutoContinueWorkerRestarted):
+        worker.run([])
+    assert worker.restarts == 1 and worker.is_alive()
+    assert worker.run([]) == []
+    assert worker.stats()["last_restart_latency"] is not None
+
+
+def test_monitor_keeps_running_after_a_worker_restart(monkeypatch, tmp_path):
+    pytest.importorskip("PyQt5")
+    pytest.importorskip("mss")
+    pytest.importorskip("pyautogui")
+    monkeypatch.setenv("AUTOCONTINUE_HOME", str(tmp_path))
+    import main
+
+    monitor = main.AutoContinueBrowserMonitor(0.01, resource_path("button_image.png"), False, [-1], min_interval=0.01)
+    errors = []
+    monitor.error_signal.connect(errors.append)
+    ticks = []
+
+    def process_monitors(pool):
+        ticks.append(monitor.monitoring)
+        if len(ticks) == 1:
+            raise AutoContinueWorkerRestarted("Detection worker exited with code -9; restarted in 0.50s")
+        monitor.monitoring = len(ticks) < 3
+        return False
+
+    monkeypatch.setattr(monitor, "process_monitors", process_monitors)
+    monitor.run()
+    assert len(ticks) == 3
+    assert errors == [] and monitor.consecutive_errors == 0
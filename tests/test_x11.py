@@ -0,0 +1,94 @@
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from autocontinue_x11 import AutoContinueWindowTargets, frame_rect, intersect_rect, rule_matches, subtract_rect, visible_rects
+
+
+def area(rects):
+    return sum(width * height for left, top, width, height in rects)
+
+
+def test_subtract_disjoint_occluder_keeps_the_rect():
+    assert subtract_rect((0, 0, 100, 100), (100, 0, 50, 50)) == [(0, 0, 100, 100)]
+
+
+def test_subtract_covering_occluder_leaves_nothing():
+    assert subtract_rect((10, 10, 50, 50), (0, 0, 100, 100)) == []
+
+
+def test_subtract_hole_in_the_middle_leaves_four_pieces():
+    pieces = subtract_rect((0, 0, 100, 100), (25, 25, 50, 50))
+    assert sorted(pieces) == [(0, 0, 100, 25), (0, 25, 25, 50), (0, 75, 100, 25), (75, 25, 25, 50)]
+    assert area(pieces) == 100 * 100 - 50 * 50
+
+
+def test_subtract_corner_overlap():
+    pieces = subtract_rect((0, 0, 100, 100), (50, 50, 100, 100))
+    assert sorted(pieces) == [(0, 0, 100, 50), (0, 50, 50, 50)]
+
+
+def test_visible_rects_with_several_occluders():
+    pieces = visible_rects((0, 0, 100, 100), [(0, 0, 50, 100), (50, 0, 50, 50)])
+    assert pieces == [(50, 50, 50, 50)]
+    assert visible_rects((0, 0, 100, 100), [(0, 0, 100, 100), (10, 10, 5, 5)]) == []
+    assert visible_rects((0, 0, 100, 100), []) == [(0, 0, 100, 100)]
+
+
+def test_intersect_rect():
+    assert intersect_rect((-10, -10, 50, 50), (0, 0, 1920, 1080)) == (0, 0, 40, 40)
+    assert intersect_rect((1900, 1000, 100, 100), (0, 0, 1920, 1080)) == (1900, 1000, 20, 80)
+    assert intersect_rect((1920, 0, 100, 100), (0, 0, 1920, 1080)) is None
+
+
+def test_frame_rect_adds_the_window_manager_frame():
+    assert frame_rect((100, 130, 400, 200), (2, 2, 30, 2)) == (98, 100, 404, 232)
+    assert frame_rect((100, 130, 400, 200), None) == (100, 130, 400, 200)
+
+
+def test_rule_matches_title_or_class_case_insensitively():
+    assert rule_matches("ChatGPT - Mozilla Firefox", ("Navigator", "firefox"), ["chatgpt"], [])
+    assert rule_matches("New Tab", ("Navigator", "Firefox"), [], ["FIREFOX"])
+    assert not rule_matches("New Tab", ("Navigator", "firefox"), ["ChatGPT"], ["chrome"])
+    assert not rule_matches(None, (), [""], [""])  # Empty rules match nothing
+
+
+@pytest.fixture
+def xvfb_display():
+    pytest.importorskip("Xlib")
+    if not shutil.which("Xvfb") or not shutil.which("xmessage"):
+        pytest.skip("Needs Xvfb and xmessage")
+    display = ":%d" % (90 + os.getpid() % 100)
+    server = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x720x24", "-nolisten", "tcp"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    yield display
+    server.terminate()
+    server.wait()
+
+
+def test_matching_window_is_found_under_xvfb(xvfb_display):
+    env = dict(os.environ, DISPLAY=xvfb_display)
+    window = subprocess.Popen(["xmessage", "-geometry", "400x200+100+100", "-title", "ChatGPT", "hello"], env=env)
+    targets = AutoContinueWindowTargets(["ChatGPT"], display_name=xvfb_display)
+    try:
+        deadline = time.monotonic() + 5
+        rects = []
+        while not rects and time.monotonic() < deadline:
+            targets.invalidate()
+            rects = targets.get_rects()
+            time.sleep(0.05)
+        # Give or take the window border, which is outside the geometry
+        assert len(rects) == 1
+        left, top, width, height = rects[0]
+        assert abs(left - 100) <= 2 and abs(top - 100) <= 2 and abs(width - 400) <= 4 and abs(height - 200) <= 4
+        assert targets.rects_for_monitor({"left": 50, "top": 0, "width": 1230, "height": 720}) == [[left - 50, top, width, height]]
+        targets.set_rules(["Something else"], [])
+        assert targets.get_rects() == []
+    finally:
+        targets.close()
+        window.terminate()
+        window.wait()